@@ -0,0 +1,717 @@
+# app/api/routes.py
+"""
+API endpoints. Imported by `create_app()` (app/api/main.py) after .env is
+loaded, so settings and every module's environment reads see it.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, timezone
+import asyncio
+import base64
+import json
+import logging
+import re
+import threading
+import time
+from app.core.settings import get_settings
+from app.pipeline.pii_redactor import REDACTION_PATTERNS
+from app.core.db import (
+    AsyncSessionLocal, SessionLocal, dispose_async_engine, engine, get_async_db, get_async_engine, get_db,
+)
+from app.core.schema import ensure_schema
+import app.core.models as models
+from app.core import archive, cache, counters, export, telemetry
+from app.core.ingest import ingest_batch, restore_sessions
+from app.core.jobs import IngestQueue, QueueClosed, QueueFull
+from app.core.retention import RetentionWorker
+import app.core.hooks  # noqa: F401  (registers ORM invariants)
+from app.pipeline.clustering import explain_cluster
+from app.pipeline import promotion, sessionize
+from app.playbooks import engine as playbooks
+
+# ----- Setup -----
+logger = logging.getLogger("soc_copilot.api")
+settings = get_settings()
+
+
+# Schema check/upgrade runs once per process: in the app's lifespan, or on the
+# first request when the app is served without one (e.g. TestClient(app)
+# outside a `with` block).
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def prepare_schema() -> None:
+    global _schema_ready
+    with _schema_lock:
+        if not _schema_ready:
+            ensure_schema(engine)
+            if sessionize.enabled():
+                with SessionLocal() as db:
+                    restore_sessions(db)
+            _schema_ready = True
+
+async def _require_schema():
+    if not _schema_ready:
+        await run_in_threadpool(prepare_schema)
+
+router = APIRouter(dependencies=[Depends(_require_schema)])
+
+_MAX_REPORTED_ERRORS = 1000
+_NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"}
+
+# ----- Schemas -----
+class LogEvent(BaseModel):
+    source: str = Field("app", description="Emitter/source")
+    event_type: str = Field("auth_failure", description="Type of event")
+    message: str = Field(..., description="Message payload")
+    user: Optional[str] = None
+    ip: Optional[str] = None
+    email: Optional[str] = None
+    region: Optional[str] = None
+    action: Optional[str] = None
+    status: Optional[str] = None
+    ts: Optional[str] = Field(
+        None,
+        description="Optional ISO 8601 timestamp for clustering; falls back to ingest time",
+    )
+
+class IngestRequest(BaseModel):
+    events: List[LogEvent]
+
+class IdsRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=1000, description="up to 1000 ids per call")
+
+class ApproveRequest(BaseModel):
+    action_name: str
+    notes: Optional[str] = ""
+
+# ----- Endpoints -----
+def _ingest_events(db: Session, events: List[LogEvent]) -> int:
+    # Pydantic v2: replace .dict() with .model_dump(); drop Nones to keep keys clean
+    return ingest_batch(
+        db,
+        [e.model_dump(exclude_none=True) for e in events],
+        default_tag=settings.default_residency_tag,
+        store_raw=settings.store_raw,
+        benign_types=settings.benign_types,
+        critical_types=settings.critical_types,
+    )
+
+def _commit_micro_batch(events: List[LogEvent]) -> int:
+    db = SessionLocal()
+    try:
+        n = _ingest_events(db, events)
+        db.commit()
+        return n
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def new_ingest_queue() -> IngestQueue:
+    """One per app (create_app() keeps it on app.state), so shutting one app down doesn't close another's."""
+    return IngestQueue(
+        _commit_micro_batch,
+        maxsize=settings.ingest_queue_size,
+        workers=settings.ingest_workers,
+        chunk_size=settings.ingest_stream_batch,
+    )
+
+def get_ingest_queue(request: Request) -> IngestQueue:
+    return request.app.state.ingest_queue
+
+# optional periodic retention (RETENTION_INTERVAL_SECONDS > 0), see app/core/retention.py
+retention_worker = RetentionWorker(SessionLocal, engine)
+
+async def startup():
+    """Lifespan start: schema check, connect both engines so the first request doesn't, start retention."""
+    await run_in_threadpool(prepare_schema)
+    async with get_async_engine().connect():
+        pass
+    retention_worker.start()
+
+async def shutdown(queue: IngestQueue):
+    # drain queued jobs before the process exits, then stop the pipeline pool;
+    # both block, so keep them off the event loop
+    from app.pipeline.executor import shutdown_pool
+
+    await run_in_threadpool(retention_worker.stop)
+    await run_in_threadpool(queue.shutdown)
+    await run_in_threadpool(shutdown_pool)
+    await dispose_async_engine()
+
+@router.post("/ingest/logs")
+def ingest_logs(
+    payload: IngestRequest,
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async: queue and return 202 + job id"),
+    db: Session = Depends(get_db),
+    ingest_queue: IngestQueue = Depends(get_ingest_queue),
+):
+    if mode == "async":
+        try:
+            job = ingest_queue.submit(payload.events)
+        except QueueFull:
+            raise HTTPException(
+                429, "Ingest queue is full, retry later",
+                headers={"Retry-After": str(settings.ingest_retry_after)},
+            )
+        except QueueClosed:
+            raise HTTPException(503, "Server is shutting down")
+        return JSONResponse(
+            status_code=202,
+            content={"status": "accepted", "job_id": job.id, "total": job.total},
+            headers={"Location": f"/ingest/jobs/{job.id}"},
+        )
+    created = _ingest_events(db, payload.events)
+    db.commit()
+    return {"status": "success", "ingested": created}
+
+@router.get("/ingest/jobs/{job_id}")
+def ingest_job(job_id: str, ingest_queue: IngestQueue = Depends(get_ingest_queue)):
+    job = ingest_queue.get(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return job.to_dict()
+
+@router.post("/ingest/stream")
+async def ingest_stream(
+    request: Request,
+    batch_size: Optional[int] = Query(None, ge=1, le=50_000, description="Events per committed micro-batch"),
+):
+    """
+    Ingest a chunked NDJSON body (one LogEvent per line) without buffering it.
+    Lines are validated one by one and committed in micro-batches, so memory is
+    bounded by batch_size + one line and the DB write lock is held per batch.
+    Bad lines are reported with their 1-based line number and byte offset.
+    """
+    ctype = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    if ctype and ctype not in _NDJSON_TYPES:
+        raise HTTPException(415, f"Expected application/x-ndjson, got {ctype}")
+    size = batch_size or settings.ingest_stream_batch
+
+    pending: List[LogEvent] = []
+    pending_pos: List[tuple] = []  # (line, offset) per pending event
+    errors: List[dict] = []
+    error_count = ingested = batches = failed_batches = line_no = 0
+    offset = 0          # byte offset of the start of `buf`
+    buf = b""
+    skipping = False    # inside an oversized line; drop bytes until newline
+
+    def _error(line: int, at: int, msg: str):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < _MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "offset": at, "error": msg})
+
+    def _handle(line: bytes, line_start: int):
+        if not line.strip():
+            return
+        if len(line) > settings.ingest_max_line_bytes:
+            _error(line_no, line_start, f"line exceeds {settings.ingest_max_line_bytes} bytes")
+            return
+        try:
+            pending.append(LogEvent.model_validate_json(line))
+            pending_pos.append((line_no, line_start))
+        except ValidationError as e:
+            msg = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'line'}: {err['msg']}" for err in e.errors()
+            )
+            _error(line_no, line_start, msg)
+
+    async def _flush():
+        nonlocal ingested, batches, failed_batches, error_count
+        if not pending:
+            return
+        try:
+            ingested += await run_in_threadpool(_commit_micro_batch, list(pending))
+            batches += 1
+        except Exception as e:
+            # earlier batches stay committed; report this one's lines so the client can resend them
+            (first, at), (last, _) = pending_pos[0], pending_pos[-1]
+            logger.exception("ingest/stream: micro-batch for lines %d-%d failed", first, last)
+            failed_batches += 1
+            error_count += len(pending)
+            if len(errors) < _MAX_REPORTED_ERRORS:
+                errors.append({
+                    "line": first, "last_line": last, "offset": at,
+                    "error": f"batch not committed: {type(e).__name__}",
+                })
+        pending.clear()
+        pending_pos.clear()
+
+    async for chunk in request.stream():
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            line_no += 1
+            if skipping:
+                skipping = False
+            else:
+                _handle(buf[start:nl], offset + start)
+            start = nl + 1
+            if len(pending) >= size:
+                await _flush()
+        offset += start
+        buf = buf[start:]
+        if len(buf) > settings.ingest_max_line_bytes:
+            if not skipping:
+                _error(line_no + 1, offset, f"line exceeds {settings.ingest_max_line_bytes} bytes")
+                skipping = True
+            offset += len(buf)
+            buf = b""
+    if buf and not skipping:
+        line_no += 1
+        _handle(buf, offset)
+    elif skipping:
+        line_no += 1
+    await _flush()
+
+    return {
+        "status": "success" if not error_count else "partial",
+        "ingested": ingested,
+        "batches": batches,
+        "failed_batches": failed_batches,
+        "lines": line_no,
+        "error_count": error_count,
+        "errors": errors,
+    }
+
+
+
+@router.get("/metrics")
+def metrics(db: Session = Depends(get_db)):
+    # counters are maintained by ingest; rebuild with scripts/rebuild_counters.py
+    c = counters.read_all(db)
+    total_events = c.get("events", {}).get("", 0)
+    total_incidents = c.get("incidents", {}).get("", 0)
+    suppression_rate = 1.0 - (total_incidents / total_events) if total_events else 0.0
+    return {
+        "events": total_events,
+        "incidents": total_incidents,
+        "suppression_rate": round(suppression_rate, 3),
+        "incidents_by_status": c.get("incidents_by_status", {}),
+        "events_by_type": c.get("events_by_type", {}),
+        "events_by_residency": c.get("events_by_residency", {}),
+        "promotion": promotion.detector.stats(),
+        "clustering": {"mode": sessionize.CLUSTER_MODE, "sessions": sessionize.index.stats()},
+        "playbooks": playbooks.matcher.stats(),
+        "response_cache": cache.responses.stats(),
+    }
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+def metrics_prometheus(db: Session = Depends(get_db), ingest_queue: IngestQueue = Depends(get_ingest_queue)):
+    # histograms are in-process (per uvicorn worker); business counters come from the DB
+    c = counters.read_all(db)
+    extra = telemetry.gauge_lines(
+        "soc_counter", "Business counters (see /metrics).",
+        {(("name", name), ("key", key)): v for name, keys in c.items() for key, v in keys.items()},
+    )
+    extra += telemetry.gauge_lines(
+        "soc_ingest_queue", "Async ingest queue state.",
+        {(("field", k),): v for k, v in ingest_queue.stats().items()},
+    )
+    extra += telemetry.gauge_lines(
+        "soc_promotion", "Promotion detector state.",
+        {(("field", k),): v for k, v in promotion.detector.stats().items()},
+    )
+    extra += telemetry.gauge_lines(
+        "soc_cluster_sessions", "Open clustering sessions (CLUSTER_MODE=session).",
+        {(("field", k),): v for k, v in sessionize.index.stats().items()},
+    )
+    extra += telemetry.gauge_lines(
+        "soc_response_cache", "Response cache entries, bytes and hit/miss totals.",
+        {(("field", k),): v for k, v in cache.responses.stats().items()},
+    )
+    return PlainTextResponse(telemetry.render(extra), media_type="text/plain; version=0.0.4")
+
+def _evidence_payload(ev: models.Event, redacted: str) -> dict:
+    # `redacted` comes from archive.evidence_text*: archived events keep their
+    # text in a compressed block (app/core/archive.py)
+    return {
+        "event_id": ev.id,
+        "residency_tag": ev.residency_tag,
+        "redacted": redacted,
+        "incident_id": ev.incident_id,
+        "cluster_key": ev.cluster_key,
+    }
+
+# Hot read endpoints are async on the asyncio engine (app/core/db.py), so they
+# don't compete with sync ingest handlers for threadpool threads.
+@router.get("/evidence/{event_id}")
+async def evidence(event_id: int, db: AsyncSession = Depends(get_async_db)):
+    ev = await db.get(models.Event, event_id)
+    if not ev:
+        raise HTTPException(404, "Event not found")
+    return _evidence_payload(ev, (await archive.evidence_text_async(db, ev))["redacted"])
+
+@router.post("/evidence/batch")
+def evidence_batch(req: IdsRequest, db: Session = Depends(get_db)):
+    """
+    Evidence for many event ids in one joined query; each item is the
+    /evidence/{id} payload plus its incident's status and title.
+    """
+    ids = set(req.ids)
+    rows = db.execute(
+        select(models.Event, models.Incident.status, models.Incident.title)
+        .join(models.Incident, models.Incident.id == models.Event.incident_id)
+        .where(models.Event.id.in_(ids))
+        .order_by(models.Event.id)
+    ).all()
+    items = [
+        {**_evidence_payload(ev, archive.evidence_text(db, ev)["redacted"]),
+         "incident_status": status, "incident_title": title}
+        for ev, status, title in rows
+    ]
+    found = {i["event_id"] for i in items}
+    return {"items": items, "missing": sorted(ids - found)}
+
+@router.get("/events/recent")
+def recent_events(
+    response: Response,
+    limit: int = Query(50, ge=1, le=1000),
+    before_id: Optional[int] = Query(None, ge=1, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Newest events first with their incident status; paged by id (next page's before_id in X-Next-Cursor)."""
+    q = (
+        select(models.Event, models.Incident.status)
+        .join(models.Incident, models.Incident.id == models.Event.incident_id)
+    )
+    if before_id:
+        q = q.where(models.Event.id < before_id)
+    rows = db.execute(q.order_by(models.Event.id.desc()).limit(limit)).all()
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1][0].id)
+    return [
+        {
+            "id": ev.id,
+            "event_type": ev.event_type,
+            "source": ev.source,
+            "residency_tag": ev.residency_tag,
+            "created_at": ev.created_at.isoformat() if ev.created_at else None,
+            "redacted": archive.evidence_text(db, ev)["redacted"],
+            "incident_id": ev.incident_id,
+            "incident_status": status,
+        }
+        for ev, status in rows
+    ]
+
+# Friendly aliases (no breaking change)
+@router.get("/events/{event_id}/evidence")
+async def evidence_alias(event_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await evidence(event_id, db)
+
+@router.get("/incidents/{incident_id}/evidence")
+def incident_evidence(incident_id: int, db: Session = Depends(get_db)):
+    ev = db.query(models.Event).filter(models.Event.incident_id == incident_id).first()
+    if not ev:
+        raise HTTPException(404, "Incident not found")
+    return _evidence_payload(ev, archive.evidence_text(db, ev)["redacted"])
+
+@router.get("/incidents/{incident_id}/export")
+def export_incident_evidence(
+    incident_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[str] = Query(None, description="ISO 8601; created_at >= since"),
+    until: Optional[str] = Query(None, description="ISO 8601; created_at < until"),
+    event_type: Optional[str] = None,
+    after_id: Optional[int] = Query(None, ge=0, description="resume after this event id"),
+    limit: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream all of an incident's events (redacted evidence) in id order, as
+    NDJSON or CSV. Resume an interrupted export with after_id=<last id>.
+    """
+    if db.get(models.Incident, incident_id) is None:
+        raise HTTPException(404, "Incident not found")
+    chunks = export.iter_events(
+        SessionLocal, incident_id, fmt=format,
+        since=_parse_time(since, "since"), until=_parse_time(until, "until"),
+        event_type=event_type.lower() if event_type else None, after_id=after_id, limit=limit,
+    )
+    media = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"incident-{incident_id}-evidence.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(chunks, media_type=media,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@router.get("/health")
+async def health():
+    return {"ok": True}
+def _encode_cursor(last_seen, incident_id: int) -> str:
+    raw = json.dumps([last_seen.isoformat() if last_seen else None, incident_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, incident_id = json.loads(raw)
+        return (datetime.fromisoformat(ts) if ts else None), int(incident_id)
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+
+def _parse_time(value: Optional[str], name: str) -> Optional[datetime]:
+    """ISO 8601 → naive UTC (matches CURRENT_TIMESTAMP in the DB)."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(400, f"Invalid {name}: expected ISO 8601")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+@router.get("/incidents")
+async def list_incidents(
+    request: Request,
+    status: Optional[str] = Query(None, description="open/noise/closed"),
+    event_type: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO 8601; last_seen >= since"),
+    until: Optional[str] = Query(None, description="ISO 8601; last_seen < until"),
+    limit: int = Query(settings.incidents_page_default, ge=1, le=settings.incidents_page_max),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Newest-first page of incidents, keyset-paginated on (last_seen, id). Each
+    page is an index range scan; the next page's cursor is returned in the
+    X-Next-Cursor header (absent on the last page). Pages are cached until the
+    next write (app/core/cache.py) and carry an ETag for If-None-Match.
+    """
+    key = ("incidents", status, event_type, since, until, limit, cursor)
+    version = cache.versions.current  # read before querying, see cache.py
+    hit = cache.responses.get(key, version)
+    if hit is not None:
+        return cache.responses.respond(request, hit)
+
+    Incident = models.Incident
+    q = select(Incident)
+    if status:
+        q = q.where(Incident.status == status.lower())
+    if event_type:
+        q = q.where(Incident.event_type == event_type.lower())
+    since_dt, until_dt = _parse_time(since, "since"), _parse_time(until, "until")
+    if since_dt:
+        q = q.where(Incident.last_seen >= since_dt)
+    if until_dt:
+        q = q.where(Incident.last_seen < until_dt)
+    if cursor:
+        c_ts, c_id = _decode_cursor(cursor)
+        # expanded row comparison: binds c_ts with the column's own type/format
+        q = q.where(or_(
+            Incident.last_seen < c_ts,
+            and_(Incident.last_seen == c_ts, Incident.id < c_id),
+        ))
+    q = q.order_by(Incident.last_seen.desc(), Incident.id.desc()).limit(limit)
+    rows = (await db.execute(q)).scalars().all()
+
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1].last_seen, rows[-1].id)
+    items = [_incident_summary(r) for r in rows]
+    return cache.responses.respond(request, cache.responses.put(key, version, items, headers))
+
+def _incident_summary(r: models.Incident) -> dict:
+    return {
+        "id": r.id,
+        "title": r.title,
+        "summary": r.summary,
+        "count": r.count,
+        "status": r.status,
+        "event_type": r.event_type,
+        "last_seen": r.last_seen.isoformat() if r.last_seen else None,
+    }
+
+def _parse_change_cursor(since: Optional[str]):
+    """"<seq>:<id>" from a previous response, or a bare "<seq>" (0 / empty = from the start)."""
+    if not since:
+        return 0, None
+    try:
+        seq, _, incident_id = since.partition(":")
+        return int(seq), (int(incident_id) if incident_id else None)
+    except ValueError:
+        raise HTTPException(400, "Invalid since: expected a cursor from /incidents/changes")
+
+async def _changes_page(db: AsyncSession, since: Optional[str], limit: int) -> dict:
+    seq, after_id = _parse_change_cursor(since)
+    Incident = models.Incident
+    cond = Incident.change_seq > seq
+    if after_id is not None:
+        cond = or_(cond, and_(Incident.change_seq == seq, Incident.id > after_id))
+    rows = (await db.execute(
+        select(Incident).where(cond).order_by(Incident.change_seq, Incident.id).limit(limit)
+    )).scalars().all()
+    cursor = f"{rows[-1].change_seq}:{rows[-1].id}" if rows else (since or "0")
+    return {
+        "items": [{**_incident_summary(r), "change_seq": r.change_seq} for r in rows],
+        "cursor": cursor,
+        "more": len(rows) == limit,
+    }
+
+@router.get("/incidents/changes")
+async def incident_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="`cursor` from the previous response; omit for everything"),
+    limit: int = Query(settings.incidents_page_default, ge=1, le=settings.incidents_page_max),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Incidents created or updated after `since`, oldest change first. Every
+    committing write stamps the incidents it touched with the next change_seq
+    (app/core/hooks.py), so (change_seq, id) is a monotonic cursor and each
+    poll is an index range scan. Keep calling with the returned `cursor` while
+    `more` is true; an incident changed twice shows up again, with its latest
+    state.
+    """
+    key = ("incident_changes", since, limit)
+    version = cache.versions.current
+    hit = cache.responses.get(key, version)
+    if hit is not None:
+        return cache.responses.respond(request, hit)
+    page = await _changes_page(db, since, limit)
+    return cache.responses.respond(request, cache.responses.put(key, version, page))
+
+@router.get("/incidents/changes/stream")
+async def incident_changes_stream(
+    request: Request,
+    since: Optional[str] = Query(None, description="cursor to start after; Last-Event-ID wins on reconnect"),
+    max_seconds: float = Query(settings.changes_stream_max_seconds, gt=0, le=3600),
+):
+    """
+    Server-Sent Events variant of /incidents/changes: one `changes` event per
+    page (its id is the cursor), a comment line as heartbeat when idle. The
+    stream ends after `max_seconds`; EventSource clients reconnect with
+    Last-Event-ID and resume where they left off.
+    """
+    cursor = request.headers.get("last-event-id") or since
+    _parse_change_cursor(cursor)  # 400 before the stream starts
+    limit = settings.incidents_page_default
+
+    async def _events():
+        nonlocal cursor
+        deadline = time.monotonic() + max_seconds
+        idle_since = time.monotonic()
+        while time.monotonic() < deadline and not await request.is_disconnected():
+            # an empty poll is one index probe, so plain polling is cheap enough
+            async with AsyncSessionLocal() as db:
+                page = await _changes_page(db, cursor, limit)
+            if page["items"]:
+                cursor = page["cursor"]
+                idle_since = time.monotonic()
+                yield f"id: {cursor}\nevent: changes\ndata: {json.dumps(page, separators=(',', ':'))}\n\n"
+                if page["more"]:
+                    continue
+            elif time.monotonic() - idle_since >= settings.changes_heartbeat_seconds:
+                idle_since = time.monotonic()
+                yield ": heartbeat\n\n"
+            await asyncio.sleep(settings.changes_poll_seconds)
+
+    return StreamingResponse(_events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/incidents/{incident_id}")
+async def get_incident(incident_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    key = ("incident", incident_id)
+    version = cache.versions.incident(incident_id)
+    hit = cache.responses.get(key, version)
+    if hit is not None:
+        return cache.responses.respond(request, hit)
+    inc = await db.get(models.Incident, incident_id)
+    if not inc:
+        raise HTTPException(404, "Incident not found")
+    sample = (await db.execute(
+        select(models.Event)
+        .where(models.Event.incident_id == incident_id)
+        .order_by(models.Event.id.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+    text = (await archive.evidence_text_async(db, sample))["redacted"] if sample is not None else ""
+    return cache.responses.respond(request, cache.responses.put(key, version, _incident_payload(inc, text)))
+
+def _incident_payload(inc: models.Incident, sample_redacted: str) -> dict:
+    return {
+        "id": inc.id,
+        "title": inc.title,
+        "summary": inc.summary,
+        "count": inc.count,
+        "status": inc.status,
+        "sample_redacted": sample_redacted,
+    }
+
+@router.post("/incidents/batch")
+def incidents_batch(req: IdsRequest, db: Session = Depends(get_db)):
+    """Same items as GET /incidents/{id}, for many ids in one query (latest event joined in)."""
+    ids = set(req.ids)
+    Event, Incident = models.Event, models.Incident
+    latest = (
+        select(Event.incident_id, func.max(Event.id).label("event_id"))
+        .where(Event.incident_id.in_(ids))
+        .group_by(Event.incident_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Incident, Event)
+        .outerjoin(latest, latest.c.incident_id == Incident.id)
+        .outerjoin(Event, Event.id == latest.c.event_id)
+        .where(Incident.id.in_(ids))
+    ).all()
+    items = [_incident_payload(inc, archive.evidence_text(db, ev)["redacted"] if ev else "") for inc, ev in rows]
+    found = {i["id"] for i in items}
+    return {"items": items, "missing": sorted(ids - found)}
+
+@router.post("/incidents/{incident_id}/suggest_actions")
+def suggest_incident_actions(incident_id: int, request: Request, db: Session = Depends(get_db)):
+    """Playbooks matching the incident's latest event; memoized until a new event arrives."""
+    playbooks.matcher.refresh()  # a rules reload changes the answer too
+    key = ("suggest_actions", incident_id, playbooks.matcher.version)
+    version = cache.versions.incident(incident_id)
+    hit = cache.responses.get(key, version)
+    if hit is not None:
+        return cache.responses.respond(request, hit)
+    Event, Incident = models.Event, models.Incident
+    latest = (
+        select(func.max(Event.id))
+        .where(Event.incident_id == incident_id)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(Event.id, Event.event_type, Event.source, Event.redacted, Event.archive_block_id)
+        .select_from(Incident)
+        .outerjoin(Event, Event.id == latest)
+        .where(Incident.id == incident_id)
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(404, "Incident not found")
+
+    def _load():
+        text = row.redacted or ""
+        if row.archive_block_id is not None:
+            text = archive.archived_text(db, row.archive_block_id, row.id)["redacted"]
+        return row.event_type or "", text, row.source or ""
+
+    res = playbooks.matcher.for_incident(incident_id, row.id, _load)
+    payload = {"incident_id": incident_id, "actions": res["actions"], "playbooks": res["playbooks"]}
+    return cache.responses.respond(request, cache.responses.put(key, version, payload))
+
+@router.post("/incidents/{incident_id}/approve_action")
+def approve_action(incident_id: int, req: ApproveRequest, db: Session = Depends(get_db)):
+    inc = db.query(models.Incident).filter(models.Incident.id == incident_id).first()
+    if not inc:
+        raise HTTPException(404, "Incident not found")
+    rec = models.Approval(incident_id=incident_id, action_name=req.action_name, notes=req.notes or "")
+    db.add(rec)
+    cache.touch(db, [incident_id])
+    db.commit()
+    return {"ok": True, "approval_id": rec.id}
+# vim: set ft=python ts=4 sw=4 expandtab:
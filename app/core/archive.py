@@ -0,0 +1,193 @@
+# app/core/archive.py
+"""
+Compressed evidence archive for cold events.
+
+Events older than EVIDENCE_ARCHIVE_DAYS are packed per incident into
+`evidence_blocks` rows of up to EVIDENCE_BLOCK_EVENTS events. The block is one
+zlib stream of the events' normalized/redacted/raw text. Messages in a cluster
+are near-identical, so they compress very well together. A small JSON offset
+index maps event id → (offset, length) inside the decompressed block. The
+event row keeps its metadata (type, residency, cluster key, incident); its text
+columns are emptied and `archive_block_id` points at the block.
+
+Reads go through `evidence_text()` (`evidence_text_async()` for the async
+endpoints), which returns the columns for hot rows and decompresses only the
+one block for archived rows. A small LRU of
+decompressed blocks absorbs repeated reads of one cluster.
+"""
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.models import Event, EvidenceBlock
+
+EVIDENCE_ARCHIVE_DAYS = int(os.getenv("EVIDENCE_ARCHIVE_DAYS", "3"))
+EVIDENCE_BLOCK_EVENTS = int(os.getenv("EVIDENCE_BLOCK_EVENTS", "1000"))
+EVIDENCE_BLOCK_CACHE = int(os.getenv("EVIDENCE_BLOCK_CACHE", "32"))
+_LEVEL = 9
+
+_FIELDS = ("normalized", "redacted", "raw")
+
+
+class _BlockCache:
+    """LRU of decompressed blocks; blocks are immutable once written."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, block_id: int):
+        with self._lock:
+            item = self._items.get(block_id)
+            if item is not None:
+                self._items.move_to_end(block_id)
+            return item
+
+    def put(self, block_id: int, item) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._items[block_id] = item
+            self._items.move_to_end(block_id)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def discard(self, block_id: int) -> None:
+        with self._lock:
+            self._items.pop(block_id, None)
+
+
+_cache = _BlockCache(EVIDENCE_BLOCK_CACHE)
+
+
+def pack(records: List[dict]) -> tuple:
+    """records: [{"id", "normalized", "redacted", "raw"}] → (compressed, offsets, raw_size)."""
+    buf = bytearray()
+    offsets: Dict[str, list] = {}
+    for r in records:
+        payload = json.dumps([r.get(f) or "" for f in _FIELDS], ensure_ascii=False).encode("utf-8")
+        offsets[str(r["id"])] = [len(buf), len(payload)]
+        buf += payload
+    return zlib.compress(bytes(buf), _LEVEL), offsets, len(buf)
+
+
+def _load_block(db: Session, block_id: int, event_id: int):
+    item = _cache.get(block_id)
+    # a cached block without this event is stale (block id reused after retention)
+    if item is None or str(event_id) not in item[1]:
+        row = db.execute(
+            select(EvidenceBlock.data, EvidenceBlock.offsets).where(EvidenceBlock.id == block_id)
+        ).one_or_none()
+        if row is None:
+            return None
+        item = (zlib.decompress(row.data), json.loads(row.offsets))
+        _cache.put(block_id, item)
+    return item
+
+
+def evidence_text(db: Session, ev: Event) -> Dict[str, str]:
+    """normalized/redacted/raw of an event, from its row or its archive block."""
+    if ev.archive_block_id is None:
+        return {f: getattr(ev, f) or "" for f in _FIELDS}
+    return archived_text(db, ev.archive_block_id, ev.id)
+
+
+async def evidence_text_async(db, ev: Event) -> Dict[str, str]:
+    """evidence_text() for an AsyncSession; hot rows never touch the DB."""
+    if ev.archive_block_id is None:
+        return {f: getattr(ev, f) or "" for f in _FIELDS}
+    return await db.run_sync(evidence_text, ev)
+
+
+def archived_text(db: Session, block_id: int, event_id: int) -> Dict[str, str]:
+    """normalized/redacted/raw of one archived event (decompresses at most one block)."""
+    block = _load_block(db, block_id, event_id)
+    if block is None or str(event_id) not in block[1]:
+        return {f: "" for f in _FIELDS}
+    data, offsets = block
+    off, length = offsets[str(event_id)]
+    values = json.loads(data[off:off + length].decode("utf-8"))
+    return dict(zip(_FIELDS, values))
+
+
+def archive_incident(db: Session, incident_id: int, cutoff: datetime,
+                     block_events: int = EVIDENCE_BLOCK_EVENTS) -> Optional[int]:
+    """
+    Pack up to `block_events` cold, not yet archived events of one incident
+    into a new block. Returns the block id, or None if nothing was cold.
+    Does not commit.
+    """
+    rows = db.execute(
+        select(Event.id, Event.normalized, Event.redacted, Event.raw)
+        .where(Event.incident_id == incident_id, Event.archive_block_id.is_(None),
+               Event.created_at < cutoff)
+        .order_by(Event.id)
+        .limit(block_events)
+    ).all()
+    if not rows:
+        return None
+    data, offsets, raw_size = pack([r._asdict() for r in rows])
+    block = EvidenceBlock(incident_id=incident_id, codec="zlib", n_events=len(rows),
+                          raw_bytes=raw_size, offsets=json.dumps(offsets), data=data)
+    db.add(block)
+    db.flush()
+    db.execute(
+        update(Event)
+        .where(Event.id.in_([r.id for r in rows]))
+        .values(archive_block_id=block.id, normalized="", redacted="", raw="")
+    )
+    return block.id
+
+
+def archive_cold(
+    session_factory: sessionmaker,
+    *,
+    days: int = EVIDENCE_ARCHIVE_DAYS,
+    block_events: int = EVIDENCE_BLOCK_EVENTS,
+    min_events: int = 2,
+    max_blocks: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Archive every incident's cold events, one block (one transaction) at a
+    time. Incidents with fewer than `min_events` cold events are skipped since
+    a block of one message saves nothing.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(days=days)
+    stats = {"blocks": 0, "events": 0, "raw_bytes": 0, "stored_bytes": 0}
+    with session_factory() as db:
+        candidates = db.execute(
+            select(Event.incident_id)
+            .where(Event.archive_block_id.is_(None), Event.created_at < cutoff)
+            .group_by(Event.incident_id)
+            .having(func.count() >= min_events)
+        ).scalars().all()
+    for incident_id in candidates:
+        while max_blocks is None or stats["blocks"] < max_blocks:
+            with session_factory() as db:
+                block_id = archive_incident(db, incident_id, cutoff, block_events)
+                if block_id is None:
+                    break
+                block = db.get(EvidenceBlock, block_id)
+                stats["blocks"] += 1
+                stats["events"] += block.n_events
+                stats["raw_bytes"] += block.raw_bytes
+                stats["stored_bytes"] += len(block.data)
+                n = block.n_events
+                db.commit()
+            if n < block_events:
+                break
+    return stats
+
+
+def forget_block(block_id: int) -> None:
+    _cache.discard(block_id)
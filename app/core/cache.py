@@ -0,0 +1,172 @@
+# app/core/cache.py
+"""
+Read-side response cache for the polled incident endpoints.
+
+Entries are the serialized JSON body plus headers, keyed by endpoint and
+parameters, and tagged with the version they were built at:
+
+- the global version covers list endpoints (GET /incidents);
+- per-incident versions cover GET /incidents/{id} and suggest_actions.
+
+Writers mark the incidents they touch on their session (`touch()`); the
+after-commit hook in app/core/hooks.py bumps those versions once the data is
+visible, so a reader never caches uncommitted state under a new version.
+Every entry carries an `ETag` (hash of the body), and `If-None-Match` gets a
+bodyless 304 even on a miss.
+
+Memory is bounded by entry count and total body bytes, with LRU eviction.
+Versions are per process: with several uvicorn workers, writes in one worker
+don't bump the others, so RESPONSE_CACHE_TTL_SECONDS bounds how stale an entry
+can get (0 = versions only, fine for a single worker).
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, Hashable, Iterable, NamedTuple, Optional, Set
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 << 20)))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))
+# tracked per-incident versions; evicted ones fall back to a conservative floor
+RESPONSE_CACHE_VERSIONS = int(os.getenv("RESPONSE_CACHE_VERSIONS", "100000"))
+
+_TOUCHED = "cache_touched_incidents"
+
+
+class Versions:
+    """Monotonic global version plus LRU-capped per-incident versions."""
+
+    def __init__(self, max_tracked: int = RESPONSE_CACHE_VERSIONS):
+        self.max_tracked = max(1, max_tracked)
+        self._global = 0
+        self._incidents: "OrderedDict[int, int]" = OrderedDict()
+        # an untracked incident reports the newest version ever evicted, so an
+        # entry cached before the eviction can only miss, never go stale
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> int:
+        return self._global
+
+    def incident(self, incident_id: int) -> int:
+        with self._lock:
+            return self._incidents.get(incident_id, self._floor)
+
+    def bump(self, incident_ids: Iterable[int] = ()) -> int:
+        with self._lock:
+            self._global += 1
+            v = self._global
+            for iid in incident_ids:
+                self._incidents[iid] = v
+                self._incidents.move_to_end(iid)
+            while len(self._incidents) > self.max_tracked:
+                _, old = self._incidents.popitem(last=False)
+                self._floor = max(self._floor, old)
+            return v
+
+
+class Entry(NamedTuple):
+    version: int
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    stored: float
+
+
+class ResponseCache:
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE, max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+                 ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.size = size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._items: "OrderedDict[Hashable, Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._not_modified = self._evictions = 0
+
+    def get(self, key: Hashable, version: int) -> Optional[Entry]:
+        with self._lock:
+            e = self._items.get(key)
+            if e is not None and e.version == version and (self.ttl <= 0 or time.monotonic() - e.stored < self.ttl):
+                self._items.move_to_end(key)
+                self._hits += 1
+                return e
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, version: int, payload, headers: Optional[Dict[str, str]] = None) -> Entry:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = Entry(version, body, '"' + blake2b(body, digest_size=12).hexdigest() + '"',
+                      dict(headers or {}), time.monotonic())
+        if self.size <= 0 or len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._items[key] = entry
+            self._bytes += len(body)
+            while self._items and (len(self._items) > self.size or self._bytes > self.max_bytes):
+                _, ev = self._items.popitem(last=False)
+                self._bytes -= len(ev.body)
+                self._evictions += 1
+        return entry
+
+    def respond(self, request: Request, entry: Entry) -> Response:
+        """200 with the cached body, or 304 when If-None-Match already has this ETag."""
+        headers = {**entry.headers, "ETag": entry.etag}
+        inm = request.headers.get("if-none-match")
+        if inm and (inm.strip() == "*" or entry.etag in (t.strip() for t in inm.split(","))):
+            with self._lock:
+                self._not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_entries": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "not_modified": self._not_modified,
+                "evictions": self._evictions,
+            }
+
+
+def touch(session, incident_ids: Iterable[int]) -> None:
+    """Mark incidents changed by this session's transaction (versions bump after commit)."""
+    session.info.setdefault(_TOUCHED, set()).update(incident_ids)
+
+
+def touched(session) -> Set[int]:
+    """Incidents marked by `touch()` in the session's current transaction."""
+    return session.info.get(_TOUCHED) or set()
+
+
+def on_commit(session) -> None:
+    touched = session.info.pop(_TOUCHED, None)
+    if touched is not None:
+        versions.bump(touched)
+
+
+def on_rollback(session) -> None:
+    session.info.pop(_TOUCHED, None)
+
+
+versions = Versions()
+responses = ResponseCache()
@@ -0,0 +1,160 @@
+# app/core/counters.py
+"""
+O(1) metrics: counters kept in the `counters` table and bumped by ingest and
+status changes in the same transaction, so /metrics never scans events.
+
+Counter rows are (name, key) → value:
+    events               ""           total events ingested
+    incidents            ""           total incidents
+    incidents_by_status  open/noise/closed
+    events_by_type       <event_type>
+    events_by_residency  <residency_tag>
+    change_seq           ""           last commit sequence handed out (`next_seq()`)
+
+`rebuild()` recomputes everything from the raw tables (reconciliation),
+including events that retention already folded into `noise_rollups`.
+"""
+from collections import Counter as _Tally
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.db import dialect_insert
+from app.core.models import Counter, Event, Incident, NoiseRollup
+
+Deltas = Dict[Tuple[str, str], int]
+
+# rows per upsert: 3 bound params per row keeps us under SQLite's 999 limit
+_BUMP_CHUNK = 300
+
+
+def bump(db: Session, deltas: Deltas) -> None:
+    """Add deltas to counters (one upsert statement). Does not commit."""
+    rows = [
+        {"name": name, "key": key or "", "value": v}
+        for (name, key), v in sorted(deltas.items())  # stable order avoids lock-order deadlocks
+        if v
+    ]
+    if not rows:
+        return
+    upsert = dialect_insert(db)
+    if upsert is None:
+        for r in rows:
+            c = db.get(Counter, (r["name"], r["key"]))
+            if c is None:
+                db.add(Counter(**r))
+            else:
+                c.value += r["value"]
+        db.flush()
+        return
+    table = Counter.__table__
+    for i in range(0, len(rows), _BUMP_CHUNK):
+        stmt = upsert(table).values(rows[i:i + _BUMP_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.name, table.c.key],
+            set_={"value": table.c.value + stmt.excluded.value},
+        )
+        db.execute(stmt)
+
+
+def next_seq(db: Session, name: str = "change_seq") -> int:
+    """
+    Increment a sequence row and return the new value. The row stays locked
+    until the transaction ends, so sequence order is commit order: a reader
+    that has seen seq N can never later find a commit with a smaller one.
+    """
+    upsert = dialect_insert(db)
+    if upsert is None:
+        c = db.get(Counter, (name, ""), with_for_update=True)
+        if c is None:
+            c = Counter(name=name, key="", value=0)
+            db.add(c)
+        c.value += 1
+        db.flush()
+        return c.value
+    table = Counter.__table__
+    stmt = upsert(table).values(name=name, key="", value=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.name, table.c.key],
+        set_={"value": table.c.value + 1},
+    ).returning(table.c.value)
+    return db.execute(stmt).scalar_one()
+
+
+def status_change(deltas: Deltas, old: str, new: str) -> None:
+    """Record an incident status transition into a deltas dict."""
+    if old != new:
+        deltas[("incidents_by_status", old)] = deltas.get(("incidents_by_status", old), 0) - 1
+        deltas[("incidents_by_status", new)] = deltas.get(("incidents_by_status", new), 0) + 1
+
+
+def new_incidents(upserted: Iterable) -> Deltas:
+    """Deltas for the incidents an upsert created (items with `.inserted` / `.status`)."""
+    deltas: Deltas = {}
+    for u in upserted:
+        if u.inserted:
+            for k in (("incidents", ""), ("incidents_by_status", u.status)):
+                deltas[k] = deltas.get(k, 0) + 1
+    return deltas
+
+
+def event_deltas(deltas: Deltas, event_type: str, residency_tag: str) -> None:
+    """Record one ingested event into a deltas dict."""
+    for k in (("events", ""), ("events_by_type", event_type or ""), ("events_by_residency", residency_tag or "")):
+        deltas[k] = deltas.get(k, 0) + 1
+
+
+def read_all(db: Session) -> Dict[str, Dict[str, int]]:
+    out: Dict[str, Dict[str, int]] = {}
+    for name, key, value in db.execute(select(Counter.name, Counter.key, Counter.value)):
+        out.setdefault(name, {})[key] = value
+    return out
+
+
+def rebuild(db: Session) -> Dict[str, Dict[str, int]]:
+    """Recompute all counters from events/incidents. Does not commit."""
+    tally: _Tally = _Tally()
+    tally[("events", "")] = db.scalar(select(func.count()).select_from(Event)) or 0
+    tally[("incidents", "")] = db.scalar(select(func.count()).select_from(Incident)) or 0
+    for status, n in db.execute(select(Incident.status, func.count()).group_by(Incident.status)):
+        tally[("incidents_by_status", status or "")] = n
+    for et, n in db.execute(select(Event.event_type, func.count()).group_by(Event.event_type)):
+        tally[("events_by_type", et or "")] = n
+    for tag, n in db.execute(select(Event.residency_tag, func.count()).group_by(Event.residency_tag)):
+        tally[("events_by_residency", tag or "")] = n
+    # events deleted by retention live on as rollup counts
+    tally[("events", "")] += db.scalar(select(func.coalesce(func.sum(NoiseRollup.count), 0))) or 0
+    for et, n in db.execute(select(NoiseRollup.event_type, func.sum(NoiseRollup.count)).group_by(NoiseRollup.event_type)):
+        tally[("events_by_type", et or "")] += n
+    for tag, n in db.execute(
+        select(NoiseRollup.residency_tag, func.sum(NoiseRollup.count)).group_by(NoiseRollup.residency_tag)
+    ):
+        tally[("events_by_residency", tag or "")] += n
+    # not an aggregate, but a rebuild must never move the change feed backwards
+    tally[("change_seq", "")] = max(
+        db.scalar(select(func.max(Counter.value)).where(Counter.name == "change_seq")) or 0,
+        db.scalar(select(func.max(Incident.change_seq))) or 0,
+    )
+
+    db.execute(delete(Counter))
+    rows = [{"name": name, "key": key, "value": v} for (name, key), v in tally.items()]
+    db.execute(insert(Counter), rows)
+    return read_all(db)
+
+
+def seed_if_empty(db: Session) -> bool:
+    """Rebuild counters once for databases that predate the table. Does not commit."""
+    if db.scalar(select(Counter.name).limit(1)) is not None:
+        return False
+    rebuild(db)
+    return True
+
+
+def seed_change_seq(db: Session) -> bool:
+    """Start the change_seq row past every stamped incident if it is missing. Does not commit."""
+    if db.get(Counter, ("change_seq", "")) is not None:
+        return False
+    db.add(Counter(name="change_seq", key="", value=db.scalar(select(func.max(Incident.change_seq))) or 0))
+    db.flush()
+    return True
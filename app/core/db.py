@@ -1,21 +1,185 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import Optional
 import os
 
+from app.core import telemetry
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./soc.db")
 
-# For SQLite, check_same_thread=False for multithreaded FastAPI
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+# Named performance profiles (DB_PROFILE). PRAGMAs only apply to SQLite, pool
+# settings only to pooled (non-:memory:) engines.
+#   dev         SQLAlchemy/SQLite defaults (rollback journal, full sync)
+#   sqlite-wal  WAL so readers don't block behind ingest writes, synchronous=NORMAL,
+#               bigger page cache + mmap, busy timeout instead of instant "locked"
+#   postgres    larger pool with pre-ping/recycle for a server database
+PROFILES = {
+    "dev": {
+        "pragmas": {},
+        "pool": {},
+        "query_cache_size": 500,
+        "cached_statements": 128,
+    },
+    "sqlite-wal": {
+        "pragmas": {
+            "auto_vacuum": "INCREMENTAL",  # only takes effect on a new DB file
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "cache_size": -65536,      # KiB (64 MiB)
+            "mmap_size": 268435456,    # 256 MiB
+            "temp_store": "MEMORY",
+        },
+        "pool": {"pool_size": 10, "max_overflow": 10, "pool_pre_ping": False},
+        "query_cache_size": 1200,
+        "cached_statements": 512,
+    },
+    "postgres": {
+        "pragmas": {},
+        "pool": {"pool_size": 10, "max_overflow": 20, "pool_pre_ping": True, "pool_recycle": 1800},
+        "query_cache_size": 1200,
+        "cached_statements": 128,
+    },
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "dev")
+
+
+def _env_overrides(pool: dict) -> dict:
+    pool = dict(pool)
+    if os.getenv("DB_POOL_SIZE"):
+        pool["pool_size"] = int(os.environ["DB_POOL_SIZE"])
+    if os.getenv("DB_MAX_OVERFLOW"):
+        pool["max_overflow"] = int(os.environ["DB_MAX_OVERFLOW"])
+    if os.getenv("DB_POOL_PRE_PING"):
+        pool["pool_pre_ping"] = os.environ["DB_POOL_PRE_PING"].lower() == "true"
+    return pool
+
+
+def _resolve(url: str, profile: str):
+    if profile not in PROFILES:
+        raise ValueError(f"unknown DB_PROFILE {profile!r}; expected one of {sorted(PROFILES)}")
+    is_sqlite = url.startswith("sqlite")
+    in_memory = is_sqlite and (":memory:" in url or url.partition("://")[2] in ("", "/"))
+    return PROFILES[profile], is_sqlite, in_memory
+
+
+def _install_pragmas(sync_engine, pragmas: dict) -> None:
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cur.execute(f"PRAGMA {name}={value}")
+        finally:
+            cur.close()
+
+
+def build_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE, **overrides):
+    """Create an engine for `url` tuned by the named profile (see PROFILES)."""
+    prof, is_sqlite, in_memory = _resolve(url, profile)
+
+    kwargs = {"query_cache_size": prof["query_cache_size"]}
+    if is_sqlite:
+        # check_same_thread=False for multithreaded FastAPI
+        kwargs["connect_args"] = {"check_same_thread": False, "cached_statements": prof["cached_statements"]}
+    if not in_memory:
+        kwargs.update(_env_overrides(prof["pool"]))
+    kwargs.update(overrides)
+    eng = create_engine(url, **kwargs)
+
+    if is_sqlite and prof["pragmas"]:
+        _install_pragmas(eng, prof["pragmas"])
+    # per-statement timing, per-request query counts, slow query log
+    telemetry.instrument_engine(eng)
+    return eng
+
+
+# ----- asyncio engine for read-only endpoints -----
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    """The asyncio-driver URL for a sync one: sqlite → aiosqlite, postgresql → asyncpg."""
+    scheme, sep, rest = url.partition("://")
+    driver = _ASYNC_DRIVERS.get(scheme.split("+")[0])
+    if driver is None:
+        raise ValueError(f"no asyncio driver known for {scheme!r}; set ASYNC_DATABASE_URL")
+    return driver + sep + rest
+
+
+def build_async_engine(url: Optional[str] = None, profile: str = DB_PROFILE, **overrides):
+    """
+    AsyncEngine for `url` (default ASYNC_DATABASE_URL, else async_url(DATABASE_URL))
+    with the same profile as build_engine. A sqlite :memory: URL gives a
+    separate database from the sync engine's.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = url or os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+    prof, is_sqlite, in_memory = _resolve(url, profile)
+
+    kwargs = {"query_cache_size": prof["query_cache_size"]}
+    if is_sqlite:
+        kwargs["connect_args"] = {"cached_statements": prof["cached_statements"]}
+    if not in_memory:
+        kwargs.update(_env_overrides(prof["pool"]))
+    kwargs.update(overrides)
+    eng = create_async_engine(url, **kwargs)
+
+    # events and PRAGMAs go through the sync facade
+    if is_sqlite and prof["pragmas"]:
+        _install_pragmas(eng.sync_engine, prof["pragmas"])
+    telemetry.instrument_engine(eng.sync_engine)
+    return eng
+
+
+engine = build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def dialect_insert(db):
+    """Dialect `insert()` with ON CONFLICT support (SQLite/Postgres), else None."""
+    name = db.get_bind().dialect.name
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Built on first use, so the sync-only paths (scripts, ingest workers) don't
+# need aiosqlite/asyncpg + greenlet installed.
+_async_engine = None
+_AsyncSessionLocal = None
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_engine = build_async_engine()
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _AsyncSessionLocal()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    eng, _async_engine, _AsyncSessionLocal = _async_engine, None, None
+    if eng is not None:
+        await eng.dispose()
@@ -3,34 +3,78 @@
 SQLAlchemy hooks to enforce data invariants at the ORM layer.
 
 Ensures every Event row gets attached to an Incident based on its cluster_key
-before insert, preventing NULL incident_id errors.
+before it is flushed, preventing NULL incident_id errors. All pending events in
+a flush are resolved with one upsert on the distinct cluster keys instead of a
+session + query per INSERT.
+
+Before a commit, the incidents the transaction touched are stamped with the
+next `change_seq` (the change feed, GET /incidents/changes); after it, their
+response-cache versions are bumped (app/core/cache.py).
 """
-from sqlalchemy import event
+from sqlalchemy import event, update
 from sqlalchemy.orm import Session
 
+from app.core import cache, counters
+from app.core.db import SessionLocal
+from app.core.incidents import upsert_incidents
 from app.core.models import Event, Incident
 
-print("[hooks] registering SQLAlchemy listeners")
+# ids per UPDATE ... WHERE id IN (...), under SQLite's bound-parameter limit
+_STAMP_CHUNK = 500
 
-@event.listens_for(Event, "before_insert")
-def _attach_incident_before_insert(mapper, connection, target: Event):
-    """Ensure target.incident_id is set using target.cluster_key."""
-    if getattr(target, "incident_id", None) is not None:
+# Scoped to the app's session factory, not every Session in the process.
+@event.listens_for(SessionLocal, "before_flush")
+def _attach_incidents_before_flush(session: Session, flush_context, instances):
+    """Set incident_id on pending Events from their cluster_key (one statement per flush)."""
+    new_events = [obj for obj in session.new if isinstance(obj, Event)]
+    if not new_events:
         return
+    pending = [
+        ev for ev in new_events
+        if ev.incident_id is None and ev.incident is None and ev.cluster_key
+    ]
+
+    # ORM-added events bypass ingest_batch, so their counters are bumped here
+    deltas: counters.Deltas = {}
+    for ev in new_events:
+        counters.event_deltas(deltas, (ev.event_type or "").lower(), ev.residency_tag)
+
+    if pending:
+        first = {}
+        for ev in pending:
+            first.setdefault(ev.cluster_key, ev)
+        ids = upsert_incidents(session, [
+            {"cluster_key": ck, "status": "open", "event_type": (ev.event_type or "").lower(), "count": 0}
+            for ck, ev in first.items()
+        ], deltas)
+        for ev in pending:
+            ev.incident_id = ids[ev.cluster_key].id
+    counters.bump(session, deltas)
+
 
-    cluster_key = getattr(target, "cluster_key", None)
-    if not cluster_key:
-        # Can't map to an incident without cluster_key; upstream should ensure it exists.
+@event.listens_for(SessionLocal, "before_commit")
+def _stamp_change_seq(session: Session):
+    """One sequence number per committing transaction, on every incident it touched."""
+    session.flush()  # commit flushes after this hook; ORM-added events touch incidents there
+    touched = sorted(cache.touched(session))
+    if not touched:
         return
+    seq = counters.next_seq(session)
+    table = Incident.__table__
+    for i in range(0, len(touched), _STAMP_CHUNK):
+        session.execute(
+            update(table)
+            .where(table.c.id.in_(touched[i:i + _STAMP_CHUNK]))
+            # keep last_seen: its onupdate would otherwise fire for approvals etc.
+            .values(change_seq=seq, last_seen=table.c.last_seen)
+        )
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_cache_versions(session: Session):
+    cache.on_commit(session)
+
 
-    # Use a short-lived Session bound to the same connection performing the INSERT.
-    db = Session(bind=connection)
-    try:
-        incident = db.query(Incident).filter_by(cluster_key=cluster_key).one_or_none()
-        if incident is None:
-            incident = Incident(cluster_key=cluster_key, status="open")
-            db.add(incident)
-            db.flush()  # ensure incident.id
-        target.incident_id = incident.id
-    finally:
-        db.close()
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_cache_touches(session: Session):
+    cache.on_rollback(session)
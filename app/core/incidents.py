@@ -0,0 +1,122 @@
+# app/core/incidents.py
+"""
+Atomic incident get-or-create keyed on the unique `incidents.cluster_key`.
+
+On SQLite and Postgres this is `INSERT ... ON CONFLICT (cluster_key) DO NOTHING
+RETURNING` (the rows we created) followed by `ON CONFLICT DO UPDATE ... RETURNING`
+for the keys that already existed, so concurrent workers can't create duplicate
+incidents for one cluster and every new incident is counted exactly once.
+Other dialects fall back to query-then-insert.
+"""
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core import cache, counters
+from app.core.db import dialect_insert
+from app.core.models import Incident
+
+# rows per statement: 6 bound params per row keeps us under SQLite's 999 limit
+_UPSERT_CHUNK = 150
+
+
+class Upserted(NamedTuple):
+    id: int
+    count: int
+    status: str
+    inserted: bool  # created by this call
+
+
+def upsert_incidents(
+    db: Session, rows: List[dict], deltas: Optional[counters.Deltas] = None
+) -> Dict[str, Upserted]:
+    """
+    Get-or-create incidents in bulk. Each row needs `cluster_key`, `title`,
+    `status`, `event_type` and `count`; `count` is added to an existing
+    incident's count.
+    Keys must be distinct. Returns {cluster_key: Upserted}.
+
+    New incidents are recorded in `deltas` when given (the caller bumps them
+    with its own counters), otherwise bumped here in the same transaction.
+    """
+    out: Dict[str, Upserted] = {}
+    if not rows:
+        return out
+    insert = dialect_insert(db)
+    if insert is None:
+        out = _upsert_incidents_fallback(db, rows)
+    else:
+        table = Incident.__table__
+        cols = (table.c.cluster_key, table.c.id, table.c.count, table.c.status)
+        for i in range(0, len(rows), _UPSERT_CHUNK):
+            chunk = [
+                {
+                    "cluster_key": r["cluster_key"],
+                    "title": r.get("title", ""),
+                    "summary": r.get("summary", ""),
+                    "count": r.get("count", 0),
+                    "status": r.get("status", "open"),
+                    "event_type": r.get("event_type", ""),
+                }
+                for r in rows[i:i + _UPSERT_CHUNK]
+            ]
+            # rows returned here are exactly the ones this statement inserted
+            stmt = insert(table).values(chunk).on_conflict_do_nothing(
+                index_elements=[table.c.cluster_key]
+            ).returning(*cols)
+            for ck, iid, cnt, status in db.execute(stmt):
+                out[ck] = Upserted(iid, cnt, status, True)
+
+            existing = [r for r in chunk if r["cluster_key"] not in out]
+            if not existing:
+                continue
+            stmt = insert(table).values(existing)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.cluster_key],
+                set_={
+                    "count": table.c.count + stmt.excluded.count,
+                    "last_seen": func.now(),
+                },
+            ).returning(*cols)
+            for ck, iid, cnt, status in db.execute(stmt):
+                out[ck] = Upserted(iid, cnt, status, False)
+
+    # cached reads of these incidents go stale once the transaction commits
+    cache.touch(db, [u.id for u in out.values()])
+    new = counters.new_incidents(out.values())
+    if deltas is None:
+        counters.bump(db, new)
+    else:
+        for k, v in new.items():
+            deltas[k] = deltas.get(k, 0) + v
+    return out
+
+
+def _upsert_incidents_fallback(db: Session, rows: List[dict]) -> Dict[str, Upserted]:
+    out: Dict[str, Upserted] = {}
+    for r in rows:
+        inc = db.execute(
+            select(Incident).where(Incident.cluster_key == r["cluster_key"])
+        ).scalar_one_or_none()
+        inserted = inc is None
+        if inserted:
+            inc = Incident(
+                cluster_key=r["cluster_key"],
+                title=r.get("title", ""),
+                summary=r.get("summary", ""),
+                count=0,
+                status=r.get("status", "open"),
+                event_type=r.get("event_type", ""),
+            )
+            db.add(inc)
+        inc.count = (inc.count or 0) + r.get("count", 0)
+        db.flush()
+        out[inc.cluster_key] = Upserted(inc.id, inc.count, inc.status, inserted)
+    return out
+
+
+def upsert_incident(db: Session, cluster_key: str, title: str = "", status: str = "open") -> int:
+    """Get-or-create one incident by cluster_key; returns its id."""
+    res = upsert_incidents(db, [{"cluster_key": cluster_key, "title": title, "status": status, "count": 0}])
+    return res[cluster_key].id
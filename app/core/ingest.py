@@ -0,0 +1,188 @@
+# app/core/ingest.py
+"""
+Set-based ingest: run the pure pipeline stages over a whole batch, then touch
+the DB once per stage instead of once per event.
+
+    1. redact (+ entity pseudonyms) / normalize / cluster_key for every event (no DB)
+    2. one INSERT ... ON CONFLICT upsert for the distinct cluster keys, which
+       creates missing incidents and bumps counts atomically
+    3. one bulk INSERT for the events rows
+    4. one summary/status update per touched incident; noise incidents are
+       promoted by the in-memory fail→success detector (app/pipeline/promotion.py)
+    5. one counters upsert for /metrics
+
+With CLUSTER_MODE=session the cluster key comes from the actor's open session
+(app/pipeline/sessionize.py) instead of the time bucket, and the sessions the
+batch touched are upserted into `cluster_sessions` so a restart picks them up.
+"""
+from collections import Counter as _Tally
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+import app.core.models as models
+from app.core import counters
+from app.core.db import dialect_insert
+from app.core.incidents import upsert_incidents
+from app.core.telemetry import stage
+from app.pipeline import sessionize
+from app.pipeline.executor import prepare_events
+from app.pipeline.clustering import incident_title
+from app.pipeline.promotion import detector, event_epoch
+from app.pipeline.summarizer import summarize_incident
+
+# rows per statement: 7 bound params per row keeps us under SQLite's 999 limit
+_SESSION_CHUNK = 140
+
+def ingest_batch(
+    db: Session,
+    events: Iterable[dict],
+    *,
+    default_tag: str,
+    store_raw: bool,
+    benign_types: Set[str],
+    critical_types: Set[str],
+) -> int:
+    """
+    Ingest a batch of already-validated event dicts. Does not commit; the caller
+    owns the transaction. Returns the number of events ingested.
+
+    Semantics match the per-event loop: benign (and not critical) event types
+    land in `noise` incidents, everything else in `open` ones.
+    """
+    # ----- 1. pure stages over the whole batch -----
+    # (large batches fan out to the process pool, see app/pipeline/executor.py)
+    events = list(events)
+    prepared = [
+        (evt, red, norm_cluster, ck, tag, who)
+        for evt, (red, norm_cluster, ck, tag, who) in zip(events, prepare_events(events, default_tag))
+    ]
+    if not prepared:
+        return 0
+    epochs = [event_epoch(evt.get("ts")) for evt, *_ in prepared]
+
+    # session mode: assigned in arrival order, in this process (the index is stateful)
+    sessions: Dict[str, sessionize.OpenSession] = {}
+    if sessionize.enabled():
+        restore_sessions(db)
+        for i, ((evt, red, norm_cluster, _, tag, who), ts) in enumerate(zip(prepared, epochs)):
+            s = sessionize.index.assign(sessionize.session_key(evt, *who), ts)
+            sessions[s.cluster_key] = s
+            prepared[i] = (evt, red, norm_cluster, s.cluster_key, tag, who)
+
+    # first event per key decides title/status of a new incident
+    first_by_key: Dict[str, dict] = {}
+    hits: Dict[str, int] = {}
+    last_red: Dict[str, str] = {}
+    benign_keys: Set[str] = set()
+    promotions: Dict[str, str] = {}
+    for (evt, red, _, ck, _, (user, ip)), ts in zip(prepared, epochs):
+        first_by_key.setdefault(ck, evt)
+        hits[ck] = hits.get(ck, 0) + 1
+        last_red[ck] = red
+        et_lower = (evt.get("event_type") or "").lower()
+        benign = et_lower in benign_types and et_lower not in critical_types
+        if benign:
+            benign_keys.add(ck)
+        promo = detector.observe(user, ip, et_lower, ts)
+        if promo and benign:
+            promotions[ck] = promo
+
+    # ----- 2. one atomic get-or-create (+ count increment) for all keys -----
+    deltas: counters.Deltas = _Tally()
+    with stage("incident_upsert"):
+        incidents = upsert_incidents(db, [
+            {
+                "cluster_key": ck,
+                "title": incident_title(evt),
+                "event_type": (evt.get("event_type") or "").lower(),
+                "count": hits[ck],
+                "status": "noise" if ck in benign_keys else "open",  # noise excluded from "active" metrics
+            }
+            for ck, evt in first_by_key.items()
+        ], deltas)
+    if sessions:
+        for ck, s in sessions.items():
+            s.incident_id = incidents[ck].id
+        save_sessions(db, sessions.values())
+
+    # ----- 3. bulk-insert events -----
+    event_rows = [
+        {
+            "source": evt.get("source", ""),
+            "event_type": (evt.get("event_type") or "").lower(),
+            "raw": evt.get("message", "") if store_raw else "",
+            "normalized": norm_cluster,
+            "redacted": red,
+            "residency_tag": tag,
+            "cluster_key": ck,
+            "incident_id": incidents[ck].id,
+        }
+        for evt, red, norm_cluster, ck, tag, _ in prepared
+    ]
+    with stage("event_insert"):
+        db.execute(insert(models.Event), event_rows)
+
+    # ----- 4. one summary (and maybe status) update per incident -----
+    for evt, _, _, _, tag, _ in prepared:
+        counters.event_deltas(deltas, (evt.get("event_type") or "").lower(), tag)
+    updates = []
+    for ck, (iid, count, status, _) in incidents.items():
+        row = {"id": iid, "summary": summarize_incident(last_red[ck], count)}
+        if ck in promotions and status == "noise":
+            row.update(status="open", summary=promotions[ck])
+            counters.status_change(deltas, "noise", "open")
+        updates.append(row)
+    with stage("incident_update"):
+        db.execute(update(models.Incident), updates)
+
+    # ----- 5. metrics counters, same transaction -----
+    with stage("counters"):
+        counters.bump(db, deltas)
+
+    return len(prepared)
+
+
+def save_sessions(db: Session, sessions: Iterable[sessionize.OpenSession]) -> None:
+    """Upsert the state of `sessions` into `cluster_sessions` (caller commits)."""
+    rows = [
+        {"cluster_key": s.cluster_key, "event_type": s.key[0], "user": s.key[1], "ip": s.key[2],
+         "start_ts": s.start, "last_ts": s.last, "incident_id": s.incident_id}
+        for s in sessions
+    ]
+    insert_ = dialect_insert(db)
+    if insert_ is None:
+        for r in rows:
+            db.merge(models.ClusterSession(**r))
+        return
+    table = models.ClusterSession.__table__
+    for i in range(0, len(rows), _SESSION_CHUNK):
+        stmt = insert_(table).values(rows[i:i + _SESSION_CHUNK])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.cluster_key],
+            set_={"start_ts": stmt.excluded.start_ts, "last_ts": stmt.excluded.last_ts,
+                  "incident_id": stmt.excluded.incident_id},
+        ))
+
+
+def restore_sessions(db: Session) -> int:
+    """
+    Rebuild the in-memory session index from `cluster_sessions` once per
+    process: sessions whose last event is within a gap of the newest one,
+    newest first, up to the index's cap. Returns how many were re-opened.
+    """
+    index = sessionize.index
+    if index.loaded:
+        return 0
+    S = models.ClusterSession
+    newest = db.execute(select(func.max(S.last_ts))).scalar()
+    rows = [] if newest is None else db.execute(
+        select(S).where(S.last_ts >= newest - index.gap).order_by(S.last_ts.desc()).limit(index.max_sessions)
+    ).scalars()
+    added = index.restore(
+        sessionize.OpenSession((r.event_type, r.user, r.ip), r.cluster_key, r.start_ts, r.last_ts, r.incident_id)
+        for r in rows
+    )
+    index.loaded = True
+    return added
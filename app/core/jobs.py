@@ -0,0 +1,150 @@
+# app/core/jobs.py
+"""
+Bounded in-process ingest queue for the opt-in async mode of /ingest/logs.
+
+The endpoint validates the batch, `submit()`s it and answers 202 with a job id;
+a small pool of worker threads runs the normal ingest pipeline in micro-batches
+and records progress on the job. When the queue is full `submit()` raises
+`QueueFull` so the API can answer 429 instead of piling up memory; after
+shutdown it raises `QueueClosed` (503).
+"""
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+QueueFull = queue.Full
+
+
+class QueueClosed(Exception):
+    """Raised by submit() once shutdown() has started."""
+
+
+_STOP = object()
+
+
+class IngestJob:
+    __slots__ = ("id", "status", "total", "ingested", "error_count", "errors",
+                 "created_at", "started_at", "finished_at", "events")
+
+    def __init__(self, job_id: str, events: List):
+        self.id = job_id
+        self.status = "queued"  # queued/running/done/failed
+        self.total = len(events)
+        self.ingested = 0
+        self.error_count = 0
+        self.errors: List[str] = []
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events = events
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "ingested": self.ingested,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestQueue:
+    """
+    handler(events) must ingest and commit one micro-batch and return the number
+    of events ingested; it runs on worker threads.
+    """
+
+    def __init__(self, handler: Callable[[List], int], maxsize: int = 100, workers: int = 2,
+                 chunk_size: int = 500, max_jobs: int = 10_000):
+        self._handler = handler
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._n_workers = max(1, workers)
+        self._chunk = max(1, chunk_size)
+        self._max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    # ----- lifecycle -----
+    def _ensure_started(self):
+        if self._threads:
+            return
+        for i in range(self._n_workers):
+            t = threading.Thread(target=self._worker, name=f"ingest-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def shutdown(self, timeout: float = 30.0) -> None:
+        """Stop accepting jobs, let workers drain what is queued, then join them."""
+        with self._lock:
+            self._closed = True
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)  # FIFO: lands behind every queued job
+        deadline = time.time() + timeout
+        for t in threads:
+            t.join(max(0.0, deadline - time.time()))
+
+    # ----- API -----
+    def submit(self, events: List) -> IngestJob:
+        with self._lock:
+            if self._closed:
+                raise QueueClosed("ingest queue is shutting down")
+            self._ensure_started()
+            job = IngestJob(f"{int(time.time())}-{next(self._ids)}", events)
+            self._queue.put_nowait(job)  # raises QueueFull
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize(), "capacity": self._queue.maxsize,
+                "workers": len(self._threads), "tracked_jobs": len(self._jobs)}
+
+    # ----- internals -----
+    def _evict(self):
+        # drop the oldest finished jobs once we track too many
+        while len(self._jobs) > self._max_jobs:
+            for jid, j in self._jobs.items():
+                if j.status in ("done", "failed"):
+                    del self._jobs[jid]
+                    break
+            else:
+                return
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: IngestJob):
+        job.status = "running"
+        job.started_at = time.time()
+        events, job.events = job.events, []
+        for i in range(0, len(events), self._chunk):
+            chunk = events[i:i + self._chunk]
+            try:
+                job.ingested += self._handler(chunk)
+            except Exception as e:
+                job.error_count += len(chunk)
+                if len(job.errors) < 20:
+                    job.errors.append(f"events {i}-{i + len(chunk) - 1}: {type(e).__name__}: {e}")
+        job.status = "failed" if job.error_count and not job.ingested else "done"
+        job.finished_at = time.time()
@@ -1,20 +1,39 @@
 # app/core/models.py
 from typing import Optional
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, func
+from sqlalchemy import String, Integer, Float, DateTime, Text, ForeignKey, Index, LargeBinary, func
+from sqlalchemy.dialects import sqlite
 from app.core.db import Base
 
+# Second-resolution timestamps on SQLite so bound params compare equal to
+# CURRENT_TIMESTAMP values (keyset cursors rely on exact ties on last_seen).
+_Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (
+        # keyset pagination on (last_seen, id), optionally narrowed by status / event_type
+        Index("ix_incidents_last_seen_id", "last_seen", "id"),
+        Index("ix_incidents_status_last_seen_id", "status", "last_seen", "id"),
+        Index("ix_incidents_event_type_last_seen_id", "event_type", "last_seen", "id"),
+        # change feed (GET /incidents/changes) scans (change_seq, id) forward
+        Index("ix_incidents_change_seq_id", "change_seq", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255))
-    cluster_key: Mapped[str] = mapped_column(String(255), index=True)
+    cluster_key: Mapped[str] = mapped_column(String(255), index=True, unique=True)
     summary: Mapped[str] = mapped_column(Text, default="")
     count: Mapped[int] = mapped_column(Integer, default=0)
     status: Mapped[str] = mapped_column(String(50), default="open")  # open/noise/closed
+    event_type: Mapped[str] = mapped_column(String(100), default="")
     last_seen: Mapped["DateTime"] = mapped_column(
-        DateTime, server_default=func.now(), onupdate=func.now()
+        _Timestamp, server_default=func.now(), onupdate=func.now()
     )
+    # commit sequence of the last transaction that touched the incident (app/core/hooks.py)
+    change_seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     events = relationship("Event", back_populates="incident", cascade="all, delete-orphan")
 
@@ -30,9 +49,25 @@ class Event(Base):
     cluster_key: Mapped[str] = mapped_column(String(255), index=True)
     created_at: Mapped["DateTime"] = mapped_column(DateTime, server_default=func.now())
     incident_id: Mapped[int] = mapped_column(Integer, ForeignKey("incidents.id"), index=True, nullable=False)
+    # set once the text columns were moved into a compressed block (app/core/archive.py)
+    archive_block_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("evidence_blocks.id"), index=True, nullable=True
+    )
 
     incident = relationship("Incident", back_populates="events")
 
+class EvidenceBlock(Base):
+    """zlib-compressed normalized/redacted/raw text of up to N archived events of one incident."""
+    __tablename__ = "evidence_blocks"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    incident_id: Mapped[int] = mapped_column(Integer, index=True)
+    codec: Mapped[str] = mapped_column(String(10), default="zlib")
+    n_events: Mapped[int] = mapped_column(Integer, default=0)
+    raw_bytes: Mapped[int] = mapped_column(Integer, default=0)  # uncompressed size
+    offsets: Mapped[str] = mapped_column(Text, default="")  # JSON {event_id: [offset, length]}
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped["DateTime"] = mapped_column(DateTime, server_default=func.now())
+
 class Approval(Base):
     __tablename__ = "approvals"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -41,3 +76,44 @@ class Approval(Base):
     approved_by: Mapped[str] = mapped_column(String(100), default="human@operator")
     approved_at: Mapped["DateTime"] = mapped_column(DateTime, server_default=func.now())
     notes: Mapped[str] = mapped_column(Text, default="")
+
+class Counter(Base):
+    """Incrementally maintained aggregates behind /metrics (see app/core/counters.py)."""
+    __tablename__ = "counters"
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)   # events/incidents/events_by_type/...
+    key: Mapped[str] = mapped_column(String(100), primary_key=True, default="")  # "" for totals
+    value: Mapped[int] = mapped_column(Integer, default=0)
+
+class NoiseRollup(Base):
+    """Aggregate left behind when retention deletes old event rows (see app/core/retention.py)."""
+    __tablename__ = "noise_rollups"
+    __table_args__ = (
+        Index("ux_noise_rollups_bucket", "incident_id", "bucket_start", "event_type", "residency_tag", unique=True),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    incident_id: Mapped[int] = mapped_column(Integer, ForeignKey("incidents.id"), index=True, nullable=False)
+    cluster_key: Mapped[str] = mapped_column(String(255), default="")
+    event_type: Mapped[str] = mapped_column(String(100), default="")
+    residency_tag: Mapped[str] = mapped_column(String(4), default="")
+    bucket_start: Mapped["DateTime"] = mapped_column(_Timestamp)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    first_seen: Mapped["DateTime"] = mapped_column(_Timestamp)
+    last_seen: Mapped["DateTime"] = mapped_column(_Timestamp)
+    sample_redacted: Mapped[str] = mapped_column(Text, default="")
+
+class SchemaMeta(Base):
+    """Key/value bookkeeping for app/core/schema.py (the applied schema version)."""
+    __tablename__ = "schema_meta"
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[str] = mapped_column(String(100), default="")
+
+class ClusterSession(Base):
+    """Open-session state for CLUSTER_MODE=session, reloaded at startup (app/pipeline/sessionize.py)."""
+    __tablename__ = "cluster_sessions"
+    cluster_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(100), default="")
+    user: Mapped[str] = mapped_column(String(100), default="")  # pseudonyms, as in the cluster key
+    ip: Mapped[str] = mapped_column(String(100), default="")
+    start_ts: Mapped[float] = mapped_column(Float)  # event-time epoch seconds
+    last_ts: Mapped[float] = mapped_column(Float, index=True)
+    incident_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -0,0 +1,221 @@
+# app/core/retention.py
+"""
+Time-based retention for the events table.
+
+Events of incidents whose status has a retention age (RETENTION_NOISE_DAYS,
+RETENTION_CLOSED_DAYS, RETENTION_OPEN_DAYS; 0 keeps forever) are folded into
+`noise_rollups` rows (count per time bucket, first/last seen, one sample
+redacted message) and then deleted. Work happens in chunks of
+RETENTION_CHUNK_SIZE events, one short transaction each, so ingest is never
+blocked behind one big DELETE. `compact()` then hands freed pages back with
+SQLite's incremental vacuum.
+
+Incident counts and the /metrics counters are untouched: they already include
+the deleted rows, and `counters.rebuild()` adds rollups back in.
+
+Run it with `scripts/retention.py`, or in the API process every
+RETENTION_INTERVAL_SECONDS (0 = off) via `RetentionWorker`.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, delete, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import archive, cache
+from app.core.db import dialect_insert
+from app.core.models import Event, EvidenceBlock, Incident, NoiseRollup
+
+logger = logging.getLogger("soc_copilot.retention")
+
+RETENTION_CHUNK_SIZE = int(os.getenv("RETENTION_CHUNK_SIZE", "2000"))
+RETENTION_BUCKET_SECONDS = int(os.getenv("RETENTION_BUCKET_SECONDS", "3600"))
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "0"))
+RETENTION_VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", "2000"))
+
+
+def policy_from_env() -> Dict[str, int]:
+    """Incident status → max event age in days (0 = keep forever)."""
+    return {
+        "noise": int(os.getenv("RETENTION_NOISE_DAYS", "7")),
+        "closed": int(os.getenv("RETENTION_CLOSED_DAYS", "90")),
+        "open": int(os.getenv("RETENTION_OPEN_DAYS", "0")),
+    }
+
+
+def _bucket(ts: datetime, seconds: int) -> datetime:
+    epoch = int(ts.replace(tzinfo=timezone.utc).timestamp()) // seconds * seconds
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _upsert_rollups(db: Session, rows: list) -> None:
+    insert = dialect_insert(db)
+    if insert is None:
+        for r in rows:
+            ru = db.execute(select(NoiseRollup).filter_by(
+                incident_id=r["incident_id"], bucket_start=r["bucket_start"],
+                event_type=r["event_type"], residency_tag=r["residency_tag"],
+            )).scalar_one_or_none()
+            if ru is None:
+                db.add(NoiseRollup(**r))
+            else:
+                ru.count += r["count"]
+                ru.first_seen = min(ru.first_seen, r["first_seen"])
+                ru.last_seen = max(ru.last_seen, r["last_seen"])
+        db.flush()
+        return
+    t = NoiseRollup.__table__
+    # 9 bound params per row keeps each statement under SQLite's 999 limit
+    for i in range(0, len(rows), 100):
+        stmt = insert(t).values(rows[i:i + 100])
+        ex = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.incident_id, t.c.bucket_start, t.c.event_type, t.c.residency_tag],
+            set_={
+                "count": t.c.count + ex.count,
+                "first_seen": case((ex.first_seen < t.c.first_seen, ex.first_seen), else_=t.c.first_seen),
+                "last_seen": case((ex.last_seen > t.c.last_seen, ex.last_seen), else_=t.c.last_seen),
+                "sample_redacted": ex.sample_redacted,
+            },
+        )
+        db.execute(stmt)
+
+
+def _roll_up_chunk(db: Session, status: str, cutoff: datetime, chunk: int, bucket_seconds: int) -> int:
+    """Roll up and delete at most `chunk` expired events of one status. Does not commit."""
+    rows = db.execute(
+        select(Event.id, Event.incident_id, Event.cluster_key, Event.event_type,
+               Event.residency_tag, Event.created_at, Event.redacted, Event.archive_block_id)
+        .join(Incident, Incident.id == Event.incident_id)
+        .where(Incident.status == status, Event.created_at < cutoff)
+        .order_by(Event.id)
+        .limit(chunk)
+    ).all()
+    if not rows:
+        return 0
+    agg: Dict[Tuple, dict] = {}
+    blocks = set()
+    for _, iid, ck, et, tag, created, red, block_id in rows:
+        if block_id is not None:
+            blocks.add(block_id)
+        key = (iid, _bucket(created, bucket_seconds), et or "", tag or "")
+        r = agg.get(key)
+        if r is None:
+            agg[key] = {
+                "incident_id": iid, "cluster_key": ck or "", "event_type": key[2],
+                "residency_tag": key[3], "bucket_start": key[1], "count": 1,
+                "first_seen": created, "last_seen": created, "sample_redacted": red or "",
+            }
+        else:
+            r["count"] += 1
+            r["first_seen"] = min(r["first_seen"], created)
+            r["last_seen"] = max(r["last_seen"], created)
+            if not r["sample_redacted"]:  # archived rows keep their text in a block
+                r["sample_redacted"] = red or ""
+    _upsert_rollups(db, list(agg.values()))
+    cache.touch(db, {r["incident_id"] for r in agg.values()})
+    db.execute(delete(Event).where(Event.id.in_([r[0] for r in rows])))
+    if blocks:
+        # evidence blocks whose events are all gone now
+        still_used = select(Event.archive_block_id).where(Event.archive_block_id.in_(blocks))
+        db.execute(delete(EvidenceBlock).where(EvidenceBlock.id.in_(blocks), EvidenceBlock.id.not_in(still_used)))
+        for block_id in blocks:
+            archive.forget_block(block_id)
+    return len(rows)
+
+
+def run_retention(
+    session_factory: sessionmaker,
+    *,
+    policy: Optional[Dict[str, int]] = None,
+    now: Optional[datetime] = None,
+    chunk: int = RETENTION_CHUNK_SIZE,
+    bucket_seconds: int = RETENTION_BUCKET_SECONDS,
+    max_chunks: Optional[int] = None,
+    pause: float = 0.0,
+    stop: Optional[threading.Event] = None,
+) -> Dict[str, int]:
+    """
+    Apply the retention policy; commits once per chunk. Returns events deleted
+    per status. `pause` sleeps between chunks to leave room for ingest writes.
+    """
+    policy = policy_from_env() if policy is None else policy
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    deleted = {status: 0 for status in policy}
+    chunks = 0
+    for status, days in policy.items():
+        if days <= 0:
+            continue
+        cutoff = now - timedelta(days=days)
+        while max_chunks is None or chunks < max_chunks:
+            if stop is not None and stop.is_set():
+                return deleted
+            with session_factory() as db:
+                n = _roll_up_chunk(db, status, cutoff, chunk, bucket_seconds)
+                db.commit()
+            chunks += 1
+            deleted[status] += n
+            if n < chunk:
+                break
+            if pause:
+                time.sleep(pause)
+    return deleted
+
+
+def compact(engine: Engine, pages: int = RETENTION_VACUUM_PAGES, *, enable: bool = False) -> dict:
+    """
+    Give free pages back to the filesystem, `pages` at a time (SQLite only).
+    Incremental vacuum needs auto_vacuum=INCREMENTAL; an existing DB only gets
+    that through one full VACUUM, which `enable=True` runs (it locks the DB).
+    """
+    if engine.dialect.name != "sqlite":
+        return {"skipped": f"{engine.dialect.name}: rely on autovacuum"}
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        mode = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+        if mode != 2:
+            if not enable:
+                return {"skipped": "auto_vacuum is not INCREMENTAL (run with --enable-incremental-vacuum once)"}
+            conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+            conn.execute(text("VACUUM"))
+        before = conn.execute(text("PRAGMA freelist_count")).scalar()
+        conn.execute(text(f"PRAGMA incremental_vacuum({int(pages)})"))
+        after = conn.execute(text("PRAGMA freelist_count")).scalar()
+    return {"freed_pages": before - after, "free_pages_left": after}
+
+
+class RetentionWorker:
+    """Daemon thread running retention + compaction every `interval` seconds."""
+
+    def __init__(self, session_factory: sessionmaker, engine: Engine, interval: int = RETENTION_INTERVAL_SECONDS):
+        self._factory = session_factory
+        self._engine = engine
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                deleted = run_retention(self._factory, pause=0.05, stop=self._stop)
+                if any(deleted.values()):
+                    logger.info("retention deleted %s; compact %s", deleted, compact(self._engine))
+            except Exception:
+                logger.exception("retention run failed")
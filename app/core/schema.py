@@ -0,0 +1,146 @@
+# app/core/schema.py
+"""
+Create/upgrade the schema at startup. `create_all` only creates missing tables,
+so columns and indexes added to existing tables are applied here, idempotently.
+
+The full check (reflection of every table plus the upgrade steps) runs only
+when the version stored in `schema_meta` differs from `schema_version()`, a
+fingerprint of the models' tables, columns and indexes plus UPGRADE_STEPS.
+Bump UPGRADE_STEPS when an upgrade step changes without a model change.
+"""
+import hashlib
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core import counters
+from app.core.db import Base
+from app.core.models import SchemaMeta
+
+UPGRADE_STEPS = 1
+_VERSION_KEY = "version"
+_version = None
+
+
+def schema_version() -> str:
+    global _version
+    if _version is None:
+        h = hashlib.sha1(str(UPGRADE_STEPS).encode())
+        for table in Base.metadata.sorted_tables:
+            h.update(table.name.encode())
+            for col in table.columns:
+                h.update(f"|{col.name}:{col.type!r}:{col.nullable}:{col.primary_key}".encode())
+            for ix in sorted(table.indexes, key=lambda i: i.name):
+                h.update(f"|{ix.name}:{[c.name for c in ix.columns]}:{ix.unique}".encode())
+        _version = f"{UPGRADE_STEPS}-{h.hexdigest()[:16]}"
+    return _version
+
+
+def stored_version(engine: Engine):
+    """The schema version recorded by the last ensure_schema(), or None (no table / never recorded)."""
+    try:
+        with engine.connect() as conn:
+            return conn.scalar(select(SchemaMeta.value).where(SchemaMeta.key == _VERSION_KEY))
+    except DBAPIError:
+        return None
+
+
+def _add_incident_event_type(conn) -> None:
+    conn.execute(text("ALTER TABLE incidents ADD COLUMN event_type VARCHAR(100) DEFAULT ''"))
+    # backfill from each incident's first event so the event_type filter sees old rows
+    conn.execute(text(
+        "UPDATE incidents SET event_type = COALESCE(("
+        " SELECT lower(e.event_type) FROM events e WHERE e.incident_id = incidents.id"
+        " ORDER BY e.id LIMIT 1), '')"
+    ))
+
+
+def _add_incident_change_seq(conn) -> None:
+    conn.execute(text("ALTER TABLE incidents ADD COLUMN change_seq INTEGER DEFAULT 0 NOT NULL"))
+    # existing incidents enter the change feed once, in id order
+    conn.execute(text("UPDATE incidents SET change_seq = id"))
+
+
+def _has_unique_cluster_key(insp) -> bool:
+    for ix in insp.get_indexes("incidents"):
+        if ix.get("unique") and ix.get("column_names") == ["cluster_key"]:
+            return True
+    return any(
+        uc.get("column_names") == ["cluster_key"] for uc in insp.get_unique_constraints("incidents")
+    )
+
+
+def _merge_duplicate_incidents(conn) -> int:
+    """
+    Fold incidents sharing a cluster_key into the oldest one: re-point events and
+    approvals, sum counts, keep the latest last_seen, and keep `open` if any copy
+    was open. Returns the number of incidents removed.
+    """
+    dups = conn.execute(text(
+        "SELECT cluster_key, MIN(id), SUM(count), MAX(last_seen),"
+        " SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END), COUNT(*)"
+        " FROM incidents GROUP BY cluster_key HAVING COUNT(*) > 1"
+    )).all()
+    removed = 0
+    for ck, keep, total, last_seen, n_open, n in dups:
+        params = {"ck": ck, "keep": keep}
+        others = "SELECT id FROM incidents WHERE cluster_key = :ck AND id <> :keep"
+        conn.execute(text(f"UPDATE events SET incident_id = :keep WHERE incident_id IN ({others})"), params)
+        conn.execute(text(f"UPDATE approvals SET incident_id = :keep WHERE incident_id IN ({others})"), params)
+        conn.execute(text(
+            "UPDATE incidents SET count = :total, last_seen = :last_seen"
+            + (", status = 'open'" if n_open else "")
+            + " WHERE id = :keep"
+        ), {**params, "total": total or 0, "last_seen": last_seen})
+        conn.execute(text("DELETE FROM incidents WHERE cluster_key = :ck AND id <> :keep"), params)
+        removed += n - 1
+    return removed
+
+
+def _ensure_unique_cluster_key(conn) -> None:
+    """Upgrade pre-upsert DBs: dedupe incidents, then swap the plain index for a unique one."""
+    _merge_duplicate_incidents(conn)
+    if any(ix["name"] == "ix_incidents_cluster_key" for ix in inspect(conn).get_indexes("incidents")):
+        conn.execute(text("DROP INDEX ix_incidents_cluster_key"))
+    conn.execute(text("CREATE UNIQUE INDEX ix_incidents_cluster_key ON incidents (cluster_key)"))
+
+
+def ensure_schema(engine: Engine, force: bool = False) -> bool:
+    """Bring the DB up to the models. Returns False (and does nothing) when it already is."""
+    if not force and stored_version(engine) == schema_version():
+        return False
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        insp = inspect(conn)
+        cols = {c["name"] for c in insp.get_columns("incidents")}
+        if "event_type" not in cols:
+            _add_incident_event_type(conn)
+        if "change_seq" not in cols:
+            _add_incident_change_seq(conn)
+        if "archive_block_id" not in {c["name"] for c in insp.get_columns("events")}:
+            conn.execute(text("ALTER TABLE events ADD COLUMN archive_block_id INTEGER REFERENCES evidence_blocks(id)"))
+        # ON CONFLICT (cluster_key) needs a unique index; older DBs only had a plain one
+        if not _has_unique_cluster_key(insp):
+            _ensure_unique_cluster_key(conn)
+        # indexes declared on the models but missing from older tables
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    # DBs from before the counters table start with it empty; reconcile once
+    with Session(engine) as db:
+        counters.seed_if_empty(db)
+        counters.seed_change_seq(db)
+        _record_version(db)
+        db.commit()
+    return True
+
+
+def _record_version(db: Session) -> None:
+    row = db.get(SchemaMeta, _VERSION_KEY)
+    if row is None:
+        db.add(SchemaMeta(key=_VERSION_KEY, value=schema_version()))
+    else:
+        row.value = schema_version()
+    db.flush()
@@ -0,0 +1,93 @@
+# app/core/settings.py
+"""
+Validated API settings, read from the environment (and .env) once per process.
+
+Field names are the lowercase environment variable names: DEFAULT_RESIDENCY_TAG
+→ `default_residency_tag`. Unset variables keep the defaults below; a bad value
+fails app startup with the variable's name instead of surfacing on the first
+request that reads it. Comma-separated variables become lists/sets.
+
+Lower-level modules (db, cache, retention, pipeline) still read their own
+variables at import; `load_env()` runs before the app imports them, so .env
+applies to those too.
+"""
+import os
+from functools import lru_cache
+from typing import FrozenSet, List, Mapping, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load .env into os.environ (existing variables win). Idempotent."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+class Settings(BaseModel):
+    model_config = {"frozen": True}
+
+    default_residency_tag: str = "SA"
+    store_raw: bool = False
+    benign_types: FrozenSet[str] = frozenset({"auth_success"})
+    critical_types: FrozenSet[str] = frozenset(
+        {"auth_failure", "mfa_bypass", "api_key_use", "privilege_escalation"}
+    )
+    cors_allow_origins: List[str] = ["*"]
+    # streaming ingest: events per committed micro-batch, hard cap per NDJSON line
+    ingest_stream_batch: int = Field(500, ge=1)
+    ingest_max_line_bytes: int = Field(1 << 20, ge=1)
+    # async ingest (?mode=async): bounded queue + worker pool; 429 + Retry-After when full
+    ingest_queue_size: int = Field(100, ge=1)
+    ingest_workers: int = Field(2, ge=1)
+    ingest_retry_after: int = Field(5, ge=0)
+    # GET /incidents and /incidents/changes page size
+    incidents_page_default: int = Field(100, ge=1)
+    incidents_page_max: int = Field(1000, ge=1)
+    # GET /incidents/changes/stream: DB poll interval, idle heartbeat, stream lifetime
+    changes_poll_seconds: float = Field(1.0, gt=0)
+    changes_heartbeat_seconds: float = Field(15.0, gt=0)
+    changes_stream_max_seconds: float = Field(300.0, gt=0, le=3600)
+
+    @field_validator("benign_types", "critical_types", mode="before")
+    @classmethod
+    def _lower_csv(cls, v):
+        if isinstance(v, str):
+            v = v.split(",")
+        return frozenset(t.strip().lower() for t in v if t.strip())
+
+    @field_validator("cors_allow_origins", mode="before")
+    @classmethod
+    def _csv(cls, v):
+        if isinstance(v, str):
+            v = v.split(",")
+        return [o.strip() for o in v if o.strip()] or ["*"]
+
+    @model_validator(mode="after")
+    def _page_bounds(self):
+        if self.incidents_page_default > self.incidents_page_max:
+            raise ValueError("INCIDENTS_PAGE_DEFAULT must not exceed INCIDENTS_PAGE_MAX")
+        return self
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "Settings":
+        env = os.environ if env is None else env
+        values = {name: env[name.upper()] for name in cls.model_fields if name.upper() in env}
+        try:
+            return cls.model_validate(values)
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']).upper() or 'settings'}: {err['msg']}" for err in e.errors()
+            )
+            raise ValueError(f"invalid settings: {problems}") from None
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    load_env()
+    return Settings.from_env()
@@ -0,0 +1,245 @@
+# app/core/telemetry.py
+"""
+Low-overhead in-process telemetry, exported in Prometheus text format at
+GET /metrics/prometheus.
+
+- `Histogram`: fixed buckets, one list of counts per label set; an observation
+  is a bisect plus a short critical section.
+- `stage(name)`: times one ingest stage into soc_ingest_stage_seconds.
+- `TelemetryMiddleware`: per-endpoint latency (route template, not raw path, so
+  label cardinality stays bounded) plus DB queries/time per request.
+- `instrument_engine()`: cursor-execute hooks that time every SQL statement,
+  attribute it to the current request and log statements slower than
+  SLOW_QUERY_MS.
+
+TELEMETRY_ENABLED=false turns all of it into no-ops.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+sql_logger = logging.getLogger("soc_copilot.sql")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+
+def _labels_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List]:
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, s in sorted(self.snapshot().items()):
+            cum = 0
+            for bound, n in zip(self.buckets + (float("inf"),), s):
+                cum += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                le_label = 'le="' + le + '"'
+                out.append(f"{self.name}_bucket{_labels_text(self.labels, labels, le_label)} {cum}")
+            out.append(f"{self.name}_sum{_labels_text(self.labels, labels)} {s[-2]:.6f}")
+            out.append(f"{self.name}_count{_labels_text(self.labels, labels)} {s[-1]}")
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        out += [f"{self.name}{_labels_text(self.labels, k)} {v:g}" for k, v in items]
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+http_latency = Histogram("soc_http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"))
+http_queries = Histogram("soc_http_request_db_queries", "SQL statements per request.", ("route",), COUNT_BUCKETS)
+http_db_time = Histogram("soc_http_request_db_seconds", "Time spent in SQL per request.", ("route",))
+stage_latency = Histogram("soc_ingest_stage_seconds", "Ingest stage latency per batch.", ("stage",))
+db_latency = Histogram("soc_db_query_duration_seconds", "SQL statement latency.", ("verb",))
+slow_queries = Counter("soc_db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.", ("verb",))
+
+METRICS = [http_latency, http_queries, http_db_time, stage_latency, db_latency, slow_queries]
+
+
+# ----- ingest stages -----
+class _NoTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+@contextmanager
+def _timer(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency.observe(time.perf_counter() - t0, name)
+
+
+def stage(name: str):
+    """`with stage("redact"): ...` records the block into soc_ingest_stage_seconds."""
+    return _timer(name) if TELEMETRY_ENABLED else _NO_TIMER
+
+
+# ----- per-request SQL accounting -----
+# [queries, seconds] for the request being served; a mutable list so the
+# threadpool's copied context writes back into the same object
+_request_sql: ContextVar[Optional[List]] = ContextVar("request_sql", default=None)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    verb = statement.lstrip()[:6].upper().rstrip()
+    db_latency.observe(elapsed, verb)
+    acc = _request_sql.get()
+    if acc is not None:
+        acc[0] += 1
+        acc[1] += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_queries.inc(verb)
+        sql_logger.warning("slow query %.1f ms: %s", elapsed * 1000, statement[:500])
+
+
+def _on_error(ctx):
+    # a failed statement never reaches after_cursor_execute; drop its start time
+    conn = ctx.connection
+    starts = conn.info.get("query_start") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine) -> None:
+    if not TELEMETRY_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+
+# ----- ASGI middleware -----
+class TelemetryMiddleware:
+    """Pure ASGI (no BaseHTTPMiddleware) so streaming responses stay streaming."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TELEMETRY_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        acc = [0, 0.0]
+        token = _request_sql.set(acc)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _request_sql.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_latency.observe(elapsed, scope.get("method", ""), path, str(status[0]))
+            http_queries.observe(acc[0], path)
+            http_db_time.observe(acc[1], path)
+
+
+def render(extra: Optional[List[str]] = None) -> str:
+    lines: List[str] = []
+    for m in METRICS:
+        lines += m.render()
+    if extra:
+        lines += extra
+    return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help: str, samples: Dict[Tuple[Tuple[str, str], ...], float]) -> List[str]:
+    """Text lines for a gauge given {((label, value), ...): sample}."""
+    out = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, v in sorted(samples.items()):
+        names = tuple(k for k, _ in labels)
+        values = tuple(val for _, val in labels)
+        out.append(f"{name}{_labels_text(names, values)} {v:g}")
+    return out
+
+
+def reset() -> None:
+    for m in METRICS:
+        m.reset()
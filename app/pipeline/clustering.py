@@ -1,7 +1,11 @@
 # app/pipeline/clustering.py
 from hashlib import blake2b
 from datetime import datetime, timezone, timedelta
-import os, re
+import os
+
+from app.pipeline import sessionize
+from app.pipeline.pii_redactor import pseudonym
+from app.pipeline.promotion import event_epoch
 
 # Allow tuning via env: 900s = 15 minutes
 _BUCKET_SECONDS = int(os.getenv("CLUSTER_BUCKET_SECONDS", "900"))
@@ -9,19 +13,6 @@ _BUCKET_SECONDS = int(os.getenv("CLUSTER_BUCKET_SECONDS", "900"))
 def _safe(s): 
     return (s or "").strip().lower()
 
-def _extract_user(norm_msg: str) -> str:
-    # works on our normalized text e.g., "successful login for user [redacted:email] from [redacted:ip]"
-    m = re.search(r"user\s+([^\s\]]+)", norm_msg, flags=re.I)
-    return (m.group(1) or "").lower() if m else ""
-
-def _extract_ip(norm_msg: str) -> str:
-    # prefers explicit IP; falls back to the token that appears after 'from'
-    m = re.search(r"\b(\d{1,3}(?:\.\d{1,3}){3})\b", norm_msg)
-    if m: 
-        return m.group(1)
-    m2 = re.search(r"from\s+([^\s\]]+)", norm_msg, flags=re.I)
-    return (m2.group(1) or "").lower() if m2 else ""
-
 def _to_bucket(ts: str | None, bucket_seconds: int = _BUCKET_SECONDS) -> tuple[str, tuple[int,int]]:
     """
     Returns (bucket_key, (start_epoch, end_epoch))
@@ -37,9 +28,19 @@ def _to_bucket(ts: str | None, bucket_seconds: int = _BUCKET_SECONDS) -> tuple[s
     end = start + bucket_seconds - 1
     return str(start // bucket_seconds), (start, end)
 
-def cluster_key(evt: dict, norm_cluster: str, bucket_seconds: int = _BUCKET_SECONDS) -> str:
-    user = _safe(evt.get("user")) or _extract_user(norm_cluster)
-    ip   = _safe(evt.get("ip"))   or _extract_ip(norm_cluster)
+def actor(evt: dict, entities: dict | None = None) -> tuple[str, str]:
+    """
+    (user, ip) pseudonyms of an event: explicit fields first, else the entities
+    the redaction scan found in the message (see redact_entities). An email
+    stands in for a missing "user <name>" token.
+    """
+    ents = entities or {}
+    user = pseudonym("user", evt.get("user")) or ents.get("user") or ents.get("email", "")
+    ip   = pseudonym("ip", evt.get("ip"))     or ents.get("ip", "")
+    return user, ip
+
+def cluster_key(evt: dict, entities: dict | None = None, bucket_seconds: int = _BUCKET_SECONDS) -> str:
+    user, ip = actor(evt, entities)
     et   = _safe(evt.get("event_type"))
     bkt, _ = _to_bucket(evt.get("ts"), bucket_seconds)
 
@@ -52,11 +53,21 @@ def incident_title(evt: dict) -> str:
     user = _safe(evt.get("user"))
     return f"{et or 'event'} cluster for {user or 'unknown'}"
 
-def explain_cluster(evt: dict, norm_cluster: str, bucket_seconds: int = _BUCKET_SECONDS) -> dict:
-    """Return features used for clustering (for UI/explainability)."""
-    user = _safe(evt.get("user")) or _extract_user(norm_cluster)
-    ip   = _safe(evt.get("ip"))   or _extract_ip(norm_cluster)
+def explain_cluster(evt: dict, entities: dict | None = None, bucket_seconds: int = _BUCKET_SECONDS) -> dict:
+    """
+    Return features used for clustering (for UI/explainability); user/ip are pseudonyms.
+    With CLUSTER_MODE=session the window is the actor's open session (or the
+    one this event would open) instead of the time bucket.
+    """
+    user, ip = actor(evt, entities)
     et   = _safe(evt.get("event_type"))
+    if sessionize.enabled():
+        key = sessionize.session_key(evt, user, ip)
+        ts = event_epoch(evt.get("ts"))
+        s = sessionize.index.find(key, ts) or sessionize.OpenSession(
+            key, sessionize.session_cluster_key(key, ts), ts, ts)
+        tokens = {"event_type": et, "user": user, "ip": ip, "session_start": str(int(s.start))}
+        return {"tokens": tokens, "window": sessionize.index.window(s)}
     bkt_key, (start_epoch, end_epoch) = _to_bucket(evt.get("ts"), bucket_seconds)
     window = {
         "bucket_seconds": bucket_seconds,
@@ -0,0 +1,106 @@
+# app/pipeline/executor.py
+"""
+Runs the pure, CPU-bound pipeline stages (redaction + entity pseudonyms in one
+scan, normalization, cluster key hashing, residency tagging) for a batch and
+returns one (redacted, normalized, cluster_key, residency_tag, actor) tuple per
+event, in order. `actor` is the (user, ip) pseudonym pair; no raw identifier
+leaves this module.
+
+Small batches run in-process. Batches of at least PIPELINE_PARALLEL_THRESHOLD
+events are split into PIPELINE_CHUNK_SIZE chunks and fanned out to a shared
+ProcessPoolExecutor so the regex/hash work isn't pinned to one core by the GIL.
+multiprocessing is only imported once a pool is actually needed.
+"""
+import os
+from threading import Lock
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from app.pipeline.normalizer import normalize_event
+from app.pipeline.pii_redactor import redact_entities_batch, residency_tag
+from app.pipeline.clustering import actor, cluster_key
+from app.core.telemetry import stage
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+# Pool processes per API process; 1 (default) keeps everything in-process.
+# The pool is per uvicorn worker, so size it as cores / uvicorn workers; 0 means
+# os.cpu_count(), which only makes sense with a single uvicorn worker.
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "1"))
+PIPELINE_PARALLEL_THRESHOLD = int(os.getenv("PIPELINE_PARALLEL_THRESHOLD", "5000"))
+PIPELINE_CHUNK_SIZE = int(os.getenv("PIPELINE_CHUNK_SIZE", "1000"))
+
+Prepared = Tuple[str, str, str, str, Tuple[str, str]]
+
+_pool: Optional["ProcessPoolExecutor"] = None
+_pool_lock = Lock()
+
+
+def _prepare_chunk(events: List[dict], default_tag: str) -> List[Prepared]:
+    # stage timings only reach /metrics/prometheus when this runs in-process
+    with stage("redact"):
+        scanned = redact_entities_batch([evt.get("message", "") for evt in events])
+    with stage("normalize"):
+        norms = [normalize_event({**evt, "message": red}) for evt, (red, _) in zip(events, scanned)]
+    with stage("cluster_key"):
+        actors = [actor(evt, ents) for evt, (_, ents) in zip(events, scanned)]
+        keys = [cluster_key(evt, ents) for evt, (_, ents) in zip(events, scanned)]
+    with stage("residency"):
+        tags = [residency_tag(evt, default_tag) for evt in events]
+    return list(zip([red for red, _ in scanned], norms, keys, tags, actors))
+
+
+def mp_context():
+    """forkserver where available, else spawn; shared by every process pool we start."""
+    # Never fork: the API process already runs ingest/threadpool threads and DB
+    # pools, and a forked child can inherit locks held by those threads.
+    import multiprocessing
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _get_pool(workers: int) -> "ProcessPoolExecutor":
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context())
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def prepare_events(
+    events: List[dict],
+    default_tag: str,
+    *,
+    threshold: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> List[Prepared]:
+    """
+    Return (redacted, normalized, cluster_key, residency_tag, actor) per event,
+    in input order. The pool is sized from PIPELINE_WORKERS once, on first use.
+    """
+    workers = PIPELINE_WORKERS or (os.cpu_count() or 1)
+    threshold = PIPELINE_PARALLEL_THRESHOLD if threshold is None else threshold
+    chunk_size = chunk_size or PIPELINE_CHUNK_SIZE
+
+    if workers <= 1 or len(events) < threshold:
+        return _prepare_chunk(events, default_tag)
+
+    chunks = [events[i:i + chunk_size] for i in range(0, len(events), chunk_size)]
+    pool = _get_pool(workers)
+    out: List[Prepared] = []
+    with stage("prepare_pool"):
+        # map() yields chunk results in submission order
+        for part in pool.map(_prepare_chunk, chunks, [default_tag] * len(chunks)):
+            out.extend(part)
+    return out
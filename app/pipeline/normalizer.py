@@ -1,4 +1,3 @@
-import re
 from typing import Dict
 
 def normalize_event(evt: Dict) -> str:
@@ -8,6 +7,5 @@ def normalize_event(evt: Dict) -> str:
         if k in evt and evt[k]:
             msg_parts.append(str(evt[k]))
     msg = " ".join(msg_parts) if msg_parts else str(evt)
-    msg = msg.lower()
-    msg = re.sub(r"\s+", " ", msg).strip()
-    return msg
+    # str.split() collapses the same whitespace as \s+, without a regex pass
+    return " ".join(msg.lower().split())
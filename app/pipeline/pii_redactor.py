@@ -1,12 +1,25 @@
 # app/pipeline/pii_redactor.py
+import hashlib
+import hmac
+import os
 import re
-from typing import Tuple
-from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+# Key for entity pseudonyms. Pseudonyms only need to be stable across
+# processes/restarts; set a secret in production so they can't be reversed by
+# hashing a list of known emails/IPs.
+PSEUDONYM_KEY = (os.getenv("PSEUDONYM_KEY") or "soc-copilot-dev-pseudonym-key").encode("utf-8")
+
+# Local part / domain are length-bounded (RFC 5321 limits) so a long run of
+# word characters without an "@" can't make the scan quadratic.
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,63}\b")
 IPV4_RE  = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
 PHONE_RE = re.compile(r"\b(?:\+?\d{1,2}[ -]?)?(?:\(\d{3}\)|\d{3})[ -]?\d{3}[ -]?\d{4}\b")
-CARD_RE  = re.compile(r"\b(?:\d[ -]*?){13,16}\b")
+# Card candidates: 13–19 digits with at most one space/hyphen between digits.
+# Every repetition must consume a digit, so matching is linear in the input
+# (the old `(?:\d[ -]*?){13,16}` backtracked on long digit/space runs).
+CARD_RE  = re.compile(r"\b\d(?:[ -]?\d){12,18}\b")
 
 # Export patterns for reuse (e.g., evidence aggregation)
 REDACTION_PATTERNS = {
@@ -16,22 +29,130 @@ REDACTION_PATTERNS = {
     "CARD": CARD_RE,
 }
 
-def _apply(pattern: re.Pattern, label: str, s: str, counts: dict) -> str:
-    def _repl(_m):
+# Single-pass scanner. Alternation order is the precedence when two classes
+# could start at the same offset: EMAIL > IP > CARD (Luhn-checked) > PHONE.
+# Every pattern starts with \b, so it is hoisted and checked once per offset;
+# the numeric classes are only tried where a digit (or "(" / "+") follows.
+# USER is not redacted: it consumes "user " and only peeks at the token after
+# it (e.g. "login for user alice from ..."), so the token is still scanned.
+_PRECEDENCE = ("EMAIL", "IP", "CARD", "PHONE")
+_USER_CTX = r"(?P<USER_CTX>(?i:user)\s+(?=(?P<USER>[^\s\[\]][^\s\]]*)))"
+
+def _alt(label: str) -> str:
+    return f"(?P<{label}>{REDACTION_PATTERNS[label].pattern[2:]})"
+
+_SCAN_RE = re.compile(
+    r"\b(?:" + _alt("EMAIL") + "|" + _USER_CTX
+    + r"|(?=[\d(+])(?:" + "|".join(_alt(l) for l in _PRECEDENCE[1:]) + "))"
+)
+
+# entity → pseudonym domain; an email is a user identifier
+_ENTITY_DOMAIN = {"EMAIL": "user", "USER": "user", "IP": "ip"}
+
+
+def _luhn_ok(digits: str) -> bool:
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = ord(ch) - 48
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def _redact_card_span(span: str, counts: Dict[str, int], entities: Optional[Dict[str, str]]) -> str:
+    """
+    Redact the longest Luhn-valid card prefix of a CARD candidate, then keep
+    scanning the remainder. Non-card digit runs fall back to PHONE.
+    """
+    ends = [i + 1 for i, ch in enumerate(span) if ch.isdigit()]
+    for n in range(min(len(ends), 19), 12, -1):
+        end = ends[n - 1]
+        # prefix must end on a token boundary, same as the trailing \b
+        if end < len(span) and span[end].isdigit():
+            continue
+        digits = "".join(ch for ch in span[:end] if ch.isdigit())
+        if _luhn_ok(digits):
+            counts["CARD"] = counts.get("CARD", 0) + 1
+            return "[REDACTED:CARD]" + _scan(span[end:], counts, entities)
+    def _phone(_m):
+        counts["PHONE"] = counts.get("PHONE", 0) + 1
+        return "[REDACTED:PHONE]"
+    return PHONE_RE.sub(_phone, span)
+
+
+def _scan(text: str, counts: Dict[str, int], entities: Optional[Dict[str, str]] = None) -> str:
+    """Redact `text`; if `entities` is given, also record the first raw EMAIL/IP/USER seen."""
+    def _repl(m):
+        label = m.lastgroup
+        if label == "USER_CTX":
+            if entities is not None and "USER" not in entities:
+                entities["USER"] = m.group("USER").rstrip(".,;:!?'\")")
+            return m.group(0)
+        if label == "CARD":
+            return _redact_card_span(m.group(0), counts, entities)
         counts[label] = counts.get(label, 0) + 1
+        if entities is not None and label in _ENTITY_DOMAIN and label not in entities:
+            entities[label] = m.group(0)
         return f"[REDACTED:{label}]"
-    return pattern.sub(_repl, s)
+    return _SCAN_RE.sub(_repl, text)
+
+
+@lru_cache(maxsize=65536)
+def _pseudonym(domain: str, value: str) -> str:
+    return hmac.new(PSEUDONYM_KEY, f"{domain}:{value}".encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+
+def pseudonym(domain: str, value: Optional[str]) -> str:
+    """Keyed, stable pseudonym of an identifier ("user" or "ip" domain); "" for empty values."""
+    value = (value or "").strip().lower()
+    return _pseudonym(domain, value) if value else ""
+
+
+def redact_entities(text: str) -> Tuple[str, Dict[str, int], Dict[str, str]]:
+    """
+    One scan: (redacted_text, per-label counts, entities). Entities map
+    "email" / "ip" / "user" to the pseudonym of the first one found; raw values
+    never leave this function.
+    """
+    counts: Dict[str, int] = {}
+    found: Dict[str, str] = {}
+    out = _scan(text or "", counts, found)
+    return out, counts, {k.lower(): pseudonym(_ENTITY_DOMAIN[k], v) for k, v in found.items()}
+
+
+def redact_pii_counts(text: str) -> Tuple[str, Dict[str, int]]:
+    """Like redact_pii, but returns per-label counts, e.g. {"EMAIL": 1, "IP": 2}."""
+    counts: Dict[str, int] = {}
+    out = _scan(text or "", counts)
+    return out, counts
+
 
 def redact_pii(text: str) -> Tuple[str, int]:
     """Redact basic PII (email, IPv4, phone, card). Returns (redacted_text, total_redactions)."""
-    counts: dict = {}
-    out = text or ""
-    out = _apply(EMAIL_RE, "EMAIL", out, counts)
-    out = _apply(IPV4_RE, "IP", out, counts)
-    out = _apply(PHONE_RE, "PHONE", out, counts)
-    out = _apply(CARD_RE, "CARD", out, counts)
-    total = sum(counts.values())
-    return out, total
+    out, counts = redact_pii_counts(text)
+    return out, sum(counts.values())
+
+
+def redact_batch(texts: List[str]) -> List[Tuple[str, int]]:
+    """Redact a list of messages; same (redacted_text, total_redactions) per item."""
+    out = []
+    for text in texts:
+        counts: Dict[str, int] = {}
+        out.append((_scan(text or "", counts), sum(counts.values())))
+    return out
+
+
+def redact_entities_batch(texts: List[str]) -> List[Tuple[str, Dict[str, str]]]:
+    """redact_entities over a list; (redacted_text, entities) per item."""
+    out = []
+    for text in texts:
+        red, _, entities = redact_entities(text)
+        out.append((red, entities))
+    return out
+
 
 def residency_tag(evt: dict, default_tag: str = "SA") -> str:
     region = (evt.get("region") or evt.get("country") or "").strip().lower()
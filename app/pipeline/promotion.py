@@ -0,0 +1,116 @@
+# app/pipeline/promotion.py
+"""
+Streaming fail→success promotion detector (credential stuffing → takeover).
+
+Keeps a short ring buffer of recent event types per (user, ip) in memory, so
+ingest can promote a noise `auth_success` incident without reading events back
+from the DB. Work per event is O(1): the buffer holds at most `capacity`
+entries and stale ones expire by timestamp. The number of tracked (user, ip)
+windows is capped; the least recently seen one is evicted first.
+
+State is per process: with several uvicorn workers a burst split across
+workers may go unnoticed, the same as any in-memory sliding window.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Tuple
+
+PROMOTION_WINDOW_SECONDS = int(os.getenv("PROMOTION_WINDOW_SECONDS", "900"))
+PROMOTION_FAILURES = int(os.getenv("PROMOTION_FAILURES", "5"))
+PROMOTION_MAX_KEYS = int(os.getenv("PROMOTION_MAX_KEYS", "100000"))
+
+Key = Tuple[str, str]
+
+
+def event_epoch(ts: Optional[str]) -> float:
+    """ISO 8601 → epoch seconds; now() when missing or unparsable."""
+    if ts:
+        try:
+            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+class PromotionDetector:
+    """
+    observe() returns a promotion summary when an `auth_success` arrives after
+    at least `failures` `auth_failure`s for the same (user, ip) within
+    `window_seconds`; the window is then cleared so one burst promotes once.
+    """
+
+    def __init__(self, window_seconds: int = PROMOTION_WINDOW_SECONDS,
+                 failures: int = PROMOTION_FAILURES, max_keys: int = PROMOTION_MAX_KEYS):
+        self.window = window_seconds
+        self.failures = max(1, failures)
+        self.max_keys = max(1, max_keys)
+        # ring buffer of failure timestamps; successes only trigger a check
+        self._windows: "OrderedDict[Key, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evicted = 0
+        self._expired = 0
+        self._promotions = 0
+
+    def observe(self, user: str, ip: str, event_type: str, ts: float) -> Optional[str]:
+        if not (user or ip) or event_type not in ("auth_failure", "auth_success"):
+            return None
+        key = (user, ip)
+        with self._lock:
+            self._expire_head(ts)
+            buf = self._windows.get(key)
+            if buf is not None:
+                self._windows.move_to_end(key)
+                cutoff = ts - self.window
+                while buf and buf[0] < cutoff:
+                    buf.popleft()
+
+            if event_type == "auth_failure":
+                if buf is None:
+                    buf = self._windows[key] = deque(maxlen=self.failures)
+                    self._evict()
+                buf.append(ts)
+                return None
+
+            if buf is None or len(buf) < self.failures:
+                return None
+            n = len(buf)
+            del self._windows[key]
+            self._promotions += 1
+        return f"Promotion: {n} failures then success (possible credential stuffing → takeover)"
+
+    def _expire_head(self, now: float) -> None:
+        # least recently touched windows sit at the head; drop them once stale
+        cutoff = now - self.window
+        while self._windows:
+            key, buf = next(iter(self._windows.items()))
+            if buf and buf[-1] >= cutoff:
+                return
+            del self._windows[key]
+            self._expired += 1
+
+    def _evict(self) -> None:
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+            self._evicted += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "windows": len(self._windows),
+            "max_windows": self.max_keys,
+            "evicted": self._evicted,
+            "expired": self._expired,
+            "promotions": self._promotions,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+
+detector = PromotionDetector()
@@ -0,0 +1,202 @@
+# app/pipeline/sessionize.py
+"""
+Gap-based sessionization for clustering (CLUSTER_MODE=session).
+
+Instead of fixed CLUSTER_BUCKET_SECONDS buckets, an (event_type, user, ip)
+session stays open while its events arrive within CLUSTER_SESSION_GAP_SECONDS
+of each other, so a burst that crosses a bucket boundary stays one incident.
+The session's cluster key is derived from the actor and the session's first
+event, and the session remembers the incident it maps to.
+
+Open sessions live in a dict plus a min-heap of expiry times (last event +
+gap), so expiring and evicting are O(log n) per event. Time is event time: a
+session expires once the newest event seen is more than a gap past its last
+event. Heap entries are invalidated lazily when a session is extended; the
+heap is compacted when stale entries dominate. The number of open sessions is
+capped at CLUSTER_SESSION_MAX; the one closest to expiry is evicted first.
+
+State is per process, rebuilt from the `cluster_sessions` table at startup
+(app/core/ingest.py). With several uvicorn workers, a burst split across
+workers opens one session (and incident) per worker.
+"""
+import heapq
+import itertools
+import os
+import threading
+from datetime import datetime, timezone
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CLUSTER_MODE = os.getenv("CLUSTER_MODE", "bucket").strip().lower()
+CLUSTER_SESSION_GAP_SECONDS = int(os.getenv("CLUSTER_SESSION_GAP_SECONDS", "900"))
+CLUSTER_SESSION_MAX = int(os.getenv("CLUSTER_SESSION_MAX", "100000"))
+
+if CLUSTER_MODE not in ("bucket", "session"):
+    raise ValueError(f"CLUSTER_MODE must be 'bucket' or 'session', got {CLUSTER_MODE!r}")
+
+Key = Tuple[str, str, str]  # (event_type, user pseudonym, ip pseudonym)
+
+
+def enabled() -> bool:
+    return CLUSTER_MODE == "session"
+
+
+def session_key(evt: dict, user: str, ip: str) -> Key:
+    return ((evt.get("event_type") or "").strip().lower(), user, ip)
+
+
+def session_cluster_key(key: Key, start: float) -> str:
+    """Cluster key of the session of `key` whose first event was at `start`."""
+    material = "|".join([*key, f"s{int(start)}"])
+    return blake2b(material.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+class OpenSession:
+    __slots__ = ("key", "cluster_key", "start", "last", "incident_id")
+
+    def __init__(self, key: Key, cluster_key: str, start: float, last: float,
+                 incident_id: Optional[int] = None):
+        self.key = key
+        self.cluster_key = cluster_key
+        self.start = start
+        self.last = last
+        self.incident_id = incident_id
+
+
+class SessionIndex:
+    """
+    assign() maps an event of `key` at `ts` to its open session, extending it,
+    or opens a new one when the gap since the session's last event is exceeded.
+    An event more than a gap older than its open session's start belongs to a
+    session that is already gone; it gets a one-off session that isn't tracked.
+    """
+
+    def __init__(self, gap_seconds: int = CLUSTER_SESSION_GAP_SECONDS,
+                 max_sessions: int = CLUSTER_SESSION_MAX):
+        self.gap = max(1, gap_seconds)
+        self.max_sessions = max(1, max_sessions)
+        self._open: Dict[Key, OpenSession] = {}
+        # (expires_at, tiebreak, key); stale once the session was extended or closed
+        self._heap: List[Tuple[float, int, Key]] = []
+        self._tiebreak = itertools.count()
+        self._watermark = float("-inf")  # newest event time seen
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._opened = self._extended = self._expired = self._evicted = self._late = 0
+
+    def assign(self, key: Key, ts: float) -> OpenSession:
+        with self._lock:
+            if ts > self._watermark:
+                self._watermark = ts
+                self._expire()
+            s = self._open.get(key)
+            if s is not None and s.start - self.gap <= ts <= s.last + self.gap:
+                self._extended += 1
+                if ts > s.last:
+                    s.last = ts
+                    self._push(s)
+                elif ts < s.start:
+                    s.start = ts  # late event; the cluster key stays the one it was opened with
+                return s
+            if s is not None and ts < s.start:
+                self._late += 1
+                return OpenSession(key, session_cluster_key(key, ts), ts, ts)
+            return self._add(OpenSession(key, session_cluster_key(key, ts), ts, ts))
+
+    def find(self, key: Key, ts: float) -> Optional[OpenSession]:
+        """The open session an event of `key` at `ts` would join, without changing state."""
+        with self._lock:
+            s = self._open.get(key)
+            if s is not None and s.start - self.gap <= ts <= s.last + self.gap:
+                return s
+            return None
+
+    def restore(self, sessions: Iterable[OpenSession]) -> int:
+        """Re-open persisted sessions (newest first wins); returns how many were added."""
+        added = 0
+        with self._lock:
+            for s in sessions:
+                if s.key in self._open or s.last + self.gap < self._watermark:
+                    continue
+                self._watermark = max(self._watermark, s.last)
+                self._open[s.key] = s
+                self._push(s)
+                self._cap()
+                added += 1
+        return added
+
+    def window(self, s: OpenSession) -> dict:
+        return {
+            "mode": "session",
+            "gap_seconds": self.gap,
+            "session_start_iso": _iso(s.start),
+            "last_event_iso": _iso(s.last),
+            "expires_iso": _iso(s.last + self.gap),
+            "incident_id": s.incident_id,
+        }
+
+    def _add(self, s: OpenSession) -> OpenSession:
+        self._open[s.key] = s
+        self._push(s)
+        self._opened += 1
+        self._cap()
+        return s
+
+    def _push(self, s: OpenSession) -> None:
+        heapq.heappush(self._heap, (s.last + self.gap, next(self._tiebreak), s.key))
+        if len(self._heap) > 2 * len(self._open) + 64:
+            self._heap = [(o.last + self.gap, next(self._tiebreak), o.key) for o in self._open.values()]
+            heapq.heapify(self._heap)
+
+    def _pop_live(self) -> Optional[OpenSession]:
+        # drop stale heap entries until the top is a live session's current expiry
+        while self._heap:
+            expires, _, key = self._heap[0]
+            s = self._open.get(key)
+            if s is not None and s.last + self.gap == expires:
+                return s
+            heapq.heappop(self._heap)
+        return None
+
+    def _expire(self) -> None:
+        while True:
+            s = self._pop_live()
+            if s is None or s.last + self.gap >= self._watermark:
+                return
+            heapq.heappop(self._heap)
+            del self._open[s.key]
+            self._expired += 1
+
+    def _cap(self) -> None:
+        while len(self._open) > self.max_sessions:
+            s = self._pop_live()
+            heapq.heappop(self._heap)
+            del self._open[s.key]
+            self._evicted += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": len(self._open),
+                "max_open": self.max_sessions,
+                "heap_entries": len(self._heap),
+                "opened": self._opened,
+                "extended": self._extended,
+                "expired": self._expired,
+                "evicted": self._evicted,
+                "late": self._late,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._open.clear()
+            self._heap.clear()
+            self._watermark = float("-inf")
+            self.loaded = False
+
+
+index = SessionIndex()
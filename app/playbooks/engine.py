@@ -0,0 +1,313 @@
+# app/playbooks/engine.py
+"""
+Playbook rule engine.
+
+Playbooks are loaded from every *.json / *.yaml / *.yml file in PLAYBOOK_DIR
+(YAML needs PyYAML). A file holds a list of playbooks or {"playbooks": [...]}:
+
+    {"id": "auth_failure", "name": "...", "priority": 20,
+     "match": {"event_types": ["auth", "login"],     # substrings of event_type
+               "keywords": ["password spray"],        # substrings of the redacted message
+               "sources": ["okta"]},                  # exact source names
+     "actions": ["...", "..."]}
+
+A playbook matches when every field it lists has at least one hit (OR within a
+field, AND across fields). One without `match` always matches; `"default": true`
+marks fallbacks used only when nothing else matched. Results are ordered by
+priority (highest first), then file order.
+
+Event-type and keyword patterns are compiled into one Aho–Corasick automaton
+per field, so a lookup is a single pass over each text and costs the same
+whether there are ten playbooks or a thousand; only rules that actually got a
+hit are looked at. The directory is re-checked at most every
+PLAYBOOK_RELOAD_SECONDS and recompiled when a file changes. A broken file is
+logged and the previous rules stay active.
+
+`for_incident()` memoizes results per incident, keyed on the incident's latest
+event id and the rules version, so repeat calls skip loading the evidence text.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("soc_copilot.playbooks")
+
+PLAYBOOK_DIR = os.getenv("PLAYBOOK_DIR") or os.path.join(os.path.dirname(__file__), "rules")
+PLAYBOOK_RELOAD_SECONDS = float(os.getenv("PLAYBOOK_RELOAD_SECONDS", "2"))
+PLAYBOOK_MEMO_SIZE = int(os.getenv("PLAYBOOK_MEMO_SIZE", "10000"))
+
+_EXTENSIONS = (".json", ".yaml", ".yml")
+_FIELDS = ("event_types", "keywords", "sources")
+
+
+class _Automaton:
+    """Aho–Corasick over lowercase patterns; find() returns the payloads of every pattern in a text."""
+
+    def __init__(self, patterns: Dict[str, Set[int]]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Set[int]] = [set()]
+        for pattern, payload in patterns.items():
+            s = 0
+            for ch in pattern:
+                nxt = goto[s].get(ch)
+                if nxt is None:
+                    nxt = goto[s][ch] = len(goto)
+                    goto.append({})
+                    out.append(set())
+                s = nxt
+            out[s] |= payload
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, t in goto[s].items():
+                queue.append(t)
+                f = fail[s]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[t] = goto[f].get(ch, 0)
+                out[t] |= out[fail[t]]
+        self._goto = goto
+        self._fail = fail
+        self._out: List[FrozenSet[int]] = [frozenset(o) for o in out]
+
+    def find(self, text: str) -> Set[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: Set[int] = set()
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                hits |= out[s]
+        return hits
+
+
+class _Compiled:
+    def __init__(self, playbooks: List[dict]):
+        self.playbooks = playbooks
+        self.needs: List[FrozenSet[str]] = []
+        self.always: List[int] = []
+        self.defaults: List[int] = []
+        patterns: Dict[str, Dict[str, Set[int]]] = {"event_types": {}, "keywords": {}}
+        self.by_source: Dict[str, List[int]] = {}
+        for i, pb in enumerate(playbooks):
+            match = pb["match"]
+            self.needs.append(frozenset(f for f in _FIELDS if match.get(f)))
+            if pb["default"]:
+                self.defaults.append(i)
+            elif not self.needs[i]:
+                self.always.append(i)
+            for f in ("event_types", "keywords"):
+                for p in match.get(f) or ():
+                    patterns[f].setdefault(p, set()).add(i)
+            for src in match.get("sources") or ():
+                self.by_source.setdefault(src, []).append(i)
+        self.event_types = _Automaton(patterns["event_types"])
+        self.keywords = _Automaton(patterns["keywords"])
+
+    def match(self, event_type: str, text: str, source: str) -> List[dict]:
+        hits: Dict[int, Set[str]] = {}
+        for i in self.event_types.find(event_type):
+            hits.setdefault(i, set()).add("event_types")
+        if text:
+            for i in self.keywords.find(text):
+                hits.setdefault(i, set()).add("keywords")
+        for i in self.by_source.get(source, ()):
+            hits.setdefault(i, set()).add("sources")
+        matched = [i for i, fields in hits.items() if fields == self.needs[i]] + self.always
+        if not matched:
+            matched = self.defaults
+        return [self.playbooks[i] for i in sorted(matched, key=lambda i: (-self.playbooks[i]["priority"], i))]
+
+
+def _lower_list(value, where: str) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{where}: expected a string or a list of strings")
+    return [v.strip().lower() for v in value if v.strip()]
+
+
+def _validate(raw, where: str) -> dict:
+    if not isinstance(raw, dict) or not isinstance(raw.get("id"), str) or not raw["id"]:
+        raise ValueError(f"{where}: every playbook needs a string `id`")
+    where = f"{where}: {raw['id']}"
+    actions = raw.get("actions")
+    if not isinstance(actions, list) or not actions or not all(isinstance(a, str) for a in actions):
+        raise ValueError(f"{where}: `actions` must be a non-empty list of strings")
+    match = raw.get("match") or {}
+    if not isinstance(match, dict) or set(match) - set(_FIELDS):
+        raise ValueError(f"{where}: `match` keys must be among {', '.join(_FIELDS)}")
+    return {
+        "id": raw["id"],
+        "name": raw.get("name") or raw["id"],
+        "priority": int(raw.get("priority", 0)),
+        "default": bool(raw.get("default", False)),
+        "match": {f: _lower_list(match.get(f), f"{where}.{f}") for f in _FIELDS},
+        "actions": list(actions),
+    }
+
+
+def _yaml():
+    # imported on first YAML file only; None when PyYAML is missing (YAML playbooks are optional)
+    try:
+        import yaml
+    except ImportError:  # pragma: no cover
+        return None
+    return yaml
+
+
+def load_playbooks(directory: str) -> List[dict]:
+    """Read and validate every playbook file in `directory` (sorted by name). Raises ValueError."""
+    playbooks: List[dict] = []
+    seen: Set[str] = set()
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(_EXTENSIONS):
+            continue
+        path = os.path.join(directory, name)
+        with open(path, encoding="utf-8") as f:
+            if name.endswith(".json"):
+                doc = json.load(f)
+            elif _yaml() is None:
+                logger.warning("skipping %s: PyYAML is not installed", path)
+                continue
+            else:
+                doc = _yaml().safe_load(f)
+        if isinstance(doc, dict):
+            doc = doc.get("playbooks")
+        if not isinstance(doc, list):
+            raise ValueError(f"{name}: expected a list of playbooks or {{\"playbooks\": [...]}}")
+        for raw in doc:
+            pb = _validate(raw, name)
+            if pb["id"] in seen:
+                raise ValueError(f"{name}: duplicate playbook id {pb['id']!r}")
+            seen.add(pb["id"])
+            playbooks.append(pb)
+    return playbooks
+
+
+class PlaybookEngine:
+    def __init__(self, directory: str = PLAYBOOK_DIR, reload_seconds: float = PLAYBOOK_RELOAD_SECONDS,
+                 memo_size: int = PLAYBOOK_MEMO_SIZE):
+        self.directory = directory
+        self.reload_seconds = reload_seconds
+        self.memo_size = memo_size
+        self.version = 0
+        self._compiled: Optional[_Compiled] = None
+        self._signature: Optional[Tuple] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[int, Tuple[int, Optional[int], dict]]" = OrderedDict()
+        self._reloads = 0
+        self._reload_errors = 0
+        self._memo_hits = 0
+        self._memo_misses = 0
+
+    def _dir_signature(self) -> Tuple:
+        try:
+            names = sorted(n for n in os.listdir(self.directory) if n.endswith(_EXTENSIONS))
+        except FileNotFoundError:
+            return ()
+        sig = []
+        for n in names:
+            try:
+                st = os.stat(os.path.join(self.directory, n))
+            except FileNotFoundError:
+                continue
+            sig.append((n, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Recompile if a playbook file changed (checked at most every reload_seconds). True if reloaded."""
+        now = time.monotonic()
+        if not force and self._compiled is not None and now - self._checked < self.reload_seconds:
+            return False
+        with self._lock:
+            self._checked = now
+            sig = self._dir_signature()
+            if not force and self._compiled is not None and sig == self._signature:
+                return False
+            # remember the signature even on failure so a broken file is not re-read every call
+            self._signature = sig
+            try:
+                compiled = _Compiled(load_playbooks(self.directory))
+            except (OSError, ValueError) as exc:
+                self._reload_errors += 1
+                logger.error("playbooks in %s not reloaded: %s", self.directory, exc)
+                if self._compiled is None:
+                    self._compiled = _Compiled([])
+                return False
+            self._compiled = compiled
+            self.version += 1
+            self._reloads += 1
+            self._memo.clear()
+            logger.info("loaded %d playbooks from %s", len(compiled.playbooks), self.directory)
+            return True
+
+    def match(self, event_type: str, text: str = "", source: str = "") -> List[dict]:
+        self.refresh()
+        return self._compiled.match((event_type or "").lower(), (text or "").lower(), (source or "").strip().lower())
+
+    def suggest(self, event_type: str, text: str = "", source: str = "") -> dict:
+        """{"actions": [...], "playbooks": [ids]}; actions in playbook order, duplicates dropped."""
+        matched = self.match(event_type, text, source)
+        return {"actions": _merge_actions(pb["actions"] for pb in matched), "playbooks": [pb["id"] for pb in matched]}
+
+    def for_incident(self, incident_id: int, last_event_id: Optional[int],
+                     load: Callable[[], Tuple[str, str, str]]) -> dict:
+        """
+        suggest() for an incident's latest event. `load` returns
+        (event_type, redacted_text, source) and is only called on a memo miss:
+        when the incident has a newer event or the rules were reloaded.
+        """
+        self.refresh()
+        with self._lock:
+            memo = self._memo.get(incident_id)
+            if memo is not None and memo[0] == self.version and memo[1] == last_event_id:
+                self._memo.move_to_end(incident_id)
+                self._memo_hits += 1
+                return memo[2]
+            self._memo_misses += 1
+            version = self.version
+        result = self.suggest(*load())
+        with self._lock:
+            if version == self.version and self.memo_size > 0:
+                self._memo[incident_id] = (version, last_event_id, result)
+                self._memo.move_to_end(incident_id)
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "playbooks": len(self._compiled.playbooks) if self._compiled else 0,
+                "version": self.version,
+                "reloads": self._reloads,
+                "reload_errors": self._reload_errors,
+                "memo_size": len(self._memo),
+                "memo_hits": self._memo_hits,
+                "memo_misses": self._memo_misses,
+            }
+
+
+def _merge_actions(lists: Iterable[List[str]]) -> List[str]:
+    seen: Set[str] = set()
+    out: List[str] = []
+    for actions in lists:
+        for a in actions:
+            if a not in seen:
+                seen.add(a)
+                out.append(a)
+    return out
+
+
+matcher = PlaybookEngine()
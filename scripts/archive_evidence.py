@@ -0,0 +1,41 @@
+# scripts/archive_evidence.py
+"""
+Pack cold events into compressed per-incident evidence blocks.
+
+    PYTHONPATH=. python scripts/archive_evidence.py [--days N] [--block-events N] [--max-blocks N] [--compact]
+
+Age and block size default to EVIDENCE_ARCHIVE_DAYS / EVIDENCE_BLOCK_EVENTS.
+`--compact` runs SQLite incremental vacuum afterwards (see scripts/retention.py).
+"""
+import argparse
+import json
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.core.schema import ensure_schema  # noqa: E402
+from app.core import archive, retention  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Archive cold event text into compressed blocks.")
+    ap.add_argument("--days", type=int, default=archive.EVIDENCE_ARCHIVE_DAYS)
+    ap.add_argument("--block-events", type=int, default=archive.EVIDENCE_BLOCK_EVENTS)
+    ap.add_argument("--max-blocks", type=int, default=None)
+    ap.add_argument("--compact", action="store_true")
+    args = ap.parse_args()
+
+    ensure_schema(engine)
+    stats = archive.archive_cold(SessionLocal, days=args.days, block_events=args.block_events,
+                                 max_blocks=args.max_blocks)
+    if stats["raw_bytes"]:
+        stats["ratio"] = round(stats["raw_bytes"] / max(1, stats["stored_bytes"]), 1)
+    if args.compact:
+        stats["compact"] = retention.compact(engine)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
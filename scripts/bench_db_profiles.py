@@ -0,0 +1,122 @@
+# scripts/bench_db_profiles.py
+"""
+Read/write concurrency per DB_PROFILE: one writer thread ingesting batches
+while reader threads page /incidents-style queries and read counters.
+
+    PYTHONPATH=. python scripts/bench_db_profiles.py [seconds] [readers] [profiles...]
+
+SQLite profiles run against a fresh temp file each. Pass `postgres` with a
+Postgres DATABASE_URL to include it (its tables are dropped and recreated).
+Prints JSON: writes/s, reads/s, read p50/p95 ms and lock errors per profile.
+"""
+import json, os, sys, tempfile, threading, time
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base, build_engine
+import app.core.models as models
+from app.core import counters
+from app.core.ingest import ingest_batch
+from scripts.bench_ingest import BENIGN, CRITICAL, make_events
+
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * p))] if xs else 0.0
+
+
+def run_profile(profile: str, seconds: float, readers: int, batch: int = 200) -> dict:
+    tmp = None
+    if profile == "postgres":
+        url = os.environ["DATABASE_URL"]
+    else:
+        fd, tmp = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{tmp}"
+    eng = build_engine(url, profile)
+    Base.metadata.drop_all(bind=eng)
+    Base.metadata.create_all(bind=eng)
+    Session = sessionmaker(bind=eng, autoflush=False)
+
+    # seed so readers have pages to walk
+    with Session() as db:
+        ingest_batch(db, make_events(2000, seed=1), default_tag="SA", store_raw=False,
+                     benign_types=BENIGN, critical_types=CRITICAL)
+        db.commit()
+
+    stop = threading.Event()
+    writes, errors = [0], [0]
+    read_ms: list = []
+    lock = threading.Lock()
+
+    def writer():
+        seed = 100
+        while not stop.is_set():
+            seed += 1
+            evs = make_events(batch, seed=seed)
+            with Session() as db:
+                try:
+                    ingest_batch(db, evs, default_tag="SA", store_raw=False,
+                                 benign_types=BENIGN, critical_types=CRITICAL)
+                    db.commit()
+                    writes[0] += len(evs)
+                except OperationalError:
+                    db.rollback()
+                    errors[0] += 1
+
+    def reader():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            with Session() as db:
+                try:
+                    db.execute(
+                        select(models.Incident.id, models.Incident.title)
+                        .order_by(models.Incident.last_seen.desc(), models.Incident.id.desc())
+                        .limit(100)
+                    ).all()
+                    counters.read_all(db)
+                except OperationalError:
+                    with lock:
+                        errors[0] += 1
+                    continue
+            with lock:
+                read_ms.append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    eng.dispose()
+    if tmp:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp + suffix):
+                os.remove(tmp + suffix)
+
+    return {
+        "events_written_per_s": round(writes[0] / elapsed, 1),
+        "reads_per_s": round(len(read_ms) / elapsed, 1),
+        "read_p50_ms": round(_pct(read_ms, 0.50), 2),
+        "read_p95_ms": round(_pct(read_ms, 0.95), 2),
+        "lock_errors": errors[0],
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    profiles = sys.argv[3:] or ["dev", "sqlite-wal"]
+    result = {"seconds": seconds, "readers": readers}
+    for p in profiles:
+        result[p] = run_profile(p, seconds, readers)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# scripts/bench_ingest.py
+"""
+Compare the set-based ingest engine against the old per-event loop.
+
+    PYTHONPATH=. python scripts/bench_ingest.py [n_events] [repeats]
+
+Each run uses a fresh temp SQLite file so both paths start from the same state.
+"""
+import json, os, random, sys, tempfile, time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+import app.core.models as models
+from app.core.ingest import ingest_batch
+from app.pipeline.normalizer import normalize_event
+from app.pipeline.pii_redactor import redact_entities, residency_tag
+from app.pipeline.clustering import cluster_key, incident_title
+from app.pipeline.summarizer import summarize_incident
+
+BENIGN = {"auth_success"}
+CRITICAL = {"auth_failure", "mfa_bypass", "api_key_use", "privilege_escalation"}
+
+
+def make_events(n: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    users = [f"user{i}" for i in range(max(1, n // 50))]
+    out = []
+    for i in range(n):
+        u = rnd.choice(users)
+        ip = f"203.0.113.{rnd.randint(1, 254)}"
+        et = rnd.choice(["auth_success", "auth_success", "auth_failure", "port_scan"])
+        minute = rnd.randint(0, 59)
+        out.append({
+            "source": "bench",
+            "event_type": et,
+            "user": u,
+            "ip": ip,
+            "message": f"{et} for user {u}@example.com from {ip}",
+            "ts": f"2025-08-22T10:{minute:02d}:00Z",
+        })
+    return out
+
+
+def legacy_ingest(db, events: list) -> int:
+    """The pre-batch loop from ingest_logs: one lookup/flush/insert per event."""
+    created = 0
+    for evt in events:
+        red, _, entities = redact_entities(evt.get("message", ""))
+        tag = residency_tag(evt, "SA")
+        norm_cluster = normalize_event({**evt, "message": red})
+        ck = cluster_key(evt, entities)
+        et_lower = (evt.get("event_type") or "").lower()
+        benign = et_lower in BENIGN and et_lower not in CRITICAL
+        incident = db.query(models.Incident).filter(models.Incident.cluster_key == ck).first()
+        if not incident:
+            incident = models.Incident(
+                title=incident_title(evt), cluster_key=ck, summary="", count=0,
+                status="noise" if benign else "open",
+            )
+            db.add(incident)
+            db.flush()
+        db.add(models.Event(
+            source=evt.get("source", ""), event_type=et_lower, raw="",
+            normalized=norm_cluster, redacted=red, residency_tag=tag,
+            cluster_key=ck, incident_id=incident.id,
+        ))
+        incident.count += 1
+        incident.summary = summarize_incident(red, incident.count)
+        if benign and incident.status == "noise":
+            db.query(models.Event).filter(models.Event.cluster_key == ck) \
+                .order_by(models.Event.id.desc()).limit(8).all()
+        created += 1
+    return created
+
+
+def batch_ingest(db, events: list) -> int:
+    return ingest_batch(
+        db, events, default_tag="SA", store_raw=False,
+        benign_types=BENIGN, critical_types=CRITICAL,
+    )
+
+
+def run(fn, events: list) -> float:
+    with tempfile.TemporaryDirectory() as d:
+        eng = create_engine(f"sqlite:///{os.path.join(d, 'bench.db')}")
+        Base.metadata.create_all(bind=eng)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=eng)
+        db = Session()
+        try:
+            t0 = time.perf_counter()
+            fn(db, events)
+            db.commit()
+            return time.perf_counter() - t0
+        finally:
+            db.close()
+            eng.dispose()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    events = make_events(n)
+    result = {"events": n}
+    for name, fn in (("legacy", legacy_ingest), ("batch", batch_ingest)):
+        best = min(run(fn, events) for _ in range(repeats))
+        result[f"{name}_s"] = round(best, 4)
+        result[f"{name}_eps"] = round(n / best, 1)
+    result["speedup"] = round(result["legacy_s"] / result["batch_s"], 2)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# scripts/bench_pipeline.py
+"""
+Pipeline micro-benchmarks on synthetic SOC logs (scripts/synth_logs.py).
+
+    PYTHONPATH=. python scripts/bench_pipeline.py [--events N] [--batch B] [--repeats R]
+                                                   [--out result.json] [--compare baseline.json]
+
+Per stage (events/s, best of R): redact_pii, redact_entities, normalize_event,
+cluster_key, summarize_incident, prepare_events (all pure stages), ingest_batch
+(DB stage, temp SQLite), and end-to-end POST /ingest/logs through TestClient
+against a temp DB. Results are JSON; `--compare` prints the ratio to an earlier run
+(> 1.0 means faster now).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from scripts.synth_logs import generate
+
+BENIGN = {"auth_success"}
+CRITICAL = {"auth_failure", "mfa_bypass", "api_key_use", "privilege_escalation"}
+
+
+def _best(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def bench_stages(events: list, repeats: int) -> dict:
+    from app.pipeline.pii_redactor import redact_entities, redact_pii, residency_tag
+    from app.pipeline.normalizer import normalize_event
+    from app.pipeline.clustering import cluster_key
+    from app.pipeline.summarizer import summarize_incident
+    from app.pipeline.executor import prepare_events
+
+    msgs = [e["message"] for e in events]
+    scanned = [redact_entities(m) for m in msgs]
+    redacted = [red for red, _, _ in scanned]
+    entities = [ents for _, _, ents in scanned]
+    stages = {
+        "redact_pii": lambda: [redact_pii(m) for m in msgs],
+        "redact_entities": lambda: [redact_entities(m) for m in msgs],
+        "normalize_event": lambda: [normalize_event({**e, "message": r}) for e, r in zip(events, redacted)],
+        "cluster_key": lambda: [cluster_key(e, ents) for e, ents in zip(events, entities)],
+        "residency_tag": lambda: [residency_tag(e, "SA") for e in events],
+        "summarize_incident": lambda: [summarize_incident(r, i) for i, r in enumerate(redacted)],
+        "prepare_events": lambda: prepare_events(events, "SA"),
+    }
+    return {name: round(len(events) / _best(fn, repeats), 1) for name, fn in stages.items()}
+
+
+def bench_db(events: list, batch: int, repeats: int) -> float:
+    from sqlalchemy.orm import sessionmaker
+    from app.core.db import Base, build_engine
+    from app.core.ingest import ingest_batch
+
+    best = float("inf")
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as d:
+            eng = build_engine(f"sqlite:///{os.path.join(d, 'bench.db')}")
+            Base.metadata.create_all(bind=eng)
+            Session = sessionmaker(bind=eng, autoflush=False)
+            t0 = time.perf_counter()
+            for i in range(0, len(events), batch):
+                with Session() as db:
+                    ingest_batch(db, events[i:i + batch], default_tag="SA", store_raw=False,
+                                 benign_types=BENIGN, critical_types=CRITICAL)
+                    db.commit()
+            best = min(best, time.perf_counter() - t0)
+            eng.dispose()
+    return round(len(events) / best, 1)
+
+
+def bench_http(events: list, batch: int) -> float:
+    # the app binds its engine at import, so point it at a temp DB first
+    d = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(d, 'e2e.db')}"
+    from fastapi.testclient import TestClient
+    from app.api.main import app
+
+    client = TestClient(app)
+    t0 = time.perf_counter()
+    for i in range(0, len(events), batch):
+        r = client.post("/ingest/logs", json={"events": events[i:i + batch]})
+        r.raise_for_status()
+    return round(len(events) / (time.perf_counter() - t0), 1)
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    out = {}
+    for section in ("stages_eps", "db_eps", "http_eps"):
+        cur, base = current.get(section), baseline.get(section)
+        if isinstance(cur, dict) and isinstance(base, dict):
+            out[section] = {k: round(cur[k] / base[k], 3) for k in cur if base.get(k)}
+        elif cur and base:
+            out[section] = round(cur / base, 3)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pipeline micro-benchmarks on synthetic SOC logs.")
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default=None, help="write the JSON result here as well")
+    ap.add_argument("--compare", default=None, help="earlier result JSON to compare against")
+    args = ap.parse_args()
+
+    events = list(generate(args.events, args.seed))
+    result = {
+        "rev": _git_rev(),
+        "python": sys.version.split()[0],
+        "events": args.events,
+        "batch": args.batch,
+        "seed": args.seed,
+        "stages_eps": bench_stages(events, args.repeats),
+        "db_eps": bench_db(events, args.batch, args.repeats),
+        "http_eps": bench_http(events, args.batch),
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            result["vs_baseline"] = compare(result, json.load(f))
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
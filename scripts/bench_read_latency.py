@@ -0,0 +1,188 @@
+# scripts/bench_read_latency.py
+"""
+Read latency under concurrent ingest, against a real uvicorn process.
+
+    PYTHONPATH=. python scripts/bench_read_latency.py [--seconds S] [--readers R] [--writers W]
+                                                      [--batch B] [--profile dev|sqlite-wal]
+                                                      [--out result.json] [--compare baseline.json]
+
+Starts the API on a temp SQLite DB, seeds it, then runs two phases of S
+seconds each: readers only ("idle"), and readers while W clients keep POSTing
+B-event batches to /ingest/logs ("ingest"). Readers cycle through /health,
+/incidents, /incidents/{id} and /evidence/{id}. Per phase and endpoint it
+reports request count, errors and p50/p95/p99/max latency in ms, plus the
+ingest rate. `--compare` prints current/baseline p99 ratios (< 1.0 means
+faster now); run it once on the old tree with --out to get a baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from scripts.synth_logs import generate
+
+ENDPOINTS = ("health", "incidents", "incident", "evidence")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pct(xs: List[float], p: float) -> float:
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(len(xs) * p))], 2) if xs else 0.0
+
+
+def _summary(lat: Dict[str, List[float]], errors: Dict[str, int]) -> dict:
+    return {
+        name: {
+            "requests": len(lat[name]),
+            "errors": errors[name],
+            "p50_ms": _pct(lat[name], 0.50),
+            "p95_ms": _pct(lat[name], 0.95),
+            "p99_ms": _pct(lat[name], 0.99),
+            "max_ms": round(max(lat[name]), 2) if lat[name] else 0.0,
+        }
+        for name in ENDPOINTS
+    }
+
+
+def start_server(db_path: str, profile: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "DB_PROFILE": profile,
+           "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API did not come up")
+
+
+async def run_phase(base: str, seconds: float, readers: int, writers: int, batch: int, seed: int) -> dict:
+    lat: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+    errors = {name: 0 for name in ENDPOINTS}
+    ingested = [0]
+    stop = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=readers + writers + 4)
+
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        incidents = (await client.get("/incidents", params={"limit": 1000})).json()
+        incident_ids = [i["id"] for i in incidents] or [1]
+        event_ids = [e["id"] for e in (await client.get("/events/recent", params={"limit": 1000})).json()] or [1]
+
+        async def reader(n: int):
+            rnd = random.Random(seed + n)
+            while time.perf_counter() < stop:
+                name = ENDPOINTS[rnd.randrange(len(ENDPOINTS))]
+                if name == "health":
+                    path, params = "/health", None
+                elif name == "incidents":
+                    path, params = "/incidents", {"limit": 50}
+                elif name == "incident":
+                    path, params = f"/incidents/{rnd.choice(incident_ids)}", None
+                else:
+                    path, params = f"/evidence/{rnd.choice(event_ids)}", None
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(path, params=params)
+                    ok = r.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                lat[name].append((time.perf_counter() - t0) * 1000)
+                if not ok:
+                    errors[name] += 1
+
+        async def writer(n: int):
+            i = 0
+            while time.perf_counter() < stop:
+                i += 1
+                events = list(generate(batch, seed=seed * 1000 + n * 100000 + i))
+                try:
+                    r = await client.post("/ingest/logs", json={"events": events})
+                    if r.status_code == 200:
+                        ingested[0] += len(events)
+                except httpx.HTTPError:
+                    pass
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[reader(n) for n in range(readers)], *[writer(n) for n in range(writers)])
+        elapsed = time.perf_counter() - t0
+    return {"endpoints": _summary(lat, errors), "ingest_eps": round(ingested[0] / elapsed, 1)}
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    out = {}
+    for phase in ("idle", "ingest"):
+        cur = current.get(phase, {}).get("endpoints", {})
+        base = baseline.get(phase, {}).get("endpoints", {})
+        out[phase] = {k: round(cur[k]["p99_ms"] / base[k]["p99_ms"], 3)
+                      for k in cur if base.get(k, {}).get("p99_ms")}
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Read p99 latency under concurrent ingest.")
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--readers", type=int, default=32)
+    ap.add_argument("--writers", type=int, default=8)
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--seed-events", type=int, default=5000)
+    ap.add_argument("--profile", default="sqlite-wal")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", default=None, help="write the JSON result here as well")
+    ap.add_argument("--compare", default=None, help="earlier result JSON to compare against")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        port = _free_port()
+        proc = start_server(os.path.join(d, "bench.db"), args.profile, port)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            events = list(generate(args.seed_events, seed=args.seed))
+            for i in range(0, len(events), args.batch):
+                httpx.post(f"{base}/ingest/logs", json={"events": events[i:i + args.batch]},
+                           timeout=60).raise_for_status()
+            result = {
+                "profile": args.profile,
+                "readers": args.readers,
+                "writers": args.writers,
+                "batch": args.batch,
+                "seconds": args.seconds,
+                "idle": asyncio.run(run_phase(base, args.seconds, args.readers, 0, args.batch, args.seed)),
+                "ingest": asyncio.run(run_phase(base, args.seconds, args.readers, args.writers,
+                                                args.batch, args.seed)),
+            }
+        finally:
+            proc.terminate()
+            proc.wait(10)
+
+    if args.compare:
+        with open(args.compare) as f:
+            result["p99_vs_baseline"] = compare(result, json.load(f))
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# scripts/bench_redactor.py
+"""
+Micro-benchmark for PII redaction: the fused single-pass scanner vs the old
+four-pass `redact_pii`.
+
+    PYTHONPATH=. python scripts/bench_redactor.py [corpus_mb]
+
+Reports throughput (MB/s) on a realistic log mix and worst-case latency on
+adversarial inputs (long digit/space runs, address-like runs without "@").
+"""
+import json, random, re, sys, time
+
+from app.pipeline.pii_redactor import redact_pii
+
+# ----- the pre-fusion implementation, kept here as the baseline -----
+_OLD = [
+    ("EMAIL", re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")),
+    ("IP", re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")),
+    ("PHONE", re.compile(r"\b(?:\+?\d{1,2}[ -]?)?(?:\(\d{3}\)|\d{3})[ -]?\d{3}[ -]?\d{4}\b")),
+    ("CARD", re.compile(r"\b(?:\d[ -]*?){13,16}\b")),
+]
+
+def legacy_redact(text: str):
+    counts: dict = {}
+    out = text or ""
+    for label, pat in _OLD:
+        def _repl(_m, label=label):
+            counts[label] = counts.get(label, 0) + 1
+            return f"[REDACTED:{label}]"
+        out = pat.sub(_repl, out)
+    return out, sum(counts.values())
+
+# ----- inputs -----
+_TEMPLATES = [
+    "Failed login for user {u}@example.com from 198.51.100.{a}",
+    "Successful login for user {u}@example.com from 203.0.113.{a}",
+    "fw drop src=10.0.{a}.{b} dst=192.0.2.{b} sport={p} dport=443 proto=tcp",
+    "proxy GET https://intranet.example.com/app?id={p} bytes={p}{a} status=200",
+    "support callback requested at 416-555-{p4} ticket {p}",
+    "payment declined card 4111 1111 1111 1111 order {p}{p}",
+]
+
+def realistic_corpus(mb: float, seed: int = 11) -> list:
+    rnd = random.Random(seed)
+    out, size = [], 0
+    while size < mb * 1_000_000:
+        t = rnd.choice(_TEMPLATES).format(
+            u=f"user{rnd.randint(1, 999)}", a=rnd.randint(1, 254), b=rnd.randint(1, 254),
+            p=rnd.randint(1000, 65000), p4=rnd.randint(1000, 9999),
+        )
+        out.append(t)
+        size += len(t)
+    return out
+
+ADVERSARIAL = {
+    "digit_space_runs": ("1" + " " * 64) * 2000,
+    "digit_single_space": "1 " * 50000,
+    "digit_hyphen_pairs": "12-" * 30000,
+    "long_digits": "9" * 100000,
+    "dotted_words_no_at": "a." * 50000,
+}
+
+def throughput(fn, corpus: list) -> float:
+    mb = sum(len(s) for s in corpus) / 1_000_000
+    t0 = time.perf_counter()
+    for s in corpus:
+        fn(s)
+    return mb / (time.perf_counter() - t0)
+
+def worst_case(fn, cap: int = 0) -> dict:
+    out = {}
+    for name, s in ADVERSARIAL.items():
+        s = s[:cap] if cap else s
+        t0 = time.perf_counter()
+        fn(s)
+        out[name] = round((time.perf_counter() - t0) * 1000, 2)
+    return out
+
+def main():
+    mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    corpus = realistic_corpus(mb)
+    result = {
+        "corpus_mb": mb,
+        "fused_mb_s": round(throughput(redact_pii, corpus), 2),
+        "legacy_mb_s": round(throughput(legacy_redact, corpus), 2),
+        "fused_worst_ms": worst_case(redact_pii),
+    }
+    # the legacy email pattern is quadratic on runs without "@"; keep its inputs small
+    result["legacy_worst_ms_20k_chars"] = worst_case(legacy_redact, cap=20000)
+    result["fused_worst_ms_20k_chars"] = worst_case(redact_pii, cap=20000)
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
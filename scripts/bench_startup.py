@@ -0,0 +1,107 @@
+# scripts/bench_startup.py
+"""
+Cold-start cost of the API: import time, app build, lifespan startup and the
+first requests, each measured in a fresh interpreter.
+
+    PYTHONPATH=. python scripts/bench_startup.py [--runs N] [--out result.json] [--compare baseline.json]
+
+Every run starts a new Python process against a temp SQLite DB and reports,
+in ms:
+    import_ms         `import app.api.main`
+    create_app_ms     building the app (create_app(), or the module-level app on trees without it)
+    startup_ms        lifespan startup (schema check, engine connects)
+    first_health_ms   first GET /health
+    first_incidents_ms  first GET /incidents
+    second_incidents_ms  the same request again (warm reference)
+    total_ms          process start → first /incidents answered
+
+Two scenarios: "fresh" (new DB file, so the schema is created) and "current"
+(the DB from the fresh run, schema already up to date). Medians over --runs.
+`--compare` prints current/baseline ratios (< 1.0 means faster now).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_CHILD = r"""
+import json, sys, time
+t_start = float(sys.argv[1])
+t0 = time.perf_counter()
+import app.api.main as main
+t1 = time.perf_counter()
+create = getattr(main, "create_app", None)
+app = create() if create else main.app
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:  # runs the lifespan (startup events on older trees)
+    t3 = time.perf_counter()
+    client.get("/health").raise_for_status()
+    t4 = time.perf_counter()
+    client.get("/incidents").raise_for_status()
+    t5 = time.perf_counter()
+    client.get("/incidents").raise_for_status()
+    t6 = time.perf_counter()
+ms = lambda a, b: round((b - a) * 1000, 2)
+print(json.dumps({
+    "import_ms": ms(t0, t1), "create_app_ms": ms(t1, t2), "startup_ms": ms(t2, t3),
+    "first_health_ms": ms(t3, t4), "first_incidents_ms": ms(t4, t5), "second_incidents_ms": ms(t5, t6),
+    "total_ms": round((time.time() - t_start) * 1000 - (t6 - t5) * 1000, 2),
+}))
+"""
+
+FIELDS = ("import_ms", "create_app_ms", "startup_ms", "first_health_ms",
+          "first_incidents_ms", "second_incidents_ms", "total_ms")
+
+
+def run_once(db_path: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}",
+           "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    out = subprocess.run([sys.executable, "-c", _CHILD, repr(time.time())], env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _median(runs) -> dict:
+    return {k: round(statistics.median(r[k] for r in runs), 2) for k in FIELDS}
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    return {
+        scenario: {k: round(current[scenario][k] / baseline[scenario][k], 3)
+                   for k in FIELDS if baseline.get(scenario, {}).get(k)}
+        for scenario in ("fresh", "current")
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="API import / startup / first-request latency.")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--out", default=None, help="write the JSON result here as well")
+    ap.add_argument("--compare", default=None, help="earlier result JSON to compare against")
+    args = ap.parse_args()
+
+    fresh, current = [], []
+    with tempfile.TemporaryDirectory() as d:
+        for i in range(args.runs):
+            db_path = os.path.join(d, f"startup-{i}.db")
+            fresh.append(run_once(db_path))
+            current.append(run_once(db_path))
+    result = {"runs": args.runs, "fresh": _median(fresh), "current": _median(current)}
+
+    if args.compare:
+        with open(args.compare) as f:
+            result["vs_baseline"] = compare(result, json.load(f))
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import csv, sys, os, requests
 
 API = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8000"
 LABELS = sys.argv[2] if len(sys.argv) > 2 else "labels.csv"
+CHUNK = int(os.getenv("LABEL_EVAL_CHUNK", "500"))  # ids per /evidence/batch call (server max 1000)
 
 def init_labels_from_api(n=30):
     try:
@@ -58,15 +59,16 @@ def main():
 
     misses = 0
     kept = 0
-    for eid, should_keep in labels.items():
-        ev = requests.get(f"{API}/evidence/{eid}", timeout=5).json()
-        if "incident_id" not in ev:
-            continue
-        inc = requests.get(f"{API}/incidents/{ev['incident_id']}", timeout=5).json()
-        if should_keep:
-            kept += 1
-            if inc.get("status") == "noise":
-                misses += 1
+    ids = list(labels)
+    for i in range(0, len(ids), CHUNK):
+        # one call (one joined query) per chunk: evidence + its incident's status
+        res = requests.post(f"{API}/evidence/batch", json={"ids": ids[i:i + CHUNK]}, timeout=30)
+        res.raise_for_status()
+        for ev in res.json()["items"]:
+            if labels[ev["event_id"]]:
+                kept += 1
+                if ev.get("incident_status") == "noise":
+                    misses += 1
 
     rate = (misses / kept) if kept else 0.0
     print({"kept": kept, "missed": misses, "false_dismissal_rate": round(rate, 3)})
@@ -0,0 +1,27 @@
+# scripts/rebuild_counters.py
+"""
+Reconcile the /metrics counters table from the raw events/incidents tables.
+
+    PYTHONPATH=. python scripts/rebuild_counters.py
+"""
+import json
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core import counters  # noqa: E402
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        result = counters.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    print(json.dumps(result, indent=2, sort_keys=True))
+
+if __name__ == "__main__":
+    main()
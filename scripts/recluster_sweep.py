@@ -0,0 +1,213 @@
+# scripts/recluster_sweep.py
+"""
+Offline re-clustering sweep for tuning CLUSTER_BUCKET_SECONDS.
+
+    PYTHONPATH=. python scripts/recluster_sweep.py --input dump.ndjson [--labels labels.csv]
+                                                   [--buckets 60,300,900,3600] [--workers N]
+    PYTHONPATH=. python scripts/recluster_sweep.py --db        # read the events table of DATABASE_URL
+
+Input is NDJSON of events (LogEvent-shaped lines, /ingest/logs bodies with an
+"events" list, or /incidents/{id}/export lines), or the `events` table itself.
+Each event is parsed once: its (event_type, user, ip) actor, built from the
+same pseudonyms ingest clusters on, is factorized to an int code and its
+timestamp becomes int64 epoch seconds. Then every bucket size is a handful of vectorized NumPy ops: bucket = ts // size, cluster =
+unique(actor * span + bucket). Bucket sizes are spread over a process pool.
+
+Per setting it reports incidents, the suppression rate, the active suppression
+rate (open incidents only), cluster size percentiles and the false-dismissal
+rate: labeled `keep` events that land in a noise incident. The labels match on
+event `id`, so they only apply to dumps that carry ids (--db or exports).
+Noise is decided per event type, exactly as ingest does. The false-dismissal
+rate therefore moves with BENIGN_TYPES / CRITICAL_TYPES, not with the bucket
+size. The promotion safety net is not simulated.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    sys.exit("recluster_sweep needs numpy (pip install -r requirements.txt)")
+
+from app.pipeline.clustering import actor
+from app.pipeline.pii_redactor import redact_entities
+from app.pipeline.promotion import event_epoch
+
+DEFAULT_BUCKETS = [60, 300, 600, 900, 1800, 3600, 7200, 14400, 86400]
+
+
+# ----- loading (the only per-event Python loop) -----
+def _iter_ndjson(path: str) -> Iterator[dict]:
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if isinstance(obj.get("events"), list):
+                yield from obj["events"]
+            else:
+                yield obj
+
+
+def _iter_db() -> Iterator[dict]:
+    from sqlalchemy import select
+    from app.core.db import SessionLocal
+    from app.core.models import Event
+
+    with SessionLocal() as db:
+        stmt = select(Event.id, Event.event_type, Event.normalized, Event.created_at).order_by(Event.id)
+        for part in db.execute(stmt.execution_options(yield_per=10000)).partitions():
+            for eid, et, norm, created in part:
+                yield {"id": eid, "event_type": et, "normalized": norm or "",
+                       "ts": created.isoformat() if created else None}
+
+
+def load(events: Iterator[dict], benign_types, critical_types) -> Dict[str, "np.ndarray"]:
+    """Factorize actors and parse timestamps once."""
+    codes: Dict[tuple, int] = {}
+    actor_code: List[int] = []
+    ts: List[int] = []
+    benign: List[bool] = []
+    ids: List[int] = []
+    now = time.time()
+    for evt in events:
+        et = (evt.get("event_type") or "").strip().lower()
+        entities = None
+        if not (evt.get("user") and evt.get("ip")):
+            # same fallback as ingest: entities found in the message (stored
+            # rows only have redacted text, so fewer entities survive there)
+            text = evt["message"] if "message" in evt else evt.get("normalized", "")
+            entities = redact_entities(text)[2]
+        key = (et,) + actor(evt, entities)
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(codes)
+        actor_code.append(code)
+        stamp = evt.get("ts") or evt.get("created_at")
+        ts.append(int(event_epoch(stamp)) if stamp else int(now))
+        benign.append(et in benign_types and et not in critical_types)
+        ids.append(int(evt["id"]) if "id" in evt else -1)
+    return {
+        "actor": np.asarray(actor_code, dtype=np.int64),
+        "ts": np.asarray(ts, dtype=np.int64),
+        "benign": np.asarray(benign, dtype=bool),
+        "id": np.asarray(ids, dtype=np.int64),
+    }
+
+
+def load_keep_ids(path: str) -> "np.ndarray":
+    """Event ids labeled `keep` in a labels.csv (same format as scripts/label_eval.py)."""
+    keep = []
+    with open(path) as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or row[0].strip().startswith("#"):
+                continue
+            try:
+                eid = int(row[0].strip())
+            except ValueError:
+                continue
+            if row[1].strip().lower() == "keep":
+                keep.append(eid)
+    return np.asarray(sorted(set(keep)), dtype=np.int64)
+
+
+# ----- sweep (vectorized, one bucket size per task) -----
+_data: Dict[str, "np.ndarray"] = {}
+
+
+def _init(data):
+    _data.update(data)
+
+
+def evaluate(bucket_seconds: int, data: Optional[Dict] = None) -> dict:
+    d = data or _data
+    actor_code, ts, benign = d["actor"], d["ts"], d["benign"]
+    n = len(ts)
+    if n == 0:
+        return {"bucket_seconds": bucket_seconds, "events": 0}
+    bucket = ts // bucket_seconds
+    bucket -= bucket.min()
+    span = int(bucket.max()) + 1
+    cluster = actor_code * span + bucket
+    uniq, inverse, sizes = np.unique(cluster, return_inverse=True, return_counts=True)
+    # event type is part of the actor, so a cluster is noise iff its events are benign
+    noise_cluster = np.zeros(len(uniq), dtype=bool)
+    noise_cluster[inverse] = benign
+    open_events = int((~benign).sum())
+    open_incidents = int((~noise_cluster).sum())
+
+    out = {
+        "bucket_seconds": bucket_seconds,
+        "events": n,
+        "incidents": int(len(uniq)),
+        "open_incidents": open_incidents,
+        "noise_incidents": int(noise_cluster.sum()),
+        "suppression_rate": round(1.0 - len(uniq) / n, 4),
+        "active_suppression_rate": round(1.0 - open_incidents / open_events, 4) if open_events else 0.0,
+        "cluster_size_p50": int(np.percentile(sizes, 50)),
+        "cluster_size_p99": int(np.percentile(sizes, 99)),
+        "cluster_size_max": int(sizes.max()),
+    }
+    keep_ids = d.get("keep_ids")
+    if keep_ids is not None and len(keep_ids):
+        labeled = np.isin(d["id"], keep_ids)
+        kept = int(labeled.sum())
+        missed = int((labeled & noise_cluster[inverse]).sum())
+        out.update(kept=kept, missed=missed,
+                   false_dismissal_rate=round(missed / kept, 4) if kept else 0.0)
+    return out
+
+
+def sweep(data: Dict[str, "np.ndarray"], buckets: List[int], workers: int = 1) -> List[dict]:
+    if workers <= 1 or len(buckets) <= 1:
+        return [evaluate(b, data) for b in buckets]
+    from app.pipeline.executor import mp_context
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context(),
+                             initializer=_init, initargs=(data,)) as pool:
+        return list(pool.map(evaluate, buckets))
+
+
+def _csv_env(name: str, default: str) -> set:
+    return {t.strip().lower() for t in os.getenv(name, default).split(",") if t.strip()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sweep CLUSTER_BUCKET_SECONDS over an event dump.")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--input", help="NDJSON event dump")
+    src.add_argument("--db", action="store_true", help="read the events table of DATABASE_URL")
+    ap.add_argument("--labels", default=None, help="labels.csv (event_id,keep|drop)")
+    ap.add_argument("--buckets", default=",".join(map(str, DEFAULT_BUCKETS)))
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    benign = _csv_env("BENIGN_TYPES", "auth_success")
+    critical = _csv_env("CRITICAL_TYPES", "auth_failure,mfa_bypass,api_key_use,privilege_escalation")
+    t0 = time.perf_counter()
+    data = load(_iter_db() if args.db else _iter_ndjson(args.input), benign, critical)
+    if args.labels:
+        data["keep_ids"] = load_keep_ids(args.labels)
+    t_load = time.perf_counter() - t0
+
+    buckets = [int(b) for b in args.buckets.split(",") if b.strip()]
+    t1 = time.perf_counter()
+    results = sweep(data, buckets, args.workers)
+    print(json.dumps({
+        "events": int(len(data["ts"])),
+        "actors": int(data["actor"].max()) + 1 if len(data["actor"]) else 0,
+        "load_s": round(t_load, 3),
+        "sweep_s": round(time.perf_counter() - t1, 3),
+        "current_bucket_seconds": int(os.getenv("CLUSTER_BUCKET_SECONDS", "900")),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
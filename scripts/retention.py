@@ -0,0 +1,57 @@
+# scripts/retention.py
+"""
+Apply the events retention policy once: roll old events up into
+`noise_rollups`, delete them in chunks, then incrementally vacuum (SQLite).
+
+    PYTHONPATH=. python scripts/retention.py [--dry-run] [--max-chunks N] [--enable-incremental-vacuum]
+
+Ages come from RETENTION_NOISE_DAYS / RETENTION_CLOSED_DAYS / RETENTION_OPEN_DAYS.
+"""
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.core.models import Event, Incident  # noqa: E402
+from app.core.schema import ensure_schema  # noqa: E402
+from app.core import retention  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Apply the events retention policy once.")
+    ap.add_argument("--dry-run", action="store_true", help="only count expired events per status")
+    ap.add_argument("--max-chunks", type=int, default=None)
+    ap.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between chunks")
+    ap.add_argument("--enable-incremental-vacuum", action="store_true",
+                    help="switch an existing SQLite DB to auto_vacuum=INCREMENTAL (one full VACUUM)")
+    args = ap.parse_args()
+
+    ensure_schema(engine)
+    policy = retention.policy_from_env()
+    if args.dry_run:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        out = {}
+        with SessionLocal() as db:
+            for status, days in policy.items():
+                out[status] = 0 if days <= 0 else db.scalar(
+                    select(func.count()).select_from(Event)
+                    .join(Incident, Incident.id == Event.incident_id)
+                    .where(Incident.status == status, Event.created_at < now - timedelta(days=days))
+                )
+        print(json.dumps({"policy_days": policy, "expired": out}, indent=2))
+        return
+
+    deleted = retention.run_retention(SessionLocal, policy=policy, max_chunks=args.max_chunks, pause=args.pause)
+    result = {"policy_days": policy, "deleted": deleted,
+              "compact": retention.compact(engine, enable=args.enable_incremental_vacuum)}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
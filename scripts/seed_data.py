@@ -1,46 +1,296 @@
 # scripts/seed_data.py
-import os, sys, time
-import requests
-from requests.exceptions import RequestException
+"""
+Seed data and HTTP load generator for the API.
+
+    PYTHONPATH=. python scripts/seed_data.py                       # seed ~1000 synthetic events (make seed)
+    PYTHONPATH=. python scripts/seed_data.py --scenario mixed --rps 200 --duration 60 --concurrency 32
+    PYTHONPATH=. python scripts/seed_data.py --replay capture.ndjson --rps 50
+    PYTHONPATH=. python scripts/seed_data.py --start-server --scenario auth-burst --duration 20
+
+Scenarios (request mixes):
+    seed          POST /ingest/logs with the default synthetic mix (scripts/synth_logs.py)
+    auth-burst    POST /ingest/logs with credential-stuffing bursts only
+    benign-flood  POST /ingest/logs with successful logins only (the noise stream)
+    mixed         50% ingest, 30% GET /incidents, 10% GET /incidents/{id}, 10% GET /metrics
+
+--replay plays an NDJSON file instead, in order. A line can be a recorded request
+({"method": "GET", "path": "/incidents", "params": {...}, "json": {...}}), an
+/ingest/logs body ({"events": [...]}) or a single event (batched --batch at a
+time). Other lines are skipped and counted.
+
+Requests are paced open-loop at --rps (0 = as fast as --concurrency allows). With a
+target rate, latency is measured from each request's scheduled start, so queueing
+behind a slow API shows up in the percentiles instead of silently lowering the
+rate. The run stops after --duration seconds or --requests requests, whichever
+comes first. The JSON report has throughput, the error rate and p50/p95/p99 per
+endpoint. The exit status is 1 when the error rate is above --max-error-rate, and 2
+when the API is unreachable.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from scripts.synth_logs import generate, parse_mix
 
 API = os.getenv("API_URL", "http://127.0.0.1:8000").rstrip("/")
 
+SCENARIOS = ("seed", "auth-burst", "benign-flood", "mixed")
+_INGEST_MIX = {"seed": None, "auth-burst": "stuffing=1", "benign-flood": "benign=1", "mixed": None}
+_MIXED = (("ingest", 50), ("incidents", 30), ("incident", 10), ("metrics", 10))
+
+
+class Op:
+    __slots__ = ("endpoint", "method", "path", "params", "json", "events", "collect_ids")
+
+    def __init__(self, endpoint: str, method: str, path: str, params=None, json=None, events: int = 0,
+                 collect_ids: Optional[List[int]] = None):
+        self.endpoint = endpoint  # report key, e.g. "GET /incidents/{id}"
+        self.method = method
+        self.path = path
+        self.params = params
+        self.json = json
+        self.events = events
+        self.collect_ids = collect_ids  # refreshed from a 200 list response, feeds GET /incidents/{id}
+
+
+def _ingest(events: List[dict]) -> Op:
+    return Op("POST /ingest/logs", "POST", "/ingest/logs", json={"events": events}, events=len(events))
+
+
+def scenario_ops(name: str, batch: int, seed: int, incident_ids: List[int]) -> Iterator[Op]:
+    """Endless stream of requests for a scenario."""
+    mix = _INGEST_MIX[name]
+    events = generate(sys.maxsize, seed=seed, mix=parse_mix(mix) if mix else None, users=1000)
+    rnd = random.Random(seed)
+    kinds, weights = zip(*_MIXED)
+    while True:
+        kind = rnd.choices(kinds, weights)[0] if name == "mixed" else "ingest"
+        if kind == "ingest":
+            yield _ingest(list(itertools.islice(events, batch)))
+        elif kind == "incidents":
+            yield Op("GET /incidents", "GET", "/incidents", params={"limit": 50}, collect_ids=incident_ids)
+        elif kind == "incident" and incident_ids:
+            yield Op("GET /incidents/{id}", "GET", f"/incidents/{rnd.choice(incident_ids)}")
+        else:
+            yield Op("GET /metrics", "GET", "/metrics")
+
+
+def replay_ops(path: str, batch: int, skipped: Counter) -> Iterator[Op]:
+    pending: List[dict] = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                skipped["invalid_json"] += 1
+                continue
+            if not isinstance(obj, dict):
+                skipped["not_an_object"] += 1
+            elif "path" in obj:
+                method = str(obj.get("method", "GET")).upper()
+                body = obj.get("json")
+                n = len(body["events"]) if isinstance(body, dict) and isinstance(body.get("events"), list) else 0
+                yield Op(f"{method} {obj.get('endpoint') or obj['path']}", method, obj["path"],
+                         params=obj.get("params"), json=body, events=n)
+            elif isinstance(obj.get("events"), list):
+                yield _ingest(obj["events"])
+            elif "message" in obj:
+                pending.append(obj)
+                if len(pending) >= batch:
+                    yield _ingest(pending)
+                    pending = []
+            else:
+                skipped["unrecognized"] += 1
+    if pending:
+        yield _ingest(pending)
+
+
+def _pct(xs: List[float], p: float) -> float:
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(len(xs) * p))], 2) if xs else 0.0
+
+
+def summarize(samples: Dict[str, List[float]], statuses: Dict[str, Counter], elapsed: float) -> dict:
+    out = {}
+    for endpoint in sorted(samples):
+        lat, st = samples[endpoint], statuses[endpoint]
+        errors = sum(n for code, n in st.items() if not (isinstance(code, int) and code < 400))
+        out[endpoint] = {
+            "requests": len(lat),
+            "errors": errors,
+            "error_rate": round(errors / len(lat), 4) if lat else 0.0,
+            "rps": round(len(lat) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": _pct(lat, 0.50),
+            "p95_ms": _pct(lat, 0.95),
+            "p99_ms": _pct(lat, 0.99),
+            "max_ms": round(max(lat), 2) if lat else 0.0,
+            "status": {str(k): v for k, v in sorted(st.items(), key=lambda kv: str(kv[0]))},
+        }
+    return out
+
+
+async def run_load(ops: Iterator[Op], base_url: str = API, rps: float = 0.0, concurrency: int = 8,
+                   duration: Optional[float] = None, max_requests: Optional[int] = None,
+                   timeout: float = 30.0, transport: Optional[httpx.AsyncBaseTransport] = None) -> dict:
+    """Send `ops` with `concurrency` workers; returns the report (without scenario metadata)."""
+    samples: Dict[str, List[float]] = {}
+    statuses: Dict[str, Counter] = {}
+    events_ok = [0]
+    slot = itertools.count()
+    t0 = time.perf_counter()
+    stop_at = t0 + duration if duration else None
+    limits = httpx.Limits(max_connections=concurrency + 2)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport) as client:
+        async def worker():
+            while True:
+                i = next(slot)
+                if max_requests is not None and i >= max_requests:
+                    return
+                scheduled = t0 + i / rps if rps > 0 else time.perf_counter()
+                if stop_at is not None and scheduled >= stop_at:
+                    return
+                op = next(ops, None)  # shared iterator; workers never await while holding it
+                if op is None:
+                    return
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                start = scheduled if rps > 0 else time.perf_counter()
+                try:
+                    r = await client.request(op.method, op.path, params=op.params, json=op.json)
+                    status = r.status_code
+                    if status == 200 and op.collect_ids is not None:
+                        op.collect_ids[:] = [i["id"] for i in r.json()] or op.collect_ids
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                samples.setdefault(op.endpoint, []).append((time.perf_counter() - start) * 1000)
+                statuses.setdefault(op.endpoint, Counter())[status] += 1
+                if status == 200:
+                    events_ok[0] += op.events
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - t0
+
+    endpoints = summarize(samples, statuses, elapsed)
+    total = sum(e["requests"] for e in endpoints.values())
+    errors = sum(e["errors"] for e in endpoints.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "events_ingested": events_ok[0],
+        "events_per_s": round(events_ok[0] / elapsed, 1) if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+
 def wait_for_health(url: str, max_wait: float = 15.0) -> bool:
     deadline = time.time() + max_wait
     delay = 0.5
     while time.time() < deadline:
         try:
-            res = requests.get(f"{url}/health", timeout=1.5)
-            if res.ok:
+            if httpx.get(f"{url}/health", timeout=1.5).status_code == 200:
                 return True
-        except Exception:
+        except httpx.HTTPError:
             pass
         time.sleep(delay)
         delay = min(2.5, delay * 1.5)
     return False
 
-def build_payload():
-    # Keep the shape compatible with your API; swap in your real generator if needed.
-    return {
-        "source": "seed",
-        "events": [
-            {"message": "Successful login for user alice@example.com from 203.0.113.10", "ts": "2025-08-22T10:00:00Z"},
-            {"message": "Failed login for user bob@example.com from 198.51.100.23", "ts": "2025-08-22T10:00:05Z"},
-        ],
-    }
+
+def _incident_ids(url: str) -> List[int]:
+    try:
+        return [i["id"] for i in httpx.get(f"{url}/incidents", params={"limit": 1000}, timeout=10).json()]
+    except (httpx.HTTPError, ValueError, KeyError, TypeError):
+        return []
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
 
 def main():
-    if not wait_for_health(API):
-        sys.stderr.write(f"[seed] API not reachable at {API}. Start the API first.\n")
-        sys.exit(2)
-    payload = build_payload()
+    ap = argparse.ArgumentParser(description="Seed the API or drive it with a configurable load.")
+    ap.add_argument("--api", default=API, help="base URL (default $API_URL or http://127.0.0.1:8000)")
+    ap.add_argument("--scenario", choices=SCENARIOS, default="seed")
+    ap.add_argument("--replay", default=None, help="NDJSON of requests, ingest bodies or events")
+    ap.add_argument("--rps", type=float, default=0.0, help="target requests/s (0 = unthrottled)")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--batch", type=int, default=50, help="events per POST /ingest/logs")
+    ap.add_argument("--duration", type=float, default=None, help="seconds to run")
+    ap.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--max-error-rate", type=float, default=0.05)
+    ap.add_argument("--start-server", action="store_true",
+                    help="run the API under uvicorn on a temp DB for the duration of the run")
+    ap.add_argument("--profile", default="sqlite-wal", help="DB_PROFILE for --start-server")
+    ap.add_argument("--out", default=None, help="write the JSON report here as well")
+    args = ap.parse_args()
+    if args.duration is None and args.requests is None and not args.replay:
+        args.requests = 20  # plain `make seed`: 20 batches of --batch events
+
+    proc = tmp = None
+    base = args.api.rstrip("/")
+    if args.start_server:
+        from scripts.bench_read_latency import start_server
+
+        tmp = tempfile.TemporaryDirectory()
+        port = _free_port()
+        proc = start_server(os.path.join(tmp.name, "load.db"), args.profile, port)
+        base = f"http://127.0.0.1:{port}"
     try:
-        r = requests.post(f"{API}/ingest/logs", json=payload, timeout=10)
-        print(r.status_code, r.text)
-        r.raise_for_status()
-    except RequestException as e:
-        sys.stderr.write(f"[seed] Request failed: {e}\n")
+        if not wait_for_health(base):
+            sys.stderr.write(f"[seed] API not reachable at {base}. Start the API first.\n")
+            sys.exit(2)
+        skipped: Counter = Counter()
+        if args.replay:
+            ops = replay_ops(args.replay, args.batch, skipped)
+        else:
+            ops = scenario_ops(args.scenario, args.batch, args.seed, _incident_ids(base))
+        report = asyncio.run(run_load(ops, base, args.rps, args.concurrency, args.duration, args.requests))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+            tmp.cleanup()
+
+    result = {
+        "api": base,
+        "scenario": "replay" if args.replay else args.scenario,
+        "target_rps": args.rps,
+        "concurrency": args.concurrency,
+        "batch": args.batch,
+        **report,
+    }
+    if skipped:
+        result["skipped_lines"] = dict(skipped)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if result["error_rate"] > args.max_error_rate:
         sys.exit(1)
 
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,138 @@
+# scripts/synth_logs.py
+"""
+Deterministic synthetic SOC log generator (same seed ⇒ same events).
+
+    PYTHONPATH=. python scripts/synth_logs.py N [--seed S] [--mix benign=60,stuffing=15,...] > events.ndjson
+
+Scenarios (weights via --mix):
+    benign     successful logins (the high-volume noise stream)
+    stuffing   credential-stuffing bursts: many auth_failures, then one auth_success
+    scan       port scans from one source across many ports
+    pii        messages dense with emails, phones, card numbers and IPs
+    long       multi-KB messages (stack traces, pasted payloads)
+
+`generate()` is a lazy iterator, so millions of events don't need to fit in memory.
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, Optional
+
+DEFAULT_MIX = {"benign": 60, "stuffing": 15, "scan": 10, "pii": 10, "long": 5}
+_START = datetime(2025, 8, 22, tzinfo=timezone.utc)
+_REGIONS = ["ksa", "ksa", "uae", "sa", "ae"]
+
+
+def _ts(t: float) -> str:
+    return (_START + timedelta(seconds=t)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _luhn_card(rnd: random.Random) -> str:
+    digits = [4] + [rnd.randint(0, 9) for _ in range(14)]
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        d = d * 2 if i % 2 == 0 else d
+        total += d - 9 if d > 9 else d
+    digits.append((10 - total % 10) % 10)
+    s = "".join(map(str, digits))
+    return " ".join(s[i:i + 4] for i in range(0, 16, 4))
+
+
+class _Gen:
+    def __init__(self, seed: int, users: int):
+        self.rnd = random.Random(seed)
+        self.users = [f"user{i}" for i in range(users)]
+        self.t = 0.0
+
+    def _tick(self, mean: float = 0.5) -> str:
+        self.t += self.rnd.expovariate(1 / mean)
+        return _ts(self.t)
+
+    def _ip(self) -> str:
+        r = self.rnd
+        return f"{r.choice([203, 198, 192])}.{r.randint(0, 255)}.{r.randint(0, 255)}.{r.randint(1, 254)}"
+
+    def _base(self, et: str, user: str, ip: str, message: str) -> dict:
+        # region is stable per user so a burst stays in one residency tag
+        region = _REGIONS[sum(map(ord, user)) % len(_REGIONS)] if user else "ksa"
+        return {"source": "synth", "event_type": et, "user": user, "ip": ip,
+                "region": region, "message": message, "ts": self._tick()}
+
+    def benign(self):
+        u = self.rnd.choice(self.users)
+        ip = self._ip()
+        yield self._base("auth_success", u, ip, f"Successful login for user {u}@example.com from {ip}")
+
+    def stuffing(self):
+        u = self.rnd.choice(self.users)
+        ip = self._ip()
+        for _ in range(self.rnd.randint(5, 30)):
+            yield self._base("auth_failure", u, ip, f"Failed login for user {u}@example.com from {ip}")
+        if self.rnd.random() < 0.6:
+            yield self._base("auth_success", u, ip, f"Successful login for user {u}@example.com from {ip}")
+
+    def scan(self):
+        ip = self._ip()
+        target = self._ip()
+        for port in self.rnd.sample(range(1, 65535), self.rnd.randint(10, 50)):
+            yield self._base("port_scan", "", ip, f"Connection attempt from {ip} to {target}:{port} rejected")
+
+    def pii(self):
+        u = self.rnd.choice(self.users)
+        r = self.rnd
+        msg = (
+            f"Support ticket from {u}@example.com (+966 5{r.randint(0, 9)} {r.randint(100, 999)} {r.randint(1000, 9999)}): "
+            f"card {_luhn_card(r)} declined, alt contact {u}.backup@mail.example.org, "
+            f"client {self._ip()} via proxy {self._ip()}, order #{r.randint(10**6, 10**7)}"
+        )
+        yield self._base(r.choice(["api_key_use", "data_access"]), u, self._ip(), msg)
+
+    def long(self):
+        u = self.rnd.choice(self.users)
+        frames = "\n".join(
+            f"  at com.example.svc{self.rnd.randint(0, 99)}.Handler.call(Handler.java:{self.rnd.randint(1, 999)})"
+            for _ in range(self.rnd.randint(40, 120))
+        )
+        yield self._base("app_error", u, self._ip(), f"Unhandled exception for user {u}@example.com\n{frames}")
+
+
+def generate(n: int, seed: int = 42, mix: Optional[Dict[str, int]] = None, users: Optional[int] = None) -> Iterator[dict]:
+    """Yield exactly `n` events drawn from the scenario mix."""
+    mix = mix or DEFAULT_MIX
+    g = _Gen(seed, users or max(10, n // 100))
+    names = [k for k, w in mix.items() if w > 0]
+    weights = [mix[k] for k in names]
+    produced = 0
+    while produced < n:
+        for evt in getattr(g, g.rnd.choices(names, weights)[0])():
+            yield evt
+            produced += 1
+            if produced >= n:
+                return
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, w = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"unknown scenario {name!r}; expected {sorted(DEFAULT_MIX)}")
+        mix[name.strip()] = int(w or 1)
+    return mix
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write N synthetic SOC events as NDJSON to stdout.")
+    ap.add_argument("n", type=int)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--mix", type=parse_mix, default=None, help="e.g. benign=60,stuffing=15,scan=10,pii=10,long=5")
+    args = ap.parse_args()
+    out = sys.stdout
+    for evt in generate(args.n, args.seed, args.mix):
+        out.write(json.dumps(evt, separators=(",", ":")) + "\n")
+
+
+if __name__ == "__main__":
+    main()
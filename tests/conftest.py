@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os, tempfile
+
+# Keep test runs off the developer's ./soc.db (schema may be older than the models).
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='soc-test-'), 'soc.db')}"
+)
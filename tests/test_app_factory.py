@@ -0,0 +1,39 @@
+# tests/test_app_factory.py
+import os, subprocess, sys
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from app.api.main import create_app
+from app.core.schema import ensure_schema, schema_version, stored_version
+from app.core.settings import Settings
+
+def test_importing_main_defers_the_app_and_its_dependencies():
+    code = ("import sys, app.api.main; "
+            "print(sorted(m for m in ('app.api.routes', 'sqlalchemy', 'fastapi') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         env={**os.environ, "PYTHONPATH": os.getcwd()})
+    assert out.stdout.strip() == "[]"
+
+def test_schema_check_is_skipped_once_the_version_matches(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 's.db'}")
+    assert stored_version(eng) is None
+    assert ensure_schema(eng) is True
+    assert stored_version(eng) == schema_version()
+    assert ensure_schema(eng) is False
+    assert ensure_schema(eng, force=True) is True
+
+def test_settings_are_validated():
+    s = Settings.from_env({"STORE_RAW": "true", "BENIGN_TYPES": "Auth_Success, dns_query"})
+    assert s.store_raw and s.benign_types == {"auth_success", "dns_query"}
+    with pytest.raises(ValueError, match="INGEST_WORKERS"):
+        Settings.from_env({"INGEST_WORKERS": "0"})
+    with pytest.raises(ValueError, match="INCIDENTS_PAGE_MAX"):
+        Settings.from_env({"INCIDENTS_PAGE_DEFAULT": "500", "INCIDENTS_PAGE_MAX": "100"})
+
+def test_lifespan_starts_and_stops_an_app_more_than_once():
+    for _ in range(2):
+        with TestClient(create_app()) as client:
+            assert client.get("/health").json() == {"ok": True}
+            r = client.post("/ingest/logs", params={"mode": "async"},
+                            json={"events": [{"event_type": "port_scan", "message": "scan"}]})
+            assert r.status_code == 202
@@ -0,0 +1,40 @@
+# tests/test_async_reads.py
+import asyncio, inspect, uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.api import main, routes
+from app.core.db import async_url, build_async_engine
+
+client = TestClient(main.app)
+
+def test_async_url_maps_drivers():
+    assert async_url("sqlite:///./soc.db") == "sqlite+aiosqlite:///./soc.db"
+    assert async_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    with pytest.raises(ValueError):
+        async_url("mysql://h/db")
+
+def test_async_engine_uses_the_profile(tmp_path):
+    async def pragmas():
+        eng = build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'a.db'}", "sqlite-wal")
+        async with eng.connect() as conn:
+            mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        await eng.dispose()
+        return mode
+    assert asyncio.run(pragmas()) == "wal"
+
+def test_read_endpoints_are_async_and_match_sync_writes():
+    for fn in (routes.list_incidents, routes.get_incident, routes.evidence, routes.health):
+        assert inspect.iscoroutinefunction(fn)
+    user = f"ar-{uuid.uuid4().hex[:8]}"
+    ev = {"source": "app", "event_type": "port_scan", "user": user, "ip": "10.7.7.7",
+          "message": f"scan by {user} from 10.7.7.7", "ts": "2025-08-22T10:00:00Z"}
+    assert client.post("/ingest/logs", json={"events": [ev]}).status_code == 200
+    recent = client.get("/events/recent", params={"limit": 1}).json()[0]
+    evidence = client.get(f"/evidence/{recent['id']}").json()
+    assert evidence["redacted"] == f"scan by {user} from [REDACTED:IP]"
+    assert client.get(f"/events/{recent['id']}/evidence").json() == evidence
+    inc = client.get(f"/incidents/{recent['incident_id']}").json()
+    assert inc["sample_redacted"] == evidence["redacted"]
+    assert inc["id"] in [i["id"] for i in client.get("/incidents", params={"event_type": "port_scan"}).json()]
+    assert client.get("/evidence/999999999").status_code == 404
@@ -0,0 +1,47 @@
+# tests/test_batch_ingest.py
+import uuid
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core.db import SessionLocal
+import app.core.models as models
+
+client = TestClient(app)
+
+def _incidents_for(user):
+    db = SessionLocal()
+    try:
+        return db.query(models.Incident).filter(models.Incident.title.like(f"%{user}")).all()
+    finally:
+        db.close()
+
+def test_batch_groups_events_and_keeps_noise_semantics():
+    user = f"batch-{uuid.uuid4().hex[:8]}"
+    ev = {"source": "app", "user": user, "ip": "10.0.0.1", "ts": "2025-08-22T10:00:00Z"}
+    events = (
+        [{**ev, "event_type": "auth_failure", "message": "Failed login"}] * 3
+        + [{**ev, "event_type": "auth_success", "message": "Successful login"}] * 2
+    )
+    r = client.post("/ingest/logs", json={"events": events})
+    assert r.status_code == 200
+    assert r.json()["ingested"] == 5
+
+    incs = {i.status: i for i in _incidents_for(user)}
+    assert set(incs) == {"open", "noise"}
+    assert incs["open"].count == 3
+    assert incs["noise"].count == 2
+    assert "2 hits" in incs["noise"].summary
+
+def test_batch_promotes_fail_then_success_noise():
+    user = f"promo-{uuid.uuid4().hex[:8]}"
+    ev = {"source": "app", "user": user, "ip": "10.0.0.2"}
+    fails = [{**ev, "event_type": "auth_failure", "message": "Failed login", "ts": f"2025-08-22T11:00:0{i}Z"}
+             for i in range(5)]
+    # failures and the success land in different batches and cluster keys
+    assert client.post("/ingest/logs", json={"events": fails}).status_code == 200
+    ok = {**ev, "event_type": "auth_success", "message": "Successful login", "ts": "2025-08-22T11:03:00Z"}
+    assert client.post("/ingest/logs", json={"events": [ok]}).status_code == 200
+
+    success = [i for i in _incidents_for(user) if i.event_type == "auth_success"]
+    assert len(success) == 1
+    assert success[0].status == "open"
+    assert success[0].summary.startswith("Promotion: 5 failures")
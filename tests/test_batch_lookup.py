@@ -0,0 +1,34 @@
+# tests/test_batch_lookup.py
+import uuid
+from fastapi.testclient import TestClient
+from app.api.main import app
+
+client = TestClient(app)
+
+def test_evidence_and_incident_batches_and_recent_events():
+    user = f"bl-{uuid.uuid4().hex[:8]}"
+    evs = [{"source": "app", "event_type": t, "user": user, "ip": "10.5.5.5", "message": f"{t} {user}",
+            "ts": "2025-08-22T10:00:00Z"} for t in ("auth_success", "port_scan", "port_scan")]
+    assert client.post("/ingest/logs", json={"events": evs}).status_code == 200
+
+    page = client.get("/events/recent", params={"limit": 2})
+    recent = page.json()
+    assert [e["event_type"] for e in recent] == ["port_scan", "port_scan"]
+    older = client.get("/events/recent", params={"limit": 1, "before_id": page.headers["X-Next-Cursor"]}).json()
+    assert older[0]["event_type"] == "auth_success" and older[0]["incident_status"] == "noise"
+
+    ids = [e["id"] for e in recent] + [older[0]["id"], 999999999]
+    ev = client.post("/evidence/batch", json={"ids": ids}).json()
+    assert ev["missing"] == [999999999]
+    assert {e["event_id"] for e in ev["items"]} == set(ids[:3])
+    for item in ev["items"]:
+        assert item == {**client.get(f"/evidence/{item['event_id']}").json(),
+                        "incident_status": item["incident_status"], "incident_title": item["incident_title"]}
+
+    inc_ids = sorted({e["incident_id"] for e in ev["items"]})
+    inc = client.post("/incidents/batch", json={"ids": inc_ids + [999999999]}).json()
+    assert inc["missing"] == [999999999]
+    for item in inc["items"]:
+        assert item == client.get(f"/incidents/{item['id']}").json()
+
+    assert client.post("/evidence/batch", json={"ids": list(range(1001))}).status_code == 422
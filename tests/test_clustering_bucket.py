@@ -1,6 +1,8 @@
 # tests/test_clustering_bucket.py
 from fastapi.testclient import TestClient
 from app.api.main import app
+from app.pipeline.clustering import cluster_key, explain_cluster
+from app.pipeline.pii_redactor import redact_entities
 
 client = TestClient(app)
 
@@ -16,3 +18,18 @@ def test_time_bucket_splits_clusters():
     # Pull recent incidents and ensure at least 2 separate incidents present among latest few
     incs = client.get("/incidents").json()
     assert len(incs) >= 2
+
+def test_users_in_message_text_get_their_own_clusters():
+    # no explicit user/ip fields: the actor comes from the message's entities
+    ts = "2025-08-25T10:00:00Z"
+    keys = set()
+    for who in ("a@x.com", "b@x.com", "user carol"):
+        evt = {"event_type": "auth_failure", "message": f"Failed login for {who} from 1.2.3.4", "ts": ts}
+        keys.add(cluster_key(evt, redact_entities(evt["message"])[2]))
+    assert len(keys) == 3
+    # explicit fields and message entities pseudonymize the same way
+    evt = {"event_type": "auth_failure", "user": "A@x.com", "ip": "1.2.3.4", "ts": ts}
+    msg = redact_entities("Failed login for user a@x.com from 1.2.3.4")[2]
+    assert cluster_key(evt) == cluster_key({**evt, "user": None, "ip": None}, msg)
+    tokens = explain_cluster(evt)["tokens"]
+    assert "a@x.com" not in tokens.values() and "1.2.3.4" not in tokens.values()
@@ -0,0 +1,17 @@
+# tests/test_db_profiles.py
+import pytest
+from sqlalchemy import text
+from app.core.db import build_engine
+
+def test_sqlite_wal_profile_sets_pragmas(tmp_path):
+    eng = build_engine(f"sqlite:///{tmp_path / 'wal.db'}", "sqlite-wal")
+    with eng.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert eng.pool.size() == 10
+    eng.dispose()
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        build_engine("sqlite://", "turbo")
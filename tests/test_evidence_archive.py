@@ -0,0 +1,39 @@
+# tests/test_evidence_archive.py
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app.api.main import app
+from app.core import archive
+from app.core.db import SessionLocal
+import app.core.models as models
+
+client = TestClient(app)
+
+def test_archived_events_resolve_transparently():
+    user = f"arc-{uuid.uuid4().hex[:8]}"
+    evs = [{"source": "app", "event_type": "port_scan", "user": user, "ip": "10.3.3.3",
+            "message": f"scan {i} by {user} from 10.3.3.3", "ts": "2025-08-22T10:00:00Z"} for i in range(20)]
+    assert client.post("/ingest/logs", json={"events": evs}).status_code == 200
+
+    db = SessionLocal()
+    try:
+        inc = db.query(models.Incident).filter(models.Incident.title.like(f"%{user}")).one()
+        ids = [e.id for e in db.query(models.Event).filter_by(incident_id=inc.id).order_by(models.Event.id)]
+        before = {i: client.get(f"/evidence/{i}").json() for i in ids}
+        db.execute(update(models.Event).where(models.Event.incident_id == inc.id)
+                   .values(created_at=datetime.utcnow() - timedelta(days=10)))
+        db.commit()
+
+        stats = archive.archive_cold(SessionLocal, days=3, block_events=8)
+        assert stats["events"] >= 20
+        rows = db.query(models.Event).filter_by(incident_id=inc.id).all()
+        assert all(r.archive_block_id is not None and r.redacted == "" for r in rows)
+        assert len({r.archive_block_id for r in rows}) == 3  # 8 + 8 + 4
+    finally:
+        db.close()
+
+    for i in ids:
+        assert client.get(f"/evidence/{i}").json() == before[i]
+    assert client.get(f"/incidents/{inc.id}/evidence").json()["redacted"] == before[ids[0]]["redacted"]
+    assert client.get(f"/incidents/{inc.id}").json()["sample_redacted"] == before[ids[-1]]["redacted"]
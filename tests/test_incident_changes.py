@@ -0,0 +1,46 @@
+# tests/test_incident_changes.py
+import json, uuid
+from fastapi.testclient import TestClient
+from app.api.main import app
+
+client = TestClient(app)
+
+def _drain(cursor):
+    seen = {}
+    while True:
+        page = client.get("/incidents/changes", params={"since": cursor, "limit": 2}).json()
+        seen.update({i["id"]: i for i in page["items"]})
+        cursor = page["cursor"]
+        if not page["more"]:
+            return seen, cursor
+
+def test_feed_returns_only_incidents_changed_after_the_cursor():
+    _, cursor = _drain(None)
+    tag = uuid.uuid4().hex[:8]
+    events = [{"source": "app", "event_type": "port_scan", "user": f"{tag}-{n}", "ip": "10.7.7.7",
+               "message": "scan", "ts": "2025-08-22T10:00:00Z"} for n in range(3)]
+    assert client.post("/ingest/logs", json={"events": events}).status_code == 200
+    seen, cursor = _drain(cursor)
+    assert len(seen) == 3 and len({i["change_seq"] for i in seen.values()}) == 1
+    assert _drain(cursor) == ({}, cursor)  # nothing new
+
+    iid = min(seen)
+    assert client.post(f"/incidents/{iid}/approve_action", json={"action_name": "x"}).status_code == 200
+    again, _ = _drain(cursor)
+    assert list(again) == [iid] and again[iid]["change_seq"] > seen[iid]["change_seq"]
+    assert again[iid]["last_seen"] == seen[iid]["last_seen"]  # stamping is not an update
+    assert client.get("/incidents/changes", params={"since": "x:1"}).status_code == 400
+
+def test_stream_sends_pages_as_server_sent_events():
+    _, cursor = _drain(None)
+    ev = {"source": "app", "event_type": "port_scan", "user": f"sse-{uuid.uuid4().hex[:8]}",
+          "ip": "10.6.6.6", "message": "scan"}
+    assert client.post("/ingest/logs", json={"events": [ev]}).status_code == 200
+    with client.stream("GET", "/incidents/changes/stream",
+                       params={"since": cursor, "max_seconds": 0.5}) as r:
+        assert r.headers["content-type"].startswith("text/event-stream")
+        body = "".join(r.iter_text())
+    block = body.split("\n\n")[0].splitlines()
+    assert block[1] == "event: changes"
+    page = json.loads(block[2][len("data: "):])
+    assert block[0] == f"id: {page['cursor']}" and page["items"][0]["title"]
@@ -0,0 +1,43 @@
+# tests/test_incident_export.py
+import csv
+import io
+import json
+import uuid
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core.db import SessionLocal
+from app.core.export import iter_events
+import app.core.models as models
+
+client = TestClient(app)
+
+def _incident(user):
+    evs = [{"source": "app", "event_type": "port_scan", "user": user, "ip": "10.4.4.4",
+            "message": f"scan {i} by {user}", "ts": "2025-08-22T10:00:00Z"} for i in range(25)]
+    assert client.post("/ingest/logs", json={"events": evs}).status_code == 200
+    db = SessionLocal()
+    try:
+        return db.query(models.Incident).filter(models.Incident.title.like(f"%{user}")).one().id
+    finally:
+        db.close()
+
+def test_export_ndjson_is_complete_and_resumable():
+    iid = _incident(f"exp-{uuid.uuid4().hex[:8]}")
+    r = client.get(f"/incidents/{iid}/export", params={"limit": 10})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    first = [json.loads(line) for line in r.text.splitlines()]
+    assert len(first) == 10
+    rest = client.get(f"/incidents/{iid}/export", params={"after_id": first[-1]["id"]}).text.splitlines()
+    ids = [e["id"] for e in first] + [json.loads(line)["id"] for line in rest]
+    assert len(ids) == 25 and ids == sorted(set(ids))
+    assert "scan 0 by" in first[0]["redacted"]
+
+def test_export_csv_filters_and_streams_in_chunks():
+    iid = _incident(f"exp-{uuid.uuid4().hex[:8]}")
+    r = client.get(f"/incidents/{iid}/export", params={"format": "csv", "event_type": "PORT_SCAN"})
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == 25 and rows[0]["event_type"] == "port_scan"
+    assert client.get(f"/incidents/{iid}/export", params={"event_type": "auth_success"}).text == ""
+    # one chunk per yield_per partition
+    assert len(list(iter_events(SessionLocal, iid, yield_per=10))) == 3
+    assert client.get("/incidents/999999999/export").status_code == 404
@@ -0,0 +1,53 @@
+# tests/test_incident_upsert.py
+import uuid
+from app.api import routes  # registers hooks
+from app.core import counters
+from app.core.db import SessionLocal
+from app.core.incidents import upsert_incident, upsert_incidents
+import app.core.models as models
+
+routes.prepare_schema()  # importing the app no longer touches the DB
+
+def test_upsert_is_idempotent_and_accumulates_count():
+    ck = f"ck-{uuid.uuid4().hex}"
+    db = SessionLocal()
+    try:
+        first = upsert_incident(db, ck, title="t", status="noise")
+        again = upsert_incidents(db, [{"cluster_key": ck, "title": "other", "status": "open", "count": 3}])
+        db.commit()
+        iid, count, status, inserted = again[ck]
+        assert iid == first
+        assert not inserted
+        assert count == 3
+        assert status == "noise"  # existing row wins on conflict
+        assert db.query(models.Incident).filter_by(cluster_key=ck).count() == 1
+    finally:
+        db.close()
+
+def test_flush_hook_attaches_incident_once_per_key():
+    ck = f"ck-{uuid.uuid4().hex}"
+    db = SessionLocal()
+    try:
+        evs = [models.Event(source="t", event_type="x", residency_tag="SA", cluster_key=ck) for _ in range(3)]
+        db.add_all(evs)
+        db.commit()
+        assert len({e.incident_id for e in evs}) == 1
+        assert evs[0].incident_id is not None
+    finally:
+        db.close()
+
+def test_new_incidents_and_hook_events_bump_counters():
+    ck = f"ck-{uuid.uuid4().hex}"
+    db = SessionLocal()
+    try:
+        before = counters.read_all(db)
+        res = upsert_incidents(db, [{"cluster_key": ck, "title": "t", "status": "open", "count": 5}])
+        assert res[ck].inserted and res[ck].count == 5
+        db.add(models.Event(source="t", event_type="X", residency_tag="SA", cluster_key=f"{ck}-2"))
+        db.commit()
+        after = counters.read_all(db)
+        assert after["incidents"][""] == before["incidents"][""] + 2
+        assert after["events"][""] == before["events"][""] + 1
+        assert after["events_by_type"]["x"] == before.get("events_by_type", {}).get("x", 0) + 1
+    finally:
+        db.close()
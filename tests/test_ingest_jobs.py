@@ -0,0 +1,44 @@
+# tests/test_ingest_jobs.py
+import threading, time
+import pytest
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core.jobs import IngestQueue, QueueClosed, QueueFull
+
+client = TestClient(app)
+
+def test_async_ingest_returns_202_and_job_completes():
+    evs = [{"source": "app", "event_type": "auth_failure", "message": "Failed login for user j1",
+            "ts": "2025-08-24T10:00:00Z"}] * 3
+    r = client.post("/ingest/logs?mode=async", json={"events": evs})
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+
+    for _ in range(100):
+        job = client.get(f"/ingest/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(0.05)
+    assert job["status"] == "done"
+    assert job["ingested"] == 3 and job["error_count"] == 0
+    assert client.get("/ingest/jobs/nope").status_code == 404
+
+def test_full_queue_raises_and_shutdown_drains():
+    gate = threading.Event()
+    done = []
+    def handler(events):
+        gate.wait(5)
+        done.extend(events)
+        return len(events)
+
+    q = IngestQueue(handler, maxsize=1, workers=1)
+    q.submit([1])          # picked up by the worker, blocks on the gate
+    time.sleep(0.05)
+    q.submit([2])          # fills the queue
+    with pytest.raises(QueueFull):
+        q.submit([3])
+    gate.set()
+    q.shutdown(timeout=5)
+    assert done == [1, 2]
+    with pytest.raises(QueueClosed):
+        q.submit([4])
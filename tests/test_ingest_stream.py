@@ -0,0 +1,53 @@
+# tests/test_ingest_stream.py
+import json
+from fastapi.testclient import TestClient
+from app.api import routes
+from app.api.main import app
+
+client = TestClient(app)
+
+def test_ndjson_stream_commits_batches_and_reports_bad_lines():
+    good = {"source": "app", "event_type": "auth_failure", "message": "Failed login for user s1 from 10.0.0.9",
+            "ts": "2025-08-23T10:00:00Z"}
+    lines = [json.dumps(good)] * 3 + ["{not json", json.dumps({"event_type": "x"}), "", json.dumps(good)]
+    body = ("\n".join(lines) + "\n").encode()
+
+    r = client.post(
+        "/ingest/stream?batch_size=2",
+        content=iter([body[:37], body[37:]]),  # chunk boundary mid-line
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert r.status_code == 200
+    out = r.json()
+    assert out["ingested"] == 4
+    assert out["batches"] == 2
+    assert out["status"] == "partial"
+    assert [e["line"] for e in out["errors"]] == [4, 5]
+    bad_offset = body.index(b"{not json")
+    assert out["errors"][0]["offset"] == bad_offset
+    assert "message" in out["errors"][1]["error"]
+
+def test_ndjson_stream_rejects_other_content_types():
+    r = client.post("/ingest/stream", content=b"{}", headers={"content-type": "text/plain"})
+    assert r.status_code == 415
+
+def test_ndjson_stream_reports_failed_batch_and_continues(monkeypatch):
+    real = routes._commit_micro_batch
+    calls = []
+    def flaky(events):
+        calls.append(len(events))
+        if len(calls) == 2:
+            raise RuntimeError("database is locked")
+        return real(events)
+    monkeypatch.setattr(routes, "_commit_micro_batch", flaky)
+
+    good = json.dumps({"event_type": "auth_failure", "message": "Failed login for user s2",
+                       "ts": "2025-08-23T11:00:00Z"})
+    body = ("\n".join([good] * 5) + "\n").encode()
+    r = client.post("/ingest/stream?batch_size=2", content=body,
+                    headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 200
+    out = r.json()
+    assert out["ingested"] == 3 and out["failed_batches"] == 1
+    assert out["errors"] == [{"line": 3, "last_line": 4, "offset": 2 * (len(good) + 1),
+                              "error": "batch not committed: RuntimeError"}]
@@ -0,0 +1,30 @@
+# tests/test_metrics_counters.py
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core import counters
+from app.core.db import SessionLocal
+
+client = TestClient(app)
+
+def test_metrics_track_ingest_and_match_rebuild():
+    before = client.get("/metrics").json()
+    evs = [
+        {"source": "app", "event_type": "port_scan", "message": "scan from 10.9.9.9", "user": "m1",
+         "region": "uae", "ts": "2025-08-26T10:00:00Z"},
+        {"source": "app", "event_type": "port_scan", "message": "scan from 10.9.9.9", "user": "m1",
+         "region": "uae", "ts": "2025-08-26T10:00:01Z"},
+    ]
+    assert client.post("/ingest/logs", json={"events": evs}).status_code == 200
+    after = client.get("/metrics").json()
+    assert after["events"] == before["events"] + 2
+    assert after["incidents"] == before["incidents"] + 1
+    assert after["events_by_type"]["port_scan"] == before["events_by_type"].get("port_scan", 0) + 2
+    assert after["events_by_residency"]["AE"] == before["events_by_residency"].get("AE", 0) + 2
+
+    db = SessionLocal()
+    try:
+        rebuilt = counters.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    assert rebuilt["events"][""] == client.get("/metrics").json()["events"]
@@ -1,4 +1,9 @@
-from app.pipeline.pii_redactor import redact_pii
+import json, os, time
+from app.pipeline.pii_redactor import (
+    pseudonym, redact_batch, redact_entities, redact_pii, redact_pii_counts,
+)
+
+CORPUS = os.path.join(os.path.dirname(__file__), "pii_corpus.jsonl")
 
 def test_redact_email_ip_phone():
     text = "User john.doe@example.com from 192.168.1.1 called +1 (416) 555-1212"
@@ -7,3 +12,44 @@ def test_redact_email_ip_phone():
     assert "192.168.1.1" not in red
     assert "416" not in red
     assert n >= 3
+
+def test_regression_corpus():
+    with open(CORPUS) as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    for case in cases:
+        red, counts = redact_pii_counts(case["text"])
+        assert red == case["expected"], case["text"]
+        assert counts == case["counts"], case["text"]
+    batch = redact_batch([c["text"] for c in cases])
+    assert [r for r, _ in batch] == [c["expected"] for c in cases]
+
+def test_entities_are_pseudonyms_from_the_same_scan():
+    red, counts, ents = redact_entities("Failed login for user Alice@Example.com from 10.0.0.7")
+    assert red == "Failed login for user [REDACTED:EMAIL] from [REDACTED:IP]"
+    assert counts == {"EMAIL": 1, "IP": 1}
+    assert ents == {"user": pseudonym("user", "alice@example.com"),
+                    "email": pseudonym("user", "alice@example.com"),
+                    "ip": pseudonym("ip", "10.0.0.7")}
+    assert "alice" not in str(ents) and len(ents["ip"]) == 16
+    # plain usernames are kept in the text but still become entities
+    red, _, ents = redact_entities("sudo by user bob, tty1")
+    assert red == "sudo by user bob, tty1" and ents == {"user": pseudonym("user", "bob")}
+    # already-redacted tokens are not users
+    assert redact_entities("login for user [redacted:email]")[2] == {}
+
+def _best_of(fn, arg, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def test_adversarial_digit_runs_are_linear():
+    # doubling the input should roughly double the time (quadratic would be ~4x)
+    units = ["1" + " " * 64, "1 ", "12-", "9", "a."]
+    for unit in units:
+        n = 40000 // len(unit)
+        small = _best_of(redact_pii, unit * n)
+        large = _best_of(redact_pii, unit * (2 * n))
+        assert large < 3.2 * small + 0.005, unit
@@ -0,0 +1,18 @@
+# tests/test_pipeline_executor.py
+from app.pipeline import executor
+from app.pipeline.executor import prepare_events, shutdown_pool
+
+def test_pool_matches_in_process_and_keeps_order(monkeypatch):
+    events = [
+        {"event_type": "auth_failure", "message": f"Failed login for user u{i} from 10.0.{i % 250}.1",
+         "ts": "2025-08-22T10:00:00Z", "region": "uae" if i % 3 else "sa"}
+        for i in range(120)
+    ]
+    local = prepare_events(events, "SA")
+    monkeypatch.setattr(executor, "PIPELINE_WORKERS", 2)
+    pooled = prepare_events(events, "SA", threshold=10, chunk_size=25)
+    shutdown_pool()
+    assert pooled == local
+    red, norm, ck, tag, (user, ip) = pooled[1]
+    assert "[REDACTED:IP]" in red and tag == "AE" and len(ck) == 16
+    assert user and ip and "u1" not in (user, ip)
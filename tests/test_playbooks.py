@@ -0,0 +1,66 @@
+# tests/test_playbooks.py
+import json, os, uuid
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core import cache
+from app.playbooks import engine as playbooks
+from app.playbooks.engine import PlaybookEngine
+
+client = TestClient(app)
+
+def _write(path, rules, mtime):
+    with open(path, "w") as f:
+        json.dump({"playbooks": rules}, f)
+    os.utime(path, ns=(mtime, mtime))
+
+def test_default_rules_match_the_old_suggester():
+    eng = PlaybookEngine(memo_size=0)
+    assert eng.suggest("auth_failure")["playbooks"] == ["auth_failure"]
+    assert eng.suggest("Port_Scan")["playbooks"] == ["port_scan"]
+    assert eng.suggest("nmap_probe")["actions"][0] == "Block offending IP at edge firewall."
+    assert eng.suggest("dns_query")["playbooks"] == ["default"]
+
+def test_fields_are_anded_and_rules_hot_reload(tmp_path):
+    path = str(tmp_path / "rules.json")
+    rules = [
+        {"id": "ssh_spray", "priority": 5, "actions": ["Rotate SSH keys."],
+         "match": {"event_types": ["auth"], "keywords": ["sshd"], "sources": ["bastion"]}},
+        {"id": "fallback", "default": True, "actions": ["Triage."]},
+    ]
+    _write(path, rules, 1_000_000_000)
+    eng = PlaybookEngine(str(tmp_path), reload_seconds=0)
+    assert eng.suggest("auth_failure", "sshd: failed password", "Bastion")["playbooks"] == ["ssh_spray"]
+    assert eng.suggest("auth_failure", "sshd: failed password", "vpn")["playbooks"] == ["fallback"]
+
+    rules.append({"id": "any_sshd", "priority": 9, "actions": ["Check sshd config.", "Rotate SSH keys."],
+                  "match": {"keywords": ["sshd"]}})
+    _write(path, rules, 2_000_000_000)
+    res = eng.suggest("auth_failure", "sshd: failed password", "bastion")
+    assert res == {"playbooks": ["any_sshd", "ssh_spray"], "actions": ["Check sshd config.", "Rotate SSH keys."]}
+
+    with open(path, "w") as f:
+        f.write("{broken")
+    assert eng.refresh(force=True) is False
+    assert eng.suggest("x", "sshd")["playbooks"] == ["any_sshd"]  # previous rules stay active
+    assert eng.stats()["reload_errors"] == 1
+
+def test_endpoint_memoizes_until_a_new_event_arrives():
+    user = f"pb-{uuid.uuid4().hex[:8]}"
+    ev = {"source": "app", "event_type": "port_scan", "user": user, "ip": "10.9.9.9",
+          "message": "nmap from 10.9.9.9", "ts": "2025-08-22T10:00:00Z"}
+    assert client.post("/ingest/logs", json={"events": [ev]}).status_code == 200
+    iid = client.get("/events/recent", params={"limit": 1}).json()[0]["incident_id"]
+
+    before = playbooks.matcher.stats()
+    first = client.post(f"/incidents/{iid}/suggest_actions").json()
+    assert first["playbooks"] == ["port_scan"]
+    cache.responses.clear()  # the response cache would answer before the memo
+    assert client.post(f"/incidents/{iid}/suggest_actions").json() == first
+    after = playbooks.matcher.stats()
+    assert after["memo_misses"] - before["memo_misses"] == 1
+    assert after["memo_hits"] - before["memo_hits"] == 1
+
+    assert client.post("/ingest/logs", json={"events": [ev]}).status_code == 200
+    client.post(f"/incidents/{iid}/suggest_actions")
+    assert playbooks.matcher.stats()["memo_misses"] - after["memo_misses"] == 1
+    assert client.post("/incidents/999999999/suggest_actions").status_code == 404
@@ -0,0 +1,22 @@
+# tests/test_promotion.py
+from app.pipeline.promotion import PromotionDetector
+
+def test_detector_expires_old_failures_and_promotes_once():
+    d = PromotionDetector(window_seconds=60, failures=3, max_keys=10)
+    for t in (0, 1, 2):
+        assert d.observe("u", "1.1.1.1", "auth_failure", t) is None
+    assert d.observe("u", "1.1.1.1", "auth_success", 100) is None  # failures expired
+
+    for t in (200, 201, 202):
+        d.observe("u", "1.1.1.1", "auth_failure", t)
+    assert d.observe("u", "1.1.1.1", "auth_success", 203).startswith("Promotion: 3 failures")
+    assert d.observe("u", "1.1.1.1", "auth_success", 204) is None
+    assert d.stats()["promotions"] == 1
+
+def test_detector_caps_windows_with_lru_eviction():
+    d = PromotionDetector(window_seconds=3600, failures=2, max_keys=3)
+    for i in range(5):
+        d.observe(f"u{i}", "", "auth_failure", 10)
+    st = d.stats()
+    assert st["windows"] == 3
+    assert st["evicted"] == 2
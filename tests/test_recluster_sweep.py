@@ -0,0 +1,26 @@
+# tests/test_recluster_sweep.py
+from app.pipeline.clustering import cluster_key
+from app.pipeline.pii_redactor import redact_entities
+from scripts.recluster_sweep import evaluate, load, sweep
+from scripts.synth_logs import generate
+
+BENIGN, CRITICAL = {"auth_success"}, {"auth_failure"}
+
+def test_sweep_matches_cluster_key_and_is_monotonic():
+    events = list(generate(3000, seed=5))
+    data = load(iter(events), BENIGN, CRITICAL)
+    for b in (300, 900):
+        keys = {cluster_key(e, redact_entities(e["message"])[2], b) for e in events}
+        assert evaluate(b, data)["incidents"] == len(keys)
+    res = sweep(data, [60, 900, 3600, 86400], workers=2)
+    rates = [r["suppression_rate"] for r in res]
+    assert rates == sorted(rates)
+
+def test_false_dismissals_use_labels():
+    events = [{"id": i, "event_type": et, "user": "u", "ip": "1.1.1.1", "ts": "2025-08-22T10:00:00Z"}
+              for i, et in enumerate(["auth_success", "auth_failure", "auth_success"], start=1)]
+    data = load(iter(events), BENIGN, CRITICAL)
+    import numpy as np
+    data["keep_ids"] = np.asarray([1, 2])
+    r = evaluate(900, data)
+    assert (r["kept"], r["missed"], r["false_dismissal_rate"]) == (2, 1, 0.5)
@@ -0,0 +1,50 @@
+# tests/test_response_cache.py
+import uuid
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core import cache
+from app.core.cache import ResponseCache, Versions
+
+client = TestClient(app)
+
+def test_lru_is_bounded_and_evicted_versions_only_miss():
+    rc = ResponseCache(size=2, max_bytes=1 << 20, ttl=0)
+    for i in range(3):
+        rc.put(("k", i), 1, {"i": i})
+    assert rc.get(("k", 0), 1) is None and rc.get(("k", 2), 1).body == b'{"i":2}'
+    assert rc.stats()["evictions"] == 1
+    assert rc.get(("k", 2), 2) is None  # stale version
+
+    v = Versions(max_tracked=2)
+    v.bump([1]); v.bump([2]); v.bump([3])  # incident 1 evicted at version 1
+    assert v.incident(1) == 1 and v.incident(3) == 3 and v.current == 3
+
+def test_incident_reads_are_cached_until_ingest_or_approval():
+    user = f"rc-{uuid.uuid4().hex[:8]}"
+    ev = {"source": "app", "event_type": "port_scan", "user": user, "ip": "10.8.8.8",
+          "message": "scan", "ts": "2025-08-22T10:00:00Z"}
+    assert client.post("/ingest/logs", json={"events": [ev]}).status_code == 200
+    iid = client.get("/events/recent", params={"limit": 1}).json()[0]["incident_id"]
+
+    before = cache.responses.stats()
+    first = client.get(f"/incidents/{iid}")
+    again = client.get(f"/incidents/{iid}")
+    assert again.json() == first.json() and again.headers["ETag"] == first.headers["ETag"]
+    assert cache.responses.stats()["hits"] - before["hits"] == 1
+    assert client.get(f"/incidents/{iid}", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    assert client.post("/ingest/logs", json={"events": [ev]}).status_code == 200
+    fresh = client.get(f"/incidents/{iid}", headers={"If-None-Match": first.headers["ETag"]})
+    assert fresh.status_code == 200 and fresh.json()["count"] == first.json()["count"] + 1
+
+    v = cache.versions.incident(iid)
+    assert client.post(f"/incidents/{iid}/approve_action", json={"action_name": "block"}).status_code == 200
+    assert cache.versions.incident(iid) > v
+
+def test_list_page_keeps_its_cursor_header_on_hits():
+    client.post("/ingest/logs", json={"events": [{"message": "x", "user": f"rc-{i}", "ip": "10.0.0.1"}
+                                                 for i in range(3)]})
+    a = client.get("/incidents", params={"limit": 2})
+    b = client.get("/incidents", params={"limit": 2})
+    assert a.headers["X-Next-Cursor"] == b.headers["X-Next-Cursor"] and a.json() == b.json()
+    assert client.get("/incidents", params={"limit": 2}, headers={"If-None-Match": a.headers["ETag"]}).status_code == 304
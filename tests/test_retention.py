@@ -0,0 +1,37 @@
+# tests/test_retention.py
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app.api.main import app
+from app.core import counters, retention
+from app.core.db import SessionLocal
+import app.core.models as models
+
+client = TestClient(app)
+
+def test_old_noise_events_are_rolled_up_and_deleted():
+    user = f"ret-{uuid.uuid4().hex[:8]}"
+    evs = [{"source": "app", "event_type": "auth_success", "user": user, "ip": "10.1.1.1",
+            "message": f"Successful login for {user}", "ts": "2025-08-22T10:00:00Z"}] * 5
+    assert client.post("/ingest/logs", json={"events": evs}).status_code == 200
+
+    db = SessionLocal()
+    try:
+        inc = db.query(models.Incident).filter(models.Incident.title.like(f"%{user}")).one()
+        old = datetime.utcnow() - timedelta(days=30)
+        db.execute(update(models.Event).where(models.Event.incident_id == inc.id).values(created_at=old))
+        db.commit()
+        events_before = counters.rebuild(db)["events"][""]
+        db.commit()
+
+        deleted = retention.run_retention(SessionLocal, policy={"noise": 7, "open": 0}, chunk=2)
+        assert deleted["noise"] >= 5
+        assert db.query(models.Event).filter_by(incident_id=inc.id).count() == 0
+        rollups = db.query(models.NoiseRollup).filter_by(incident_id=inc.id).all()
+        assert sum(r.count for r in rollups) == 5
+        assert user in rollups[0].sample_redacted
+        assert counters.rebuild(db)["events"][""] == events_before
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,43 @@
+# tests/test_schema_upgrade.py
+import os, tempfile
+from sqlalchemy import create_engine, inspect, text
+from app.core.schema import ensure_schema
+
+# incidents/events as created by the original models: plain index, no event_type
+_OLD_SCHEMA = [
+    "CREATE TABLE incidents (id INTEGER PRIMARY KEY, title VARCHAR(255), cluster_key VARCHAR(255),"
+    " summary TEXT, count INTEGER, status VARCHAR(50), last_seen DATETIME DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE INDEX ix_incidents_cluster_key ON incidents (cluster_key)",
+    "CREATE TABLE events (id INTEGER PRIMARY KEY, source VARCHAR(100), event_type VARCHAR(100), raw TEXT,"
+    " normalized TEXT, redacted TEXT, residency_tag VARCHAR(4), cluster_key VARCHAR(255),"
+    " created_at DATETIME DEFAULT CURRENT_TIMESTAMP, incident_id INTEGER NOT NULL REFERENCES incidents(id))",
+    "CREATE TABLE approvals (id INTEGER PRIMARY KEY, incident_id INTEGER NOT NULL REFERENCES incidents(id),"
+    " action_name VARCHAR(255), approved_by VARCHAR(100), approved_at DATETIME, notes TEXT)",
+]
+
+def test_old_db_is_deduped_and_upgraded():
+    eng = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'old.db')}")
+    with eng.begin() as c:
+        for stmt in _OLD_SCHEMA:
+            c.execute(text(stmt))
+        c.execute(text("INSERT INTO incidents (id, title, cluster_key, summary, count, status)"
+                       " VALUES (1, 't', 'k', '', 2, 'noise'), (2, 't', 'k', '', 3, 'open')"))
+        c.execute(text("INSERT INTO events (source, event_type, residency_tag, cluster_key, incident_id)"
+                       " VALUES ('a', 'Port_Scan', 'SA', 'k', 1), ('a', 'port_scan', 'SA', 'k', 2)"))
+        c.execute(text("INSERT INTO approvals (incident_id, action_name) VALUES (2, 'block')"))
+
+    ensure_schema(eng)
+    ensure_schema(eng)  # idempotent
+
+    with eng.connect() as c:
+        assert c.execute(text("SELECT id, count, status, event_type FROM incidents")).all() == [
+            (1, 5, "open", "port_scan")
+        ]
+        assert c.execute(text("SELECT DISTINCT incident_id FROM events")).scalars().all() == [1]
+        assert c.execute(text("SELECT incident_id FROM approvals")).scalar() == 1
+        # existing rows enter the change feed and the sequence continues past them
+        assert c.execute(text("SELECT change_seq FROM incidents")).scalar() == 1
+        assert c.execute(text("SELECT value FROM counters WHERE name = 'change_seq'")).scalar() == 1
+    ix = {i["name"]: i for i in inspect(eng).get_indexes("incidents")}
+    assert ix["ix_incidents_cluster_key"]["unique"]
+    assert "ix_incidents_status_last_seen_id" in ix
@@ -0,0 +1,33 @@
+# tests/test_seed_data.py
+import asyncio, json
+from collections import Counter
+import httpx
+from app.api.main import app
+from scripts.seed_data import replay_ops, run_load, scenario_ops
+
+def test_replay_accepts_requests_bodies_and_events(tmp_path):
+    path = tmp_path / "capture.ndjson"
+    ev = {"event_type": "port_scan", "message": "scan"}
+    lines = [
+        {"method": "get", "path": "/incidents", "params": {"limit": 5}},
+        {"events": [ev, ev]},
+        ev, ev, ev,
+        {"request_id": "user-001", "title": "not a request"},
+    ]
+    path.write_text("\n".join(json.dumps(l) for l in lines) + "\n{broken\n")
+    skipped = Counter()
+    ops = list(replay_ops(str(path), 2, skipped))
+    assert [(o.endpoint, o.events) for o in ops] == [
+        ("GET /incidents", 0), ("POST /ingest/logs", 2), ("POST /ingest/logs", 2), ("POST /ingest/logs", 1),
+    ]
+    assert skipped == {"unrecognized": 1, "invalid_json": 1}
+
+def test_mixed_load_reports_per_endpoint_percentiles():
+    ops = scenario_ops("mixed", batch=5, seed=1, incident_ids=[])
+    report = asyncio.run(run_load(ops, "http://test", concurrency=4, max_requests=40,
+                                  transport=httpx.ASGITransport(app=app)))
+    assert report["requests"] == 40 and report["errors"] == 0
+    ingest = report["endpoints"]["POST /ingest/logs"]
+    assert report["events_ingested"] == 5 * ingest["requests"]
+    assert set(report["endpoints"]) <= {"POST /ingest/logs", "GET /incidents", "GET /incidents/{id}", "GET /metrics"}
+    assert 0 < ingest["p50_ms"] <= ingest["p95_ms"] <= ingest["p99_ms"] <= ingest["max_ms"]
@@ -0,0 +1,63 @@
+# tests/test_sessions.py
+import uuid
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core.db import SessionLocal
+from app.core.ingest import restore_sessions
+from app.pipeline import sessionize
+from app.pipeline.clustering import actor, explain_cluster
+from app.pipeline.promotion import event_epoch
+from app.pipeline.sessionize import SessionIndex
+
+client = TestClient(app)
+
+def test_sessions_extend_within_gap_and_expire_by_heap():
+    idx = SessionIndex(gap_seconds=600, max_sessions=10)
+    a, b = ("auth_failure", "u1", "ip1"), ("auth_failure", "u2", "ip2")
+    first = idx.assign(a, 1000)
+    assert idx.assign(a, 1500) is first and idx.assign(a, 2000) is first  # 2000 - 1000 > one gap overall
+    assert (first.start, first.last) == (1000, 2000)
+    idx.assign(b, 2500)
+    assert idx.stats()["open"] == 2
+    idx.assign(b, 2700)  # watermark 2700 > 2000 + 600: a's session expires
+    st = idx.stats()
+    assert st["open"] == 1 and st["expired"] == 1
+    again = idx.assign(a, 2800)
+    assert again is not first and again.cluster_key != first.cluster_key
+
+def test_cap_evicts_the_session_closest_to_expiry():
+    idx = SessionIndex(gap_seconds=600, max_sessions=2)
+    idx.assign(("x", "u1", ""), 100)
+    idx.assign(("x", "u2", ""), 50)
+    idx.assign(("x", "u1", ""), 300)  # u1 now expires last
+    idx.assign(("x", "u3", ""), 310)
+    assert idx.find(("x", "u2", ""), 310) is None
+    assert idx.find(("x", "u1", ""), 310) is not None
+    assert idx.stats()["evicted"] == 1
+
+def test_burst_across_bucket_boundary_is_one_incident(monkeypatch):
+    monkeypatch.setattr(sessionize, "CLUSTER_MODE", "session")
+    monkeypatch.setattr(sessionize, "index", SessionIndex(gap_seconds=900))
+    user = f"sess-{uuid.uuid4().hex[:8]}"
+    evs = [{"source": "app", "event_type": "auth_failure", "user": user, "ip": "10.7.7.7",
+            "message": "failed password", "ts": f"2025-08-25T10:{m:02d}:00Z"} for m in (10, 14, 16, 20, 28)]
+    assert client.post("/ingest/logs", json={"events": evs[:3]}).status_code == 200
+    assert client.post("/ingest/logs", json={"events": evs[3:]}).status_code == 200
+    recent = client.get("/events/recent", params={"limit": 5}).json()
+    assert {e["incident_id"] for e in recent} == {recent[0]["incident_id"]}
+    iid = recent[0]["incident_id"]
+    assert client.get(f"/incidents/{iid}").json()["count"] == 5
+
+    why = explain_cluster(evs[-1])
+    assert why["window"]["mode"] == "session" and why["window"]["incident_id"] == iid
+    assert why["window"]["session_start_iso"].startswith("2025-08-25T10:10:00")
+
+    # a restarted process rebuilds the open session from the DB and keeps using the incident
+    monkeypatch.setattr(sessionize, "index", SessionIndex(gap_seconds=900))
+    with SessionLocal() as db:
+        assert restore_sessions(db) >= 1
+    s = sessionize.index.find(sessionize.session_key(evs[0], *actor(evs[0])), event_epoch(evs[-1]["ts"]))
+    assert s is not None and s.incident_id == iid
+    later = {**evs[0], "ts": "2025-08-25T10:40:00Z"}
+    assert client.post("/ingest/logs", json={"events": [later]}).status_code == 200
+    assert client.get(f"/incidents/{iid}").json()["count"] == 6
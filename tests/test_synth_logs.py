@@ -0,0 +1,12 @@
+# tests/test_synth_logs.py
+from scripts.synth_logs import generate, parse_mix
+
+def test_generator_is_deterministic_and_sized():
+    a = list(generate(500, seed=3))
+    assert len(a) == 500
+    assert a == list(generate(500, seed=3))
+    assert a != list(generate(500, seed=4))
+
+def test_mix_selects_scenarios():
+    evs = list(generate(200, mix=parse_mix("scan=1")))
+    assert {e["event_type"] for e in evs} == {"port_scan"}
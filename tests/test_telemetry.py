@@ -0,0 +1,30 @@
+# tests/test_telemetry.py
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.core.telemetry import Histogram
+
+client = TestClient(app)
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, "x")
+    lines = h.render()
+    assert 't_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="x",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="x",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="x"} 3' in lines
+
+def test_prometheus_endpoint_exports_stages_routes_and_queries():
+    evs = [{"source": "app", "event_type": "port_scan", "message": "scan from 10.7.7.7", "user": "tele"}]
+    assert client.post("/ingest/logs", json={"events": evs}).status_code == 200
+    r = client.get("/metrics/prometheus")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    for stage in ("redact", "normalize", "cluster_key", "incident_upsert", "event_insert", "counters"):
+        assert f'soc_ingest_stage_seconds_count{{stage="{stage}"}}' in body
+    assert 'soc_http_request_duration_seconds_count{method="POST",route="/ingest/logs",status="200"}' in body
+    assert 'soc_http_request_db_queries_count{route="/ingest/logs"}' in body
+    assert 'soc_db_query_duration_seconds_count{verb="INSERT"}' in body
+    assert 'soc_counter{name="events",key=""}' in body
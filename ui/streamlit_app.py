@@ -1,14 +1,8 @@
-import streamlit as st
-import requests
 import os
-from typing import List
+from typing import Dict, List
 
-API_BASE = os.getenv("API_BASE", "http://localhost:8000")
-import streamlit as st
 import requests
-import os
-import os
-from typing import List
+import streamlit as st
 
 # Avoid requiring .streamlit/secrets.toml; use env var or default
 API_BASE = os.getenv("API_BASE", "http://localhost:8000")
@@ -18,11 +12,19 @@ st.set_page_config(page_title="SOC Copilot PoC", layout="wide")
 st.title("SOC Copilot — PoC")
 
 
+# /metrics is a handful of counters; refetch at most every few seconds, not per rerun
+METRICS_TTL_SECONDS = float(os.getenv("UI_METRICS_TTL_SECONDS", "10"))
+
+
+@st.cache_data(ttl=METRICS_TTL_SECONDS, show_spinner=False)
+def fetch_metrics() -> dict:
+    return requests.get(f"{API_BASE}/metrics", timeout=5).json()
+
+
 def section_metrics():
     st.subheader("Metrics")
     try:
-        r = requests.get(f"{API_BASE}/metrics", timeout=5)
-        data = r.json()
+        data = fetch_metrics()
         c1, c2, c3 = st.columns(3)
         c1.metric("Events", data.get("events", 0))
         c2.metric("Incidents", data.get("incidents", 0))
@@ -42,13 +44,69 @@ def section_ingest():
     payload = {"events": [sample]}
     if st.button("Ingest sample event"):
         r = requests.post(f"{API_BASE}/ingest/logs", json=payload)
+        fetch_metrics.clear()
         st.json(r.json())
 
 
+PAGE_SIZE = 50
+SYNC_PAGE = 1000  # /incidents/changes page size (INCIDENTS_PAGE_MAX)
+
+
+def sync_incidents() -> Dict[int, dict]:
+    """
+    Keep a local id → incident map in session state and only pull what changed
+    since the last rerun from /incidents/changes (the first run pulls everything).
+    """
+    state = st.session_state
+    incidents = state.setdefault("incidents", {})
+    cursor = state.get("changes_cursor")
+    while True:
+        r = requests.get(f"{API_BASE}/incidents/changes", params={"since": cursor, "limit": SYNC_PAGE}, timeout=10)
+        r.raise_for_status()
+        page = r.json()
+        for inc in page["items"]:
+            incidents[inc["id"]] = inc
+        cursor = page["cursor"]
+        if not page["more"]:
+            break
+    state["changes_cursor"] = cursor
+    return incidents
+
+
 def section_incidents():
     st.subheader("Incidents")
-    r = requests.get(f"{API_BASE}/incidents")
-    rows: List[dict] = r.json()
+    try:
+        incidents = sync_incidents()
+    except requests.RequestException as e:
+        st.warning(f"Could not refresh incidents: {e}")
+        incidents = st.session_state.get("incidents", {})
+
+    f1, f2 = st.columns(2)
+    status = f1.selectbox("Status", ["", "open", "noise", "closed"], format_func=lambda s: s or "any")
+    event_type = f2.text_input("Event type", value="").strip().lower()
+    filters = (status, event_type)
+    if st.session_state.get("inc_filters") != filters:
+        st.session_state["inc_filters"] = filters
+        st.session_state["inc_page"] = 0
+
+    # filter and sort locally: newest first, like GET /incidents
+    matching: List[dict] = [
+        inc for inc in incidents.values()
+        if (not status or inc["status"] == status) and (not event_type or inc["event_type"] == event_type)
+    ]
+    matching.sort(key=lambda inc: (inc["last_seen"] or "", inc["id"]), reverse=True)
+    pages = max(1, -(-len(matching) // PAGE_SIZE))
+    page = min(st.session_state.get("inc_page", 0), pages - 1)
+
+    p1, p2, p3 = st.columns([1, 1, 4])
+    if p1.button("◀ Prev", disabled=page == 0):
+        st.session_state["inc_page"] = page - 1
+        st.rerun()
+    if p2.button("Next ▶", disabled=page >= pages - 1):
+        st.session_state["inc_page"] = page + 1
+        st.rerun()
+    p3.caption(f"Page {page + 1}/{pages} · {len(matching)} incidents")
+    rows = matching[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
     for inc in rows:
         with st.expander(f"#{inc['id']} — {inc['title']} ({inc['count']})"):
             st.write(inc["summary"])            